@@ -5,10 +5,26 @@ Moduły:
 - scrapers: Scrapery dla różnych źródeł (WWW, Google Maps, Facebook, Instagram, TikTok)
 - analyzers: Analizatory (AI kategoryzacja, wykrywanie filii, scoring)
 - orchestrator: Główny flow łączący wszystko
+
+Eksporty są ładowane leniwie - `import company_intel.models` (czy config)
+nie ciągnie całego orchestratora (scrapery, httpx, Apify, Vertex AI).
 """
 
-from .orchestrator import CompanyIntelOrchestrator
-from .models import CompanyIntel, Placowka, SocialProfile, ActivityScore, KategoryzacjaAI
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .orchestrator import CompanyIntelOrchestrator
+    from .models import CompanyIntel, Placowka, SocialProfile, ActivityScore, KategoryzacjaAI
+
+_LAZY_EXPORTS = {
+    "CompanyIntelOrchestrator": ".orchestrator",
+    "CompanyIntel": ".models",
+    "Placowka": ".models",
+    "SocialProfile": ".models",
+    "ActivityScore": ".models",
+    "KategoryzacjaAI": ".models",
+}
 
 __all__ = [
     "CompanyIntelOrchestrator",
@@ -20,3 +36,12 @@ __all__ = [
 ]
 
 __version__ = "0.1.0"
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
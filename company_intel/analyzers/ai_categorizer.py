@@ -10,45 +10,44 @@ Analizuje tekst strony WWW i zwraca:
 - Branża (jeśli nie podmiot leczniczy)
 """
 
+import hashlib
 import json
 import logging
+import time
+from collections import OrderedDict
+from types import MappingProxyType
 from typing import Optional
 
 from ..config import CompanyIntelSettings, get_settings
-from ..models import KategoryzacjaAI
+from ..models import KategoryzacjaAI, PlatnikUslug, Specjalizacja
 
 
 logger = logging.getLogger(__name__)
 
 
-# Definicje możliwych wartości dla pól
-ALLOWED_VALUES = {
-    "platnik_uslug": ["NFZ", "Komercyjne", "Ubezpieczenie", "none"],
-    "specjalizacja": [
-        "POZ", "Przychodnia Wielospecjalistyczna", "Szpital",
-        "Poradnia Zdrowia Psychicznego", "Rehabilitacja", "Stomatologia",
-        "Diagnostyka", "Medycyna Estetyczna", "Diagnostyka Obrazowa",
-        "Laboratorium", "Weterynaria", "Usługi Niemedyczne", "none"
-    ],
-    "wielospecjalistyczne": [
+# Definicje możliwych wartości dla pól (frozenset - sprawdzanie w O(1))
+ALLOWED_VALUES = MappingProxyType({
+    "platnik_uslug": frozenset(m.value for m in PlatnikUslug),
+    "specjalizacja": frozenset(m.value for m in Specjalizacja),
+    "wielospecjalistyczne": frozenset({
         "chirurgia ogólna", "chirurgia plastyczna", "gastroenterologia",
         "ginekologia/położnictwo/leczenie niepłodności", "kardiologia",
         "laryngologia", "okulistyka", "ortopedia", "dermatologia"
-    ],
-    "typ_wlasnosci": [
+    }),
+    "typ_wlasnosci": frozenset({
         "-None-", "Prywatny (Private)", "Partnerstwo PP (Partnership)", "Publiczny (Public)"
-    ],
-    "kategoria_konta": [
+    }),
+    "kategoria_konta": frozenset({
         "-None-", "Podmiot leczniczy (Inne)", "Partner", "Konkurencja", "Poddostawca", "Pozostałe"
-    ],
-    "branza": [
+    }),
+    "branza": frozenset({
         "Agencje reklamowe (Placówka medyczna)", "Fundacja/Stowarzyszenie/Spółdzielnia (Konkurencja)",
         "Kancelaria prawna (Partner)", "Media/Eventy medyczne (Okołomedyczne inne)",
         "Okołomedyczne inne (Poddostawca)", "Sprzedaż sprzętu i jednorazówki medycznej (Pozostałe)",
         "Szkolenia/Consulting", "Edukacja kliniczna (Edukacja medyczna)", "Usługi finansowe",
         "Wdrożeniowiec systemów medycznych", "Inne", "Ratownictwo", "Dystrybutor", None
-    ],
-}
+    }),
+})
 
 # Prompt do kategoryzacji - ultra-zwięzły, wymusza jedną linię, BEZ reasoning
 CATEGORIZATION_PROMPT = """Kategoryzuj placówkę. Zwróć TYLKO jednolinijkowy JSON bez formatowania.
@@ -66,6 +65,11 @@ Wartości do wyboru:
 - typ_wlasnosci: Prywatny (Private), Publiczny (Public)"""
 
 
+# Cache kategoryzacji: hash promptu -> (czas wygaśnięcia, wynik).
+# Sieci placówek i ponowne analizy tej samej strony nie powtarzają wywołania AI.
+CATEGORIZATION_CACHE_MAXSIZE = 2048
+
+
 class AICategorizer:
     """
     Kategoryzuje placówkę używając Vertex AI.
@@ -76,6 +80,31 @@ class AICategorizer:
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self._client = None
         self._initialized = False
+        self._cache: "OrderedDict[str, tuple[float, KategoryzacjaAI]]" = OrderedDict()
+        self._cache_hits = 0
+        self._cache_lookups = 0
+    
+    def _cache_get(self, key: str) -> Optional[KategoryzacjaAI]:
+        """Wynik z cache (kopia - wynik trafia do modyfikowalnego CompanyIntel) lub None."""
+        self._cache_lookups += 1
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        self._cache_hits += 1
+        return result.model_copy(deep=True)
+    
+    def _cache_put(self, key: str, result: KategoryzacjaAI) -> None:
+        """Zapisuje pełny wynik (TTL: cache_ttl_days_categorization)."""
+        ttl = self.settings.cache_ttl_days_categorization * 86400
+        self._cache[key] = (time.monotonic() + ttl, result.model_copy(deep=True))
+        self._cache.move_to_end(key)
+        if len(self._cache) > CATEGORIZATION_CACHE_MAXSIZE:
+            self._cache.popitem(last=False)
     
     def _init_vertex_ai(self) -> bool:
         """Inicjalizuje Vertex AI client."""
@@ -134,8 +163,9 @@ class AICategorizer:
                 ai_reasoning="Vertex AI not available",
             )
         
-        # Przygotuj prompt - użyj tylko pierwszych 5000 znaków tekstu (wystarczy do kategoryzacji)
-        truncated_text = page_text[:5000] if len(page_text) > 5000 else page_text
+        # Przygotuj prompt - użyj tylko początku tekstu (wystarczy do kategoryzacji)
+        max_chars = self.settings.ai_max_page_text_chars
+        truncated_text = page_text[:max_chars] if len(page_text) > max_chars else page_text
         
         # Skróć nazwę firmy - długie nazwy GUS powodują dłuższe odpowiedzi AI
         short_name = company_name[:60] + "..." if len(company_name) > 60 else company_name
@@ -145,6 +175,18 @@ class AICategorizer:
             company_name=short_name,
         )
         
+        # Ten sam prompt (tekst strony + nazwa) = ten sam wynik
+        cache_key = None
+        if self.settings.cache_enabled:
+            cache_key = hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).hexdigest()
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                self.logger.info(
+                    "Categorization cache hit: %s (hits %d/%d)",
+                    company_name, self._cache_hits, self._cache_lookups,
+                )
+                return cached
+        
         import asyncio
         
         max_retries = 3  # Zwiększone z 2
@@ -200,6 +242,9 @@ class AICategorizer:
                     result.ai_confidence,
                 )
                 
+                # Cache tylko kompletnych wyników (częściowe/błędy - kolejna próba przy następnej analizie)
+                if cache_key is not None and not needs_retry:
+                    self._cache_put(cache_key, result)
                 return result
                 
             except Exception as e:
@@ -339,16 +384,17 @@ class AICategorizer:
         if not values or not isinstance(values, list):
             return []
         
-        allowed = ALLOWED_VALUES.get(field, [])
-        return [v for v in values if v in allowed]
+        allowed = ALLOWED_VALUES.get(field, frozenset())
+        # AI może zwrócić niehashowalne elementy (dict/list) - pomiń je
+        return [v for v in values if isinstance(v, str) and v in allowed]
     
     def _validate_single(self, value: str, field: str) -> Optional[str]:
         """Waliduje pojedynczą wartość."""
         if not value:
             return None
         
-        allowed = ALLOWED_VALUES.get(field, [])
-        return value if value in allowed else None
+        allowed = ALLOWED_VALUES.get(field, frozenset())
+        return value if isinstance(value, str) and value in allowed else None
     
     async def extract_brand_name(
         self, 
@@ -9,12 +9,13 @@ Wyciąga insights Z CYTATAMI:
 - Confidence score
 """
 
+import asyncio
 import json
 import re
 from typing import Optional
 
 import logging
-from ..config import CompanyIntelSettings
+from ..config import CompanyIntelSettings, get_settings
 from ..models import ReviewsInsights, InsightWithCitations, ReviewCitation
 
 
@@ -61,8 +62,10 @@ Zwróć TYLKO JSON, bez dodatkowych komentarzy."""
 
     def __init__(self, settings: Optional[CompanyIntelSettings] = None):
         """Inicjalizacja analyzera."""
-        self.settings = settings or CompanyIntelSettings()
+        self.settings = settings or get_settings()
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        # Limit równoległych wywołań Vertex AI (analiza wielu placówek naraz)
+        self._ai_semaphore = asyncio.Semaphore(self.settings.vertex_ai_max_concurrent)
         
         # Import Vertex AI
         try:
@@ -289,18 +292,17 @@ Zwróć TYLKO JSON, bez dodatkowych komentarzy."""
     async def _call_vertex_ai(self, prompt: str) -> Optional[str]:
         """Wywołuje Vertex AI."""
         try:
-            import asyncio
-            
             # Vertex AI nie ma async API - użyj to_thread
-            response = await asyncio.to_thread(
-                lambda: self.model.generate_content(
-                    prompt,
-                    generation_config={
-                        "temperature": 0.3,
-                        "max_output_tokens": 4096,  # Zwiększono dla cytatów
-                    }
+            async with self._ai_semaphore:
+                response = await asyncio.to_thread(
+                    lambda: self.model.generate_content(
+                        prompt,
+                        generation_config={
+                            "temperature": 0.3,
+                            "max_output_tokens": 4096,  # Zwiększono dla cytatów
+                        }
+                    )
                 )
-            )
             
             return response.text
             
@@ -18,7 +18,9 @@ Drabinka metod (tanie → drogie):
 import asyncio
 import logging
 import time
-from typing import Optional, TYPE_CHECKING
+from typing import Literal, NamedTuple, Optional, TYPE_CHECKING, Union, overload
+
+import httpx
 
 from .models import (
     ChaoticLeadParsed,
@@ -30,6 +32,7 @@ from .models import (
 )
 from .query_builder import QueryBuilder
 from .candidate_scorer import CandidateScorer, validate_nip_checksum
+from .nip_lookup import stateless_cookie_jar
 
 if TYPE_CHECKING:
     from .config import CompanyIntelSettings
@@ -38,6 +41,22 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Pula połączeń współdzielona przez serwisy downstream routera
+HTTP_POOL_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=300,
+)
+HTTP_TIMEOUT = httpx.Timeout(30)
+
+_LOG_HEADER = "=" * 60
+
+class ProcessResult(NamedTuple):
+    """Lekki wynik routera (tryb bez śladu decyzji)."""
+    nip: Optional[str]
+    decision: Optional[CandidateDecision]
+    website: Optional[str]
+
 
 class ChaoticDataRouter:
     """
@@ -73,13 +92,89 @@ class ChaoticDataRouter:
         self.scorer = CandidateScorer()
         
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        
+        self._http_client: Optional[httpx.AsyncClient] = None
+        # Serwisy, którym router wstrzyknął klient, z poprzednim klientem do przywrócenia
+        self._injected: list[tuple[object, Optional[httpx.AsyncClient]]] = []
+    
+    async def __aenter__(self) -> "ChaoticDataRouter":
+        """
+        Otwiera współdzielony klient HTTP i przekazuje go serwisom downstream.
+        
+        Dzięki temu NIPLookup i ZohoLookupScraper używają jednej puli połączeń
+        (bez ponownego TLS handshake / DNS przy każdym leadzie w batchu).
+        
+        Jeden właściciel klienta: serwisy, które mają już otwarty klient, zostają
+        przy nim. W CompanyIntelOrchestrator klient wstrzykuje orchestrator, więc
+        router nie otwiera własnej puli - ta jest tylko dla routera używanego
+        samodzielnie (`async with ChaoticDataRouter(...) as router`).
+        """
+        if self._http_client is not None:
+            return self
+        
+        needs_client = []
+        for service in (self.nip_lookup, self.zoho_lookup, self.nip_finder_v3):
+            if not hasattr(service, "set_http_client"):
+                continue
+            previous = getattr(service, "_http_client", None)
+            if previous is None or previous.is_closed:
+                needs_client.append((service, previous))
+        
+        if needs_client:
+            self._http_client = httpx.AsyncClient(
+                timeout=HTTP_TIMEOUT,
+                limits=HTTP_POOL_LIMITS,
+                cookies=stateless_cookie_jar(),
+            )
+            for service, previous in needs_client:
+                service.set_http_client(self._http_client)
+                self._injected.append((service, previous))
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+    
+    async def close(self) -> None:
+        """
+        Zamyka współdzielony klient HTTP (jeśli router go otworzył).
+        
+        Serwisom, którym router wstrzyknął klient, przywraca poprzedni - o ile
+        w międzyczasie nikt inny nie podmienił im klienta.
+        """
+        for service, previous in self._injected:
+            if getattr(service, "_http_client", None) is self._http_client:
+                service.set_http_client(previous)
+        self._injected.clear()
+        if self._http_client:
+            await self._http_client.aclose()
+            self._http_client = None
+    
+    @overload
+    async def process(
+        self,
+        raw_text: str,
+        skip_zoho: bool = ...,
+        skip_search: bool = ...,
+        return_trace: Literal[True] = ...,
+    ) -> DecisionTrace: ...
+    
+    @overload
+    async def process(
+        self,
+        raw_text: str,
+        skip_zoho: bool = ...,
+        skip_search: bool = ...,
+        *,
+        return_trace: Literal[False],
+    ) -> ProcessResult: ...
     
     async def process(
         self,
         raw_text: str,
         skip_zoho: bool = False,
         skip_search: bool = False,
-    ) -> DecisionTrace:
+        return_trace: bool = True,
+    ) -> Union[DecisionTrace, ProcessResult]:
         """
         Przetwarza chaotyczny tekst i znajduje NIP/WWW.
         
@@ -87,86 +182,126 @@ class ChaoticDataRouter:
             raw_text: Surowy tekst wejściowy (np. "Aldent Wrocław 8941864949")
             skip_zoho: Pomiń lookup Zoho (do testów)
             skip_search: Pomiń wyszukiwanie Google/Brave (do testów)
+            return_trace: False = tryb szybki (bulk) - kroki StrategyStep nie są
+                tworzone, DecisionTrace służy tylko do zebrania kandydatów
         
         Returns:
             DecisionTrace z pełnym śladem decyzji
+            lub ProcessResult(nip, decision, website) gdy return_trace=False
         """
-        start_time = time.time()
-        
         trace = DecisionTrace(input_raw=raw_text)
         
-        self.logger.info("=" * 60)
+        await self._run_cascade(raw_text, trace, skip_zoho, skip_search, record_steps=return_trace)
+        
+        if return_trace:
+            return trace
+        return ProcessResult(trace.final_nip, trace.final_nip_decision, trace.final_website)
+    
+    @staticmethod
+    def _add_step(
+        trace: DecisionTrace,
+        record_steps: bool,
+        step_name: str,
+        method: str,
+        step_start: Optional[float] = None,
+        **fields,
+    ) -> None:
+        """
+        Tworzy StrategyStep i dodaje go do śladu.
+        
+        W trybie szybkim (record_steps=False) krok nie jest w ogóle tworzony.
+        step_start: początek kroku (perf_counter) - podany = zapisz czas trwania.
+        """
+        if not record_steps:
+            return
+        if step_start is not None:
+            fields["duration_ms"] = int((time.perf_counter() - step_start) * 1000)
+        trace.add_step(StrategyStep(step_name=step_name, method=method, **fields))
+    
+    async def _run_cascade(
+        self,
+        raw_text: str,
+        trace: DecisionTrace,
+        skip_zoho: bool,
+        skip_search: bool,
+        record_steps: bool = True,
+    ) -> None:
+        """Drabinka metod (tanie → drogie) - wypełnia trace wynikiem."""
+        start_time = time.perf_counter()
+        
+        self.logger.info(_LOG_HEADER)
         self.logger.info("[CHAOTIC_ROUTER] Processing: '%s'", raw_text[:100])
-        self.logger.info("=" * 60)
+        self.logger.info(_LOG_HEADER)
         
         # === KROK 0: AI Parsing ===
-        parsed = await self._parse_input(raw_text, trace)
+        parsed = await self._parse_input(raw_text, trace, record_steps)
         if not parsed:
             self.logger.warning("[CHAOTIC_ROUTER] Failed to parse input")
-            trace.total_duration_ms = int((time.time() - start_time) * 1000)
-            return trace
+            trace.total_duration_ms = int((time.perf_counter() - start_time) * 1000)
+            return
         
         trace.input_parsed = parsed
         
-        self.logger.info(
-            "[CHAOTIC_ROUTER] Parsed signals: nip=%s, website=%s, phone=%s, email=%s, name=%s, city=%s, strongest=%s",
-            parsed.nip,
-            parsed.website,
-            parsed.phone,
-            parsed.email,
-            parsed.name,
-            parsed.city,
-            parsed.strongest_signal.value if parsed.strongest_signal else None,
-        )
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                "[CHAOTIC_ROUTER] Parsed signals: nip=%s, website=%s, phone=%s, email=%s, name=%s, city=%s, strongest=%s",
+                parsed.nip,
+                parsed.website,
+                parsed.phone,
+                parsed.email,
+                parsed.name,
+                parsed.city,
+                parsed.strongest_signal.value if parsed.strongest_signal else None,
+            )
         
         # === KROK 1: Jeśli NIP wykryty → checksum → GUS ===
         if parsed.nip:
-            candidate = await self._process_nip(parsed, trace)
+            candidate = await self._process_nip(parsed, trace, record_steps)
             if candidate and candidate.decision == CandidateDecision.ACCEPT:
                 trace.final_nip = candidate.nip
                 trace.final_nip_decision = candidate.decision
                 # Szukaj WWW dla zaakceptowanego NIP
                 if not parsed.website:
-                    await self._find_website_for_nip(parsed, candidate, trace)
+                    await self._find_website_for_nip(parsed, candidate, trace, record_steps)
                 else:
                     trace.final_website = parsed.website
-                trace.total_duration_ms = int((time.time() - start_time) * 1000)
-                return trace
+                trace.total_duration_ms = int((time.perf_counter() - start_time) * 1000)
+                return
         
         # === KROK 2: Jeśli phone/email/domain → Zoho (FIRST!) ===
         if not skip_zoho and (parsed.phone or parsed.email or parsed.website):
-            zoho_result = await self._lookup_zoho(parsed, trace)
+            zoho_result = await self._lookup_zoho(parsed, trace, record_steps)
             if zoho_result:
                 # Zoho znalazł NIP → waliduj przez GUS
-                candidate = await self._validate_zoho_nip(zoho_result, parsed, trace)
+                candidate = await self._validate_zoho_nip(zoho_result, parsed, trace, record_steps)
                 if candidate and candidate.decision == CandidateDecision.ACCEPT:
                     trace.final_nip = candidate.nip
                     trace.final_nip_decision = candidate.decision
                     if not trace.final_website:
                         trace.final_website = parsed.website
-                    trace.total_duration_ms = int((time.time() - start_time) * 1000)
-                    return trace
+                    trace.total_duration_ms = int((time.perf_counter() - start_time) * 1000)
+                    return
         
         # === KROK 3: Jeśli website → scrape NIP ===
         if parsed.website:
-            scraped_nip = await self._scrape_website_for_nip(parsed, trace)
+            scraped_nip = await self._scrape_website_for_nip(parsed, trace, record_steps)
             if scraped_nip:
-                candidate = await self._validate_scraped_nip(scraped_nip, parsed, trace)
+                candidate = await self._validate_scraped_nip(scraped_nip, parsed, trace, record_steps)
                 if candidate and candidate.decision == CandidateDecision.ACCEPT:
                     trace.final_nip = candidate.nip
                     trace.final_nip_decision = candidate.decision
                     trace.final_website = parsed.website
-                    trace.total_duration_ms = int((time.time() - start_time) * 1000)
-                    return trace
+                    trace.total_duration_ms = int((time.perf_counter() - start_time) * 1000)
+                    return
         
         # === KROK 4: Search (Google/Brave) - name+city ===
         if not skip_search and parsed.has_name():
-            search_candidate = await self._search_for_nip(parsed, trace)
+            search_candidate = await self._search_for_nip(parsed, trace, record_steps)
             if search_candidate and search_candidate.decision == CandidateDecision.ACCEPT:
                 trace.final_nip = search_candidate.nip
                 trace.final_nip_decision = search_candidate.decision
-                trace.total_duration_ms = int((time.time() - start_time) * 1000)
-                return trace
+                trace.total_duration_ms = int((time.perf_counter() - start_time) * 1000)
+                return
         
         # === Fallback: najlepszy SUSPECT ===
         best_suspect = self._get_best_suspect(trace)
@@ -180,31 +315,28 @@ class ChaoticDataRouter:
         else:
             self.logger.warning("[CHAOTIC_ROUTER] No NIP found")
         
-        trace.total_duration_ms = int((time.time() - start_time) * 1000)
-        
-        self.logger.info(
-            "[CHAOTIC_ROUTER] DONE: nip=%s (%s), website=%s, duration=%dms, cost=$%.4f",
-            trace.final_nip,
-            trace.final_nip_decision.value if trace.final_nip_decision else "?",
-            trace.final_website,
-            trace.total_duration_ms,
-            trace.total_cost_usd,
-        )
+        trace.total_duration_ms = int((time.perf_counter() - start_time) * 1000)
         
-        return trace
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                "[CHAOTIC_ROUTER] DONE: nip=%s (%s), website=%s, duration=%dms, cost=$%.4f",
+                trace.final_nip,
+                trace.final_nip_decision.value if trace.final_nip_decision else "?",
+                trace.final_website,
+                trace.total_duration_ms,
+                trace.total_cost_usd,
+            )
     
     async def _parse_input(
         self,
         raw_text: str,
         trace: DecisionTrace,
+        record_steps: bool = True,
     ) -> Optional[ChaoticLeadParsed]:
         """Parsuje surowy tekst przez AI."""
-        step_start = time.time()
-        
-        step = StrategyStep(
-            step_name="AI Parse",
-            method="vertex_ai.parse_chaotic_lead",
-        )
+        step_start = time.perf_counter()
+        step_name = "AI Parse"
+        method = "vertex_ai.parse_chaotic_lead"
         
         parsed_dict = None
         
@@ -222,12 +354,14 @@ class ChaoticDataRouter:
                 from src.services.vertex_ai import VertexAIServiceMock
                 mock = VertexAIServiceMock()
                 parsed_dict = await mock.parse_chaotic_lead(raw_text)
-                step.method = "regex_fallback"
+                method = "regex_fallback"
             
             if not parsed_dict:
-                step.skipped = True
-                step.skip_reason = "AI returned None"
-                trace.add_step(step)
+                self._add_step(
+                    trace, record_steps, step_name, method,
+                    skipped=True,
+                    skip_reason="AI returned None",
+                )
                 return None
             
             # Konwertuj na model
@@ -255,34 +389,34 @@ class ChaoticDataRouter:
                 strongest_signal=strongest,
             )
             
-            step.results_count = 1
-            step.duration_ms = int((time.time() - step_start) * 1000)
-            # AI parsing koszt ~$0.001
-            step.cost_usd = 0.001
-            trace.add_step(step)
+            self._add_step(
+                trace, record_steps, step_name, method, step_start,
+                results_count=1,
+                # AI parsing koszt ~$0.001
+                cost_usd=0.001,
+            )
             
             return parsed
             
         except Exception as e:
             self.logger.error("[CHAOTIC_ROUTER] Parse error: %s", e)
-            step.skipped = True
-            step.skip_reason = str(e)
-            step.duration_ms = int((time.time() - step_start) * 1000)
-            trace.add_step(step)
+            self._add_step(
+                trace, record_steps, step_name, method, step_start,
+                skipped=True,
+                skip_reason=str(e),
+            )
             return None
     
     async def _process_nip(
         self,
         parsed: ChaoticLeadParsed,
         trace: DecisionTrace,
+        record_steps: bool = True,
     ) -> Optional[NIPCandidate]:
         """Przetwarza wykryty NIP: checksum → GUS."""
-        step_start = time.time()
-        
-        step = StrategyStep(
-            step_name="NIP Validation",
-            method="checksum + gus",
-        )
+        step_start = time.perf_counter()
+        step_name = "NIP Validation"
+        method = "checksum + gus"
         
         nip = parsed.nip
         
@@ -292,11 +426,9 @@ class ChaoticDataRouter:
             candidate = self.scorer.create_candidate(nip)
             candidate.decision = CandidateDecision.REJECT
             candidate.decision_reason = "Invalid checksum"
-            trace.nip_candidates.append(candidate)
+            trace.add_candidate(candidate)
             
-            step.candidates_found = 1
-            step.duration_ms = int((time.time() - step_start) * 1000)
-            trace.add_step(step)
+            self._add_step(trace, record_steps, step_name, method, step_start, candidates_found=1)
             return candidate
         
         self.logger.info("[CHAOTIC_ROUTER] NIP %s: checksum OK", nip)
@@ -337,14 +469,15 @@ class ChaoticDataRouter:
             input_name=parsed.name,
         )
         
-        trace.nip_candidates.append(candidate)
+        trace.add_candidate(candidate)
         
-        step.candidates_found = 1
-        step.best_candidate = nip
-        step.duration_ms = int((time.time() - step_start) * 1000)
-        # GUS lookup ~$0.001
-        step.cost_usd = 0.001 if gus_found else 0.0
-        trace.add_step(step)
+        self._add_step(
+            trace, record_steps, step_name, method, step_start,
+            candidates_found=1,
+            best_candidate=nip,
+            # GUS lookup ~$0.001
+            cost_usd=0.001 if gus_found else 0.0,
+        )
         
         return candidate
     
@@ -352,19 +485,19 @@ class ChaoticDataRouter:
         self,
         parsed: ChaoticLeadParsed,
         trace: DecisionTrace,
+        record_steps: bool = True,
     ) -> Optional[str]:
         """Lookup NIP w Zoho po phone/email/domain."""
-        step_start = time.time()
-        
-        step = StrategyStep(
-            step_name="Zoho Lookup",
-            method="zoho.find_nip_by_website_data",
-        )
+        step_start = time.perf_counter()
+        step_name = "Zoho Lookup"
+        method = "zoho.find_nip_by_website_data"
         
         if not self.zoho_lookup:
-            step.skipped = True
-            step.skip_reason = "Zoho not configured"
-            trace.add_step(step)
+            self._add_step(
+                trace, record_steps, step_name, method,
+                skipped=True,
+                skip_reason="Zoho not configured",
+            )
             return None
         
         try:
@@ -378,25 +511,27 @@ class ChaoticDataRouter:
             
             if zoho_nip:
                 self.logger.info("[CHAOTIC_ROUTER] Zoho HIT: NIP %s", zoho_nip)
-                step.candidates_found = 1
-                step.best_candidate = zoho_nip
-                step.results_count = 1
             else:
                 self.logger.debug("[CHAOTIC_ROUTER] Zoho: no match")
             
-            step.duration_ms = int((time.time() - step_start) * 1000)
-            # Zoho = FREE
-            step.cost_usd = 0.0
-            trace.add_step(step)
+            self._add_step(
+                trace, record_steps, step_name, method, step_start,
+                candidates_found=1 if zoho_nip else 0,
+                best_candidate=zoho_nip,
+                results_count=1 if zoho_nip else 0,
+                # Zoho = FREE
+                cost_usd=0.0,
+            )
             
             return zoho_nip
             
         except Exception as e:
             self.logger.warning("[CHAOTIC_ROUTER] Zoho lookup failed: %s", e)
-            step.skipped = True
-            step.skip_reason = str(e)
-            step.duration_ms = int((time.time() - step_start) * 1000)
-            trace.add_step(step)
+            self._add_step(
+                trace, record_steps, step_name, method, step_start,
+                skipped=True,
+                skip_reason=str(e),
+            )
             return None
     
     async def _validate_zoho_nip(
@@ -404,20 +539,20 @@ class ChaoticDataRouter:
         nip: str,
         parsed: ChaoticLeadParsed,
         trace: DecisionTrace,
+        record_steps: bool = True,
     ) -> Optional[NIPCandidate]:
         """Waliduje NIP znaleziony w Zoho przez GUS."""
-        step_start = time.time()
-        
-        step = StrategyStep(
-            step_name="Validate Zoho NIP",
-            method="checksum + gus",
-        )
+        step_start = time.perf_counter()
+        step_name = "Validate Zoho NIP"
+        method = "checksum + gus"
         
         # Checksum
         if not validate_nip_checksum(nip):
-            step.skipped = True
-            step.skip_reason = "Invalid checksum"
-            trace.add_step(step)
+            self._add_step(
+                trace, record_steps, step_name, method,
+                skipped=True,
+                skip_reason="Invalid checksum",
+            )
             return None
         
         # GUS
@@ -446,13 +581,14 @@ class ChaoticDataRouter:
             zoho_name=gus_name,
         )
         
-        trace.nip_candidates.append(candidate)
+        trace.add_candidate(candidate)
         
-        step.candidates_found = 1
-        step.best_candidate = nip
-        step.duration_ms = int((time.time() - step_start) * 1000)
-        step.cost_usd = 0.001
-        trace.add_step(step)
+        self._add_step(
+            trace, record_steps, step_name, method, step_start,
+            candidates_found=1,
+            best_candidate=nip,
+            cost_usd=0.001,
+        )
         
         return candidate
     
@@ -460,19 +596,19 @@ class ChaoticDataRouter:
         self,
         parsed: ChaoticLeadParsed,
         trace: DecisionTrace,
+        record_steps: bool = True,
     ) -> Optional[str]:
         """Scrapuje stronę WWW w poszukiwaniu NIP."""
-        step_start = time.time()
-        
-        step = StrategyStep(
-            step_name="Scrape Website",
-            method="nip_finder_v3.privacy_scraper",
-        )
+        step_start = time.perf_counter()
+        step_name = "Scrape Website"
+        method = "nip_finder_v3.privacy_scraper"
         
         if not self.nip_finder_v3:
-            step.skipped = True
-            step.skip_reason = "NIPFinderV3 not available"
-            trace.add_step(step)
+            self._add_step(
+                trace, record_steps, step_name, method,
+                skipped=True,
+                skip_reason="NIPFinderV3 not available",
+            )
             return None
         
         try:
@@ -499,26 +635,26 @@ class ChaoticDataRouter:
                     result.nip,
                     result.strategy_used.value if result.strategy_used else "?",
                 )
-                step.candidates_found = 1
-                step.best_candidate = result.nip
-                step.results_count = 1
-                step.duration_ms = int((time.time() - step_start) * 1000)
-                # NIPFinderV3 cost varies
-                step.cost_usd = 0.005
-                trace.add_step(step)
+                self._add_step(
+                    trace, record_steps, step_name, method, step_start,
+                    candidates_found=1,
+                    best_candidate=result.nip,
+                    results_count=1,
+                    # NIPFinderV3 cost varies
+                    cost_usd=0.005,
+                )
                 return result.nip
             
-            step.duration_ms = int((time.time() - step_start) * 1000)
-            step.cost_usd = 0.002
-            trace.add_step(step)
+            self._add_step(trace, record_steps, step_name, method, step_start, cost_usd=0.002)
             return None
             
         except Exception as e:
             self.logger.warning("[CHAOTIC_ROUTER] Website scrape failed: %s", e)
-            step.skipped = True
-            step.skip_reason = str(e)
-            step.duration_ms = int((time.time() - step_start) * 1000)
-            trace.add_step(step)
+            self._add_step(
+                trace, record_steps, step_name, method, step_start,
+                skipped=True,
+                skip_reason=str(e),
+            )
             return None
     
     async def _validate_scraped_nip(
@@ -526,20 +662,20 @@ class ChaoticDataRouter:
         nip: str,
         parsed: ChaoticLeadParsed,
         trace: DecisionTrace,
+        record_steps: bool = True,
     ) -> Optional[NIPCandidate]:
         """Waliduje NIP znaleziony przez scraping."""
-        step_start = time.time()
-        
-        step = StrategyStep(
-            step_name="Validate Scraped NIP",
-            method="checksum + gus + domain",
-        )
+        step_start = time.perf_counter()
+        step_name = "Validate Scraped NIP"
+        method = "checksum + gus + domain"
         
         # Checksum
         if not validate_nip_checksum(nip):
-            step.skipped = True
-            step.skip_reason = "Invalid checksum"
-            trace.add_step(step)
+            self._add_step(
+                trace, record_steps, step_name, method,
+                skipped=True,
+                skip_reason="Invalid checksum",
+            )
             return None
         
         # GUS
@@ -573,13 +709,14 @@ class ChaoticDataRouter:
             domain=domain,
         )
         
-        trace.nip_candidates.append(candidate)
+        trace.add_candidate(candidate)
         
-        step.candidates_found = 1
-        step.best_candidate = nip
-        step.duration_ms = int((time.time() - step_start) * 1000)
-        step.cost_usd = 0.001
-        trace.add_step(step)
+        self._add_step(
+            trace, record_steps, step_name, method, step_start,
+            candidates_found=1,
+            best_candidate=nip,
+            cost_usd=0.001,
+        )
         
         return candidate
     
@@ -587,32 +724,35 @@ class ChaoticDataRouter:
         self,
         parsed: ChaoticLeadParsed,
         trace: DecisionTrace,
+        record_steps: bool = True,
     ) -> Optional[NIPCandidate]:
         """Szuka NIP przez Google/Brave search."""
-        step_start = time.time()
-        
-        step = StrategyStep(
-            step_name="Search for NIP",
-            method="nip_finder_v3.google_search",
-        )
+        step_start = time.perf_counter()
+        step_name = "Search for NIP"
+        method = "nip_finder_v3.google_search"
         
         if not self.nip_finder_v3:
-            step.skipped = True
-            step.skip_reason = "NIPFinderV3 not available"
-            trace.add_step(step)
+            self._add_step(
+                trace, record_steps, step_name, method,
+                skipped=True,
+                skip_reason="NIPFinderV3 not available",
+            )
             return None
         
+        query = None
         try:
             # Buduj zapytania
             queries = self.query_builder.build_nip_search_queries(parsed)
             
             if not queries:
-                step.skipped = True
-                step.skip_reason = "No search queries generated"
-                trace.add_step(step)
+                self._add_step(
+                    trace, record_steps, step_name, method,
+                    skipped=True,
+                    skip_reason="No search queries generated",
+                )
                 return None
             
-            step.query = queries[0].query  # Loguj pierwsze zapytanie
+            query = queries[0].query  # Loguj pierwsze zapytanie
             
             # Użyj NIPFinderV3 (ma wbudowany Google Search + AI validation)
             result = await self.nip_finder_v3.find_nip(
@@ -649,28 +789,30 @@ class ChaoticDataRouter:
                     source_url=result.source_url if hasattr(result, 'source_url') else None,
                 )
                 
-                trace.nip_candidates.append(candidate)
+                trace.add_candidate(candidate)
                 
-                step.candidates_found = 1
-                step.best_candidate = result.nip
-                step.results_count = 1
-                step.duration_ms = int((time.time() - step_start) * 1000)
-                step.cost_usd = 0.01  # Search + AI validation
-                trace.add_step(step)
+                self._add_step(
+                    trace, record_steps, step_name, method, step_start,
+                    query=query,
+                    candidates_found=1,
+                    best_candidate=result.nip,
+                    results_count=1,
+                    cost_usd=0.01,  # Search + AI validation
+                )
                 
                 return candidate
             
-            step.duration_ms = int((time.time() - step_start) * 1000)
-            step.cost_usd = 0.005
-            trace.add_step(step)
+            self._add_step(trace, record_steps, step_name, method, step_start, query=query, cost_usd=0.005)
             return None
             
         except Exception as e:
             self.logger.warning("[CHAOTIC_ROUTER] Search failed: %s", e)
-            step.skipped = True
-            step.skip_reason = str(e)
-            step.duration_ms = int((time.time() - step_start) * 1000)
-            trace.add_step(step)
+            self._add_step(
+                trace, record_steps, step_name, method, step_start,
+                query=query,
+                skipped=True,
+                skip_reason=str(e),
+            )
             return None
     
     async def _find_website_for_nip(
@@ -678,14 +820,12 @@ class ChaoticDataRouter:
         parsed: ChaoticLeadParsed,
         candidate: NIPCandidate,
         trace: DecisionTrace,
+        record_steps: bool = True,
     ) -> None:
         """Szuka strony WWW dla zaakceptowanego NIP."""
-        step_start = time.time()
-        
-        step = StrategyStep(
-            step_name="Find Website",
-            method="search",
-        )
+        step_start = time.perf_counter()
+        step_name = "Find Website"
+        method = "search"
         
         # Buduj zapytania
         queries = self.query_builder.build_website_search_queries(
@@ -695,28 +835,19 @@ class ChaoticDataRouter:
         )
         
         if not queries:
-            step.skipped = True
-            step.skip_reason = "No queries"
-            trace.add_step(step)
+            self._add_step(
+                trace, record_steps, step_name, method,
+                skipped=True,
+                skip_reason="No queries",
+            )
             return
         
-        step.query = queries[0].query
-        
         # TODO: Implementacja wyszukiwania WWW
         # Na razie placeholder - zostawiamy bez WWW
         
-        step.duration_ms = int((time.time() - step_start) * 1000)
-        trace.add_step(step)
+        self._add_step(trace, record_steps, step_name, method, step_start, query=queries[0].query)
     
     def _get_best_suspect(self, trace: DecisionTrace) -> Optional[NIPCandidate]:
         """Zwraca najlepszego kandydata ze statusem SUSPECT."""
-        suspects = [
-            c for c in trace.nip_candidates
-            if c.decision == CandidateDecision.SUSPECT
-        ]
-        
-        if not suspects:
-            return None
-        
-        # Sortuj po total_score
-        return max(suspects, key=lambda c: c.total_score)
+        # Śledzony na bieżąco w DecisionTrace.add_candidate()
+        return trace.best_suspect
@@ -5,73 +5,113 @@ Wszystkie ustawienia ładowane z .env lub wartości domyślne.
 """
 
 import os
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Optional
-from pydantic_settings import BaseSettings
-from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import Field, PrivateAttr, model_validator
+
+
+# Wartości credentials traktowane jako placeholdery (np. z .env.example)
+_PLACEHOLDERS = ("your-", "xxx", "placeholder", "changeme")
+
+# Bazowe URL-e Zoho per region
+_ZOHO_API_BASE = MappingProxyType({
+    "eu": "https://www.zohoapis.eu",
+    "com": "https://www.zohoapis.com",
+    "in": "https://www.zohoapis.in",
+    "jp": "https://www.zohoapis.jp",
+    "au": "https://www.zohoapis.com.au",
+    "ca": "https://www.zohoapis.ca",
+})
+
+_ZOHO_OAUTH_BASE = MappingProxyType({
+    "eu": "https://accounts.zoho.eu",
+    "com": "https://accounts.zoho.com",
+    "in": "https://accounts.zoho.in",
+    "jp": "https://accounts.zoho.jp",
+    "au": "https://accounts.zoho.com.au",
+    "ca": "https://accounts.zoho.ca",
+})
 
 
 class CompanyIntelSettings(BaseSettings):
     """Ustawienia dla Company Intelligence Tool."""
     
-    # === APIFY ===
-    apify_api_token: Optional[str] = Field(None, alias="APIFY_API_TOKEN")
-    apify_google_maps_actor_id: str = Field(
-        "compass/crawler-google-places",
-        alias="APIFY_GOOGLE_MAPS_ACTOR_ID"
-    )
-    apify_facebook_actor_id: str = Field(
-        "apify/facebook-pages-scraper",
-        alias="APIFY_FACEBOOK_ACTOR_ID"
-    )
-    apify_instagram_actor_id: str = Field(
-        "apify/instagram-profile-scraper",
-        alias="APIFY_INSTAGRAM_ACTOR_ID"
+    # Zmienne środowiskowe = nazwa pola WIELKIMI LITERAMI (np. APIFY_API_TOKEN)
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+        alias_generator=str.upper,
+        populate_by_name=True,
     )
-    apify_tiktok_actor_id: str = Field(
-        "clockworks/tiktok-scraper",
-        alias="APIFY_TIKTOK_ACTOR_ID"
-    )
-    apify_actor_timeout_sec: int = Field(300, alias="APIFY_ACTOR_TIMEOUT_SEC")
+    
+    # === APIFY ===
+    apify_api_token: Optional[str] = None
+    apify_google_maps_actor_id: str = "compass/crawler-google-places"
+    apify_facebook_actor_id: str = "apify/facebook-pages-scraper"
+    apify_instagram_actor_id: str = "apify/instagram-profile-scraper"
+    apify_tiktok_actor_id: str = "clockworks/tiktok-scraper"
+    apify_actor_timeout_sec: int = 300
+    apify_social_max_concurrent: int = 4  # Maks. równoległych runów per platforma social (FB/IG/TikTok)
+    # Google Maps po nazwie startuje od razu, równolegle ze scrapingiem strony WWW - krótszy czas,
+    # ale run Apify jest płatny także gdy analiza przerwie się wcześniej (wyłączone domyślnie)
+    apify_speculative_maps: bool = False
     
     # === VERTEX AI ===
-    vertex_ai_model: str = Field("gemini-2.5-pro", alias="VERTEX_AI_MODEL")
-    gcp_project_id: Optional[str] = Field(None, alias="GCP_PROJECT_ID")
-    gcp_region: str = Field("europe-central2", alias="GCP_REGION")
+    vertex_ai_model: str = "gemini-2.5-pro"
+    gcp_project_id: Optional[str] = None
+    gcp_region: str = "europe-central2"
+    vertex_ai_max_concurrent: int = 5  # Maks. liczba równoległych wywołań modelu (na analyzer)
+    ai_min_page_text_chars: int = 100  # Krótszy tekst strony (np. "w budowie") - bez kategoryzacji AI
+    ai_max_page_text_chars: int = 5000  # Dłuższy tekst strony jest przycinany przed kategoryzacją AI
     
     # === GUS API ===
     gus_api_key: Optional[str] = Field(None, alias="REGON_API_KEY_TOKEN")
     
     # === ZOHO CRM ===
-    zoho_client_id: str = Field("", alias="ZOHO_CLIENT_ID")
-    zoho_client_secret: str = Field("", alias="ZOHO_CLIENT_SECRET")
-    zoho_refresh_token: str = Field("", alias="ZOHO_REFRESH_TOKEN")
-    zoho_md_crm_leady_crud_client_id: str = Field("", alias="ZOHO_MD_CRM_LEADY_CRUD_CLIENT_ID")
-    zoho_md_crm_leady_crud_client_secret: str = Field("", alias="ZOHO_MD_CRM_LEADY_CRUD_CLIENT_SECRET")
-    zoho_md_crm_leady_crud_refresh_token: str = Field("", alias="ZOHO_MD_CRM_LEADY_CRUD_REFRESH_TOKEN")
-    zoho_region: str = Field("eu", alias="ZOHO_REGION")
+    zoho_client_id: str = ""
+    zoho_client_secret: str = ""
+    zoho_refresh_token: str = ""
+    zoho_md_crm_leady_crud_client_id: str = ""
+    zoho_md_crm_leady_crud_client_secret: str = ""
+    zoho_md_crm_leady_crud_refresh_token: str = ""
+    zoho_region: str = "eu"
+    
+    # === NIP LOOKUP ===
+    # Google po NIP (Apify) startuje równolegle z GUS - krótszy czas przy braku w GUS,
+    # ale run Apify jest płatny także gdy GUS znajdzie firmę (wyłączone domyślnie)
+    nip_speculative_google: bool = False
+    # Maks. liczba równoległych runów Apify Google Search na instancję NIPLookup
+    nip_apify_concurrency: int = 5
     
     # === TIMEOUTS ===
-    request_timeout_sec: int = Field(30, alias="REQUEST_TIMEOUT_SEC")
-    scraper_timeout_sec: int = Field(60, alias="SCRAPER_TIMEOUT_SEC")
+    request_timeout_sec: int = 30
+    scraper_timeout_sec: int = 60
     
     # === LOGGING ===
-    log_level: str = Field("INFO", alias="LOG_LEVEL")
-    log_inputs_outputs: bool = Field(True, alias="LOG_INPUTS_OUTPUTS")
+    log_level: str = "INFO"
+    log_inputs_outputs: bool = True
     
     # === CACHE ===
-    cache_enabled: bool = Field(True, alias="CACHE_ENABLED")
-    cache_ttl_days_social: int = Field(7, alias="CACHE_TTL_DAYS_SOCIAL")
-    cache_ttl_days_categorization: int = Field(30, alias="CACHE_TTL_DAYS_CATEGORIZATION")
-    cache_db_path: str = Field("company_intel/cache.db", alias="CACHE_DB_PATH")
+    cache_enabled: bool = True
+    cache_ttl_days_social: int = 7
+    cache_ttl_days_categorization: int = 30
+    cache_db_path: str = "company_intel/cache.db"
     
     # === SCORING ===
-    score_google_maps_rating_threshold: float = Field(4.5)
-    score_google_maps_reviews_threshold: int = Field(50)
-    score_facebook_followers_threshold: int = Field(1000)
-    score_instagram_followers_threshold: int = Field(500)
+    score_google_maps_rating_threshold: float = 4.5
+    score_google_maps_reviews_threshold: int = 50
+    score_facebook_followers_threshold: int = 1000
+    score_instagram_followers_threshold: int = 500
     
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
+    # Wynik sprawdzenia credentials Zoho (liczony raz w walidatorze)
+    _zoho_ok: bool = PrivateAttr(default=False)
+    
+    @model_validator(mode="after")
+    def resolve_zoho_aliases(self):
+        """Rozwiązuje aliasy Zoho po załadowaniu wszystkich wartości."""
         # Zoho: priorytet ZOHO_MD_CRM_* > ZOHO_*
         if not self.zoho_client_id or self.zoho_client_id.startswith("your-"):
             self.zoho_client_id = self.zoho_md_crm_leady_crud_client_id or ""
@@ -79,6 +119,13 @@ class CompanyIntelSettings(BaseSettings):
             self.zoho_client_secret = self.zoho_md_crm_leady_crud_client_secret or ""
         if not self.zoho_refresh_token or self.zoho_refresh_token.startswith("your-"):
             self.zoho_refresh_token = self.zoho_md_crm_leady_crud_refresh_token or ""
+        
+        self._zoho_ok = bool(self.zoho_refresh_token) and not any(
+            p in val.lower()
+            for val in (self.zoho_client_id, self.zoho_client_secret, self.zoho_refresh_token)
+            for p in _PLACEHOLDERS
+        )
+        return self
     
     @property
     def has_apify_credentials(self) -> bool:
@@ -93,60 +140,26 @@ class CompanyIntelSettings(BaseSettings):
     @property
     def has_zoho_credentials(self) -> bool:
         """Sprawdza czy mamy credentials do Zoho CRM."""
-        if not self.zoho_refresh_token:
-            return False
-        placeholders = ["your-", "xxx", "placeholder", "changeme"]
-        for val in [self.zoho_client_id, self.zoho_client_secret, self.zoho_refresh_token]:
-            if any(p in val.lower() for p in placeholders):
-                return False
-        return True
+        return self._zoho_ok
     
     @property
     def zoho_api_base(self) -> str:
         """Zwraca bazowy URL API Zoho dla danego regionu."""
-        region_map = {
-            "eu": "https://www.zohoapis.eu",
-            "com": "https://www.zohoapis.com",
-            "in": "https://www.zohoapis.in",
-            "jp": "https://www.zohoapis.jp",
-            "au": "https://www.zohoapis.com.au",
-            "ca": "https://www.zohoapis.ca",
-        }
-        return region_map.get(self.zoho_region, region_map["eu"])
+        return _ZOHO_API_BASE.get(self.zoho_region, _ZOHO_API_BASE["eu"])
     
     @property
     def zoho_oauth_base(self) -> str:
         """Zwraca bazowy URL OAuth Zoho dla danego regionu."""
-        region_map = {
-            "eu": "https://accounts.zoho.eu",
-            "com": "https://accounts.zoho.com",
-            "in": "https://accounts.zoho.in",
-            "jp": "https://accounts.zoho.jp",
-            "au": "https://accounts.zoho.com.au",
-            "ca": "https://accounts.zoho.ca",
-        }
-        return region_map.get(self.zoho_region, region_map["eu"])
-    
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        extra = "ignore"
-
-
-# Singleton dla ustawień
-_settings: Optional[CompanyIntelSettings] = None
+        return _ZOHO_OAUTH_BASE.get(self.zoho_region, _ZOHO_OAUTH_BASE["eu"])
 
 
+@lru_cache
 def get_settings() -> CompanyIntelSettings:
-    """Zwraca singleton ustawień."""
-    global _settings
-    if _settings is None:
-        _settings = CompanyIntelSettings()
-    return _settings
+    """Singleton dla ustawień - cachowane przy pierwszym wywołaniu."""
+    return CompanyIntelSettings()
 
 
 def reload_settings() -> CompanyIntelSettings:
     """Przeładowuje ustawienia (przydatne w testach)."""
-    global _settings
-    _settings = CompanyIntelSettings()
-    return _settings
+    get_settings.cache_clear()
+    return get_settings()
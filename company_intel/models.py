@@ -4,10 +4,12 @@ Modele danych dla Company Intelligence Tool.
 Struktura JSON odpowiadająca polom Zoho CRM.
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Optional, Any
-from pydantic import BaseModel, Field
+from functools import cached_property
+from pathlib import Path
+from typing import Iterable, Optional, Any, Union
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, TypeAdapter, field_serializer
 
 
 # === ENUMS ===
@@ -93,73 +95,84 @@ class SocialPlatform(str, Enum):
     GOOGLE_MAPS = "google_maps"
 
 
+def utc_now() -> datetime:
+    """Aktualny czas UTC (timezone-aware)."""
+    return datetime.now(timezone.utc)
+
+
+# Prefiksy które NIE są ulicami
+_NON_STREET_PREFIXES = (
+    "al.", "al ", "aleja", "alei",
+    "pl.", "pl ", "plac", "placu",
+    "os.", "os ", "osiedle", "osiedla",
+    "rondo", "ronda",
+    "park", "parku",
+    "skwer", "skweru",
+    "bulwar", "bulwaru",
+    "pasaż", "pasażu",
+    "szosa", "szosy",
+    "droga", "drogi",
+    "most", "mostu",
+    "wyspa", "wyspy",
+    "wybrzeże", "wybrzeża",
+    "trakt", "traktu",
+    "gen.", "gen ",  # Aleja Gen. Sikorskiego
+    "ks.", "ks ",  # Księdza
+    "św.", "św ",  # Świętego
+    "zgrupowania",  # Zgrupowania AK
+)
+
+# Prefiks "ul." (już sformatowane) + prefiksy nie-ulic - jedno wywołanie startswith
+_SKIP_UL_PREFIXES = ("ul.", "ul ") + _NON_STREET_PREFIXES
+
+
+# Pola pomijane w eksporcie CompanyIntel (surowe dane z API, NIP z Zoho)
+_COMPANY_EXPORT_EXCLUDE = {
+    "social_profiles": {"__all__": {"raw_data"}},
+    "placowki": {"__all__": {"zoho_match": {"nip"}}},
+}
+
+
 # === MODELE DANYCH ===
 
 class Kontakt(BaseModel):
     """Pojedynczy kontakt (telefon/email)."""
+    model_config = ConfigDict(frozen=True)
+    
     typ: str = Field(..., description="Typ kontaktu: 'telefon' lub 'email'")
     wartosc: str = Field(..., description="Wartość kontaktu")
     opis: Optional[str] = Field(None, description="Opis kontaktu, np. 'Rejestracja'")
-    
-    def to_dict(self) -> dict:
-        return {"typ": self.typ, "wartosc": self.wartosc, "opis": self.opis}
 
 
 class Adres(BaseModel):
     """Adres placówki."""
+    model_config = ConfigDict(frozen=True)
+    
     ulica: Optional[str] = Field(None, description="Ulica z numerem")
     kod: Optional[str] = Field(None, description="Kod pocztowy")
     miasto: Optional[str] = Field(None, description="Miasto")
     wojewodztwo: Optional[str] = Field(None, description="Województwo")
     
-    # Prefiksy które NIE są ulicami
-    _NON_STREET_PREFIXES = (
-        "al.", "al ", "aleja", "alei",
-        "pl.", "pl ", "plac", "placu",
-        "os.", "os ", "osiedle", "osiedla",
-        "rondo", "ronda",
-        "park", "parku",
-        "skwer", "skweru",
-        "bulwar", "bulwaru",
-        "pasaż", "pasażu",
-        "szosa", "szosy",
-        "droga", "drogi",
-        "most", "mostu",
-        "wyspa", "wyspy",
-        "wybrzeże", "wybrzeża",
-        "trakt", "traktu",
-        "gen.", "gen ",  # Aleja Gen. Sikorskiego
-        "ks.", "ks ",  # Księdza
-        "św.", "św ",  # Świętego
-        "zgrupowania",  # Zgrupowania AK
-    )
-    
     def _format_ulica(self) -> Optional[str]:
         """Formatuje ulicę z prefiksem 'ul.' jeśli to ulica."""
         if not self.ulica:
             return None
         
-        ulica_lower = self.ulica.lower().strip()
-        
-        # Jeśli już ma prefiks "ul." - nie dodawaj
-        if ulica_lower.startswith("ul.") or ulica_lower.startswith("ul "):
+        # Już ma prefiks "ul." albo to nie jest ulica (aleja, plac, etc.) - nie dodawaj
+        if self._ulica_lower.startswith(_SKIP_UL_PREFIXES):
             return self.ulica
         
-        # Jeśli to nie jest ulica (aleja, plac, etc.) - nie dodawaj
-        for prefix in self._NON_STREET_PREFIXES:
-            if ulica_lower.startswith(prefix):
-                return self.ulica
-        
         # To jest ulica - dodaj "ul."
         return f"ul. {self.ulica}"
     
-    def to_dict(self) -> dict:
-        return {
-            "ulica": self._format_ulica(),
-            "kod": self.kod,
-            "miasto": self.miasto,
-            "wojewodztwo": self.wojewodztwo,
-        }
+    @cached_property
+    def _ulica_lower(self) -> str:
+        """Ulica małymi literami (liczona raz - model jest zamrożony)."""
+        return (self.ulica or "").lower().lstrip()
+    
+    @field_serializer("ulica")
+    def serialize_ulica(self, ulica: Optional[str]) -> Optional[str]:
+        return self._format_ulica()
     
     def __str__(self) -> str:
         parts = [p for p in [self.ulica, self.kod, self.miasto] if p]
@@ -168,29 +181,21 @@ class Adres(BaseModel):
 
 class Coordinates(BaseModel):
     """Współrzędne GPS (WGS84)."""
+    model_config = ConfigDict(frozen=True)
+    
     lat: float = Field(..., description="Latitude (szerokość geograficzna)")
     lng: float = Field(..., description="Longitude (długość geograficzna)")
-    
-    def to_dict(self) -> dict:
-        return {"lat": self.lat, "lng": self.lng}
 
 
 class ReviewCitation(BaseModel):
     """Pojedynczy cytat z recenzji jako dowód."""
+    model_config = ConfigDict(frozen=True)
+    
     text: str = Field(..., description="Fragment recenzji (cytat)")
     date: Optional[str] = Field(None, description="Data recenzji (ISO lub 'X dni temu')")
     author: Optional[str] = Field(None, description="Autor recenzji")
     rating: Optional[int] = Field(None, description="Ocena w gwiazdkach (1-5)")
     review_url: Optional[str] = Field(None, description="Link do recenzji")
-    
-    def to_dict(self) -> dict:
-        return {
-            "text": self.text,
-            "date": self.date,
-            "author": self.author,
-            "rating": self.rating,
-            "review_url": self.review_url,
-        }
 
 
 class InsightWithCitations(BaseModel):
@@ -198,13 +203,6 @@ class InsightWithCitations(BaseModel):
     insight: str = Field(..., description="Treść skargi/pochwały")
     count: int = Field(1, description="Liczba recenzji wspierających tę skargę/pochwałę")
     citations: list[ReviewCitation] = Field(default_factory=list, description="Cytaty z recenzji (max 3)")
-    
-    def to_dict(self) -> dict:
-        return {
-            "insight": self.insight,
-            "count": self.count,
-            "citations": [c.to_dict() for c in self.citations],
-        }
 
 
 class ReviewsInsights(BaseModel):
@@ -224,17 +222,6 @@ class ReviewsInsights(BaseModel):
     
     # Confidence oparte na liczbie recenzji
     confidence: float = Field(0.0, ge=0.0, le=1.0, description="Pewność analizy (0-1)")
-    
-    def to_dict(self) -> dict:
-        return {
-            "total_reviews_analyzed": self.total_reviews_analyzed,
-            "avg_rating": self.avg_rating,
-            "top_complaints": [c.to_dict() for c in self.top_complaints],
-            "top_praises": [p.to_dict() for p in self.top_praises],
-            "common_themes": self.common_themes,
-            "summary": self.summary,
-            "confidence": self.confidence,
-        }
 
 
 class StatusKlienta(str, Enum):
@@ -258,20 +245,6 @@ class ZohoMatch(BaseModel):
     parent_id: Optional[str] = Field(None, description="ID rodzica (dla filii)")
     parent_name: Optional[str] = Field(None, description="Nazwa rodzica")
     match_reason: Optional[str] = Field(None, description="Powód dopasowania (NIP, adres, domena)")
-    
-    def to_dict(self) -> dict:
-        return {
-            "found": self.found,
-            "zoho_id": self.zoho_id,
-            "zoho_name": self.zoho_name,
-            "status_klienta": self.status_klienta,
-            "adres_w_rekordzie": self.adres_w_rekordzie,
-            "is_siedziba": self.is_siedziba,
-            "is_filia": self.is_filia,
-            "parent_id": self.parent_id,
-            "parent_name": self.parent_name,
-            "match_reason": self.match_reason,
-        }
 
 
 class Placowka(BaseModel):
@@ -288,22 +261,6 @@ class Placowka(BaseModel):
     google_reviews_count: Optional[int] = Field(None, description="Liczba recenzji Google")
     reviews_insights: Optional[ReviewsInsights] = Field(None, description="Insights z recenzji")
     zoho_match: Optional[ZohoMatch] = Field(None, description="Dopasowanie w Zoho CRM")
-    
-    def to_dict(self) -> dict:
-        return {
-            "nazwa_placowki": self.nazwa_placowki,
-            "is_siedziba": self.is_siedziba,
-            "typ_adresu": self.typ_adresu.value if self.typ_adresu else None,
-            "adres": self.adres.to_dict(),
-            "kontakty": [k.to_dict() for k in self.kontakty],
-            "godziny_otwarcia": self.godziny_otwarcia,
-            "coordinates": self.coordinates.to_dict() if self.coordinates else None,
-            "google_maps_place_id": self.google_maps_place_id,
-            "google_rating": self.google_rating,
-            "google_reviews_count": self.google_reviews_count,
-            "reviews_insights": self.reviews_insights.to_dict() if self.reviews_insights else None,
-            "zoho_match": self.zoho_match.to_dict() if self.zoho_match else None,
-        }
 
 
 class SocialProfile(BaseModel):
@@ -316,19 +273,7 @@ class SocialProfile(BaseModel):
     last_post_date: Optional[datetime] = Field(None, description="Data ostatniego posta")
     is_verified: bool = Field(False, description="Czy profil zweryfikowany")
     is_ads_active: Optional[bool] = Field(None, description="Czy reklamy aktywne (FB)")
-    raw_data: dict = Field(default_factory=dict, description="Surowe dane z API")
-    
-    def to_dict(self) -> dict:
-        return {
-            "platform": self.platform.value,
-            "url": self.url,
-            "followers": self.followers,
-            "posts_count": self.posts_count,
-            "avg_engagement": self.avg_engagement,
-            "last_post_date": self.last_post_date.isoformat() if self.last_post_date else None,
-            "is_verified": self.is_verified,
-            "is_ads_active": self.is_ads_active,
-        }
+    raw_data: Optional[dict] = Field(None, description="Surowe dane z API")
 
 
 class ActivityScore(BaseModel):
@@ -346,14 +291,6 @@ class ActivityScore(BaseModel):
         default_factory=list, 
         description="Lista sygnałów aktywności"
     )
-    
-    def to_dict(self) -> dict:
-        return {
-            "total": self.total,
-            "recommendation": self.recommendation.value,
-            "breakdown": self.breakdown,
-            "signals": self.signals,
-        }
 
 
 class KategoryzacjaAI(BaseModel):
@@ -366,18 +303,6 @@ class KategoryzacjaAI(BaseModel):
     branza: Optional[str] = Field(None, description="Branża (jeśli nie podmiot leczniczy)")
     ai_confidence: float = Field(0.0, ge=0.0, le=1.0, description="Pewność AI")
     ai_reasoning: Optional[str] = Field(None, description="Uzasadnienie AI")
-    
-    def to_dict(self) -> dict:
-        return {
-            "platnik_uslug": self.platnik_uslug,
-            "specjalizacja": self.specjalizacja,
-            "wielospecjalistyczne": self.wielospecjalistyczne,
-            "typ_wlasnosci": self.typ_wlasnosci,
-            "kategoria_konta": self.kategoria_konta,
-            "branza": self.branza,
-            "ai_confidence": self.ai_confidence,
-            "ai_reasoning": self.ai_reasoning,
-        }
 
 
 class SocialMediaLinks(BaseModel):
@@ -389,22 +314,12 @@ class SocialMediaLinks(BaseModel):
     tiktok: Optional[str] = Field(None, description="TikTok")
     x: Optional[str] = Field(None, description="X/Twitter")
     
-    def to_dict(self) -> dict:
-        return {
-            "website": self.website,
-            "facebook": self.facebook,
-            "instagram": self.instagram,
-            "linkedin": self.linkedin,
-            "tiktok": self.tiktok,
-            "x": self.x,
-        }
-    
     def has_any(self) -> bool:
         """Sprawdza czy jest jakikolwiek link."""
-        return any([
-            self.website, self.facebook, self.instagram, 
-            self.linkedin, self.tiktok, self.x
-        ])
+        return bool(
+            self.website or self.facebook or self.instagram
+            or self.linkedin or self.tiktok or self.x
+        )
 
 
 class DataValidation(BaseModel):
@@ -413,36 +328,18 @@ class DataValidation(BaseModel):
     contacts_discrepancies: list[str] = Field(default_factory=list, description="Lista niespójności w kontaktach")
     address_match: bool = Field(True, description="Czy adresy się zgadzają")
     address_discrepancies: list[str] = Field(default_factory=list, description="Lista niespójności w adresach")
-    
-    def to_dict(self) -> dict:
-        return {
-            "contacts_match": self.contacts_match,
-            "contacts_discrepancies": self.contacts_discrepancies,
-            "address_match": self.address_match,
-            "address_discrepancies": self.address_discrepancies,
-        }
 
 
 class Metadata(BaseModel):
     """Metadane przetwarzania."""
-    scraped_at: datetime = Field(default_factory=datetime.utcnow)
+    scraped_at: datetime = Field(default_factory=utc_now)
     sources_used: list[str] = Field(default_factory=list, description="Użyte źródła")
     processing_time_ms: int = Field(0, description="Czas przetwarzania w ms")
+    step_timings_ms: dict[str, int] = Field(default_factory=dict, description="Czas oczekiwania na kroki analizy w ms (krok -> suma)")
     cost_usd: float = Field(0.0, description="Koszt w USD")
     errors: list[str] = Field(default_factory=list, description="Błędy")
     warnings: list[str] = Field(default_factory=list, description="Ostrzeżenia")
     data_validation: Optional[DataValidation] = Field(None, description="Wyniki cross-validation")
-    
-    def to_dict(self) -> dict:
-        return {
-            "scraped_at": self.scraped_at.isoformat(),
-            "sources_used": self.sources_used,
-            "processing_time_ms": self.processing_time_ms,
-            "cost_usd": self.cost_usd,
-            "errors": self.errors,
-            "warnings": self.warnings,
-            "data_validation": self.data_validation.to_dict() if self.data_validation else None,
-        }
 
 
 class CompanyIntel(BaseModel):
@@ -492,36 +389,55 @@ class CompanyIntel(BaseModel):
         description="Metadane przetwarzania"
     )
     
+    @classmethod
+    def new_batch(
+        cls,
+        records: Iterable[Union[dict, "CompanyIntel"]],
+        now: Optional[datetime] = None,
+    ) -> list["CompanyIntel"]:
+        """
+        Tworzy wiele CompanyIntel ze wspólnym znacznikiem czasu (tryb bulk).
+        
+        Args:
+            records: Dane kolejnych firm (kwargs dla CompanyIntel, bez metadata)
+                albo gotowe CompanyIntel (np. wyniki analiz z jednego przebiegu) -
+                zwracana jest ich płytka kopia z nowym Metadata (pozostałe pola
+                metadanych bez zmian)
+            now: Wspólny scraped_at (domyślnie aktualny czas UTC)
+        """
+        scraped_at = now or utc_now()
+        batch = []
+        for record in records:
+            if isinstance(record, CompanyIntel):
+                metadata = record.metadata.model_copy(update={"scraped_at": scraped_at})
+                batch.append(record.model_copy(update={"metadata": metadata}))
+            else:
+                batch.append(cls(metadata=Metadata(scraped_at=scraped_at), **record))
+        return batch
+    
     def to_dict(self) -> dict:
         """Konwertuje do dict (JSON-serializable)."""
-        return {
-            "company": {
-                # Dane rejestrowe
-                "nip": self.nip,
-                "regon": self.regon,
-                "krs": self.krs,
-                "nazwa_pelna": self.nazwa_pelna,
-                "nazwa_zwyczajowa": self.nazwa_zwyczajowa,
-                "adres_siedziby": self.adres_siedziby.to_dict() if self.adres_siedziby else None,
-                # Kategoryzacja i social
-                "kategoryzacja_ai": self.kategoryzacja_ai.to_dict(),
-            "social_media": self.social_media.to_dict(),
-            "social_profiles": [p.to_dict() for p in self.social_profiles],
-            "activity_score": self.activity_score.to_dict(),
-                "placowki": [p.to_dict() for p in self.placowki],
-                "metadata": self.metadata.to_dict(),
-            }
-        }
+        return {"company": self.model_dump(mode="json", exclude=_COMPANY_EXPORT_EXCLUDE)}
+    
+    def _dump_json_bytes(self, indent: int) -> bytes:
+        """Serializuje {"company": ...} prosto do bajtów UTF-8 (bez pośredniego dict)."""
+        return _COMPANY_EXPORT_ADAPTER.dump_json(
+            {"company": self},
+            indent=indent,
+            exclude={"company": _COMPANY_EXPORT_EXCLUDE},
+        )
     
     def to_json(self, indent: int = 2) -> str:
         """Konwertuje do JSON string."""
-        import json
-        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+        return self._dump_json_bytes(indent).decode("utf-8")
     
     def save_json(self, path: str) -> None:
         """Zapisuje do pliku JSON."""
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(self.to_json())
+        Path(path).write_bytes(self._dump_json_bytes(indent=2))
+
+
+# Serializer eksportu {"company": ...} - jedno przejście pydantic-core
+_COMPANY_EXPORT_ADAPTER = TypeAdapter(dict[str, CompanyIntel])
 
 
 # === INPUT MODELS ===
@@ -535,13 +451,7 @@ class CompanyIntelRequest(BaseModel):
     social_links: Optional[SocialMediaLinks] = Field(None, description="Znane linki social")
     
     def to_dict(self) -> dict:
-        return {
-            "company_name": self.company_name,
-            "nip": self.nip,
-            "city": self.city,
-            "website": self.website,
-            "social_links": self.social_links.to_dict() if self.social_links else None,
-        }
+        return self.model_dump(mode="json")
 
 
 # === CHAOTIC DATA PROCESSING MODELS ===
@@ -592,22 +502,7 @@ class ChaoticLeadParsed(BaseModel):
     strongest_signal: Optional[SignalStrength] = Field(None, description="Najsilniejszy sygnał")
     
     def to_dict(self) -> dict:
-        return {
-            "raw_text": self.raw_text,
-            "nip": self.nip,
-            "regon": self.regon,
-            "krs": self.krs,
-            "website": self.website,
-            "email": self.email,
-            "phone": self.phone,
-            "city": self.city,
-            "street": self.street,
-            "name": self.name,
-            "short_name": self.short_name,
-            "keywords": self.keywords,
-            "confidence": self.confidence,
-            "strongest_signal": self.strongest_signal.value if self.strongest_signal else None,
-        }
+        return self.model_dump(mode="json")
     
     def has_hard_id(self) -> bool:
         """Czy ma twarde identyfikatory (NIP/REGON/KRS)."""
@@ -651,13 +546,7 @@ class CandidateEvidence(BaseModel):
     details: Optional[str] = Field(None, description="Szczegóły")
     
     def to_dict(self) -> dict:
-        return {
-            "evidence_type": self.evidence_type.value,
-            "source": self.source,
-            "value": self.value,
-            "score": self.score,
-            "details": self.details,
-        }
+        return self.model_dump(mode="json")
 
 
 class NIPCandidate(BaseModel):
@@ -683,19 +572,7 @@ class NIPCandidate(BaseModel):
     gus_street: Optional[str] = Field(None, description="Ulica z GUS")
     
     def to_dict(self) -> dict:
-        return {
-            "nip": self.nip,
-            "score_id": self.score_id,
-            "score_match": self.score_match,
-            "score_source": self.score_source,
-            "total_score": self.total_score,
-            "evidences": [e.to_dict() for e in self.evidences],
-            "decision": self.decision.value,
-            "decision_reason": self.decision_reason,
-            "gus_name": self.gus_name,
-            "gus_city": self.gus_city,
-            "gus_street": self.gus_street,
-        }
+        return self.model_dump(mode="json")
     
     def add_evidence(self, evidence: CandidateEvidence) -> None:
         """Dodaje dowód i aktualizuje scoring."""
@@ -741,13 +618,7 @@ class WebsiteCandidate(BaseModel):
     nip_on_page: Optional[str] = Field(None, description="NIP znaleziony na stronie")
     
     def to_dict(self) -> dict:
-        return {
-            "url": self.url,
-            "domain": self.domain,
-            "total_score": self.total_score,
-            "evidences": [e.to_dict() for e in self.evidences],
-            "nip_on_page": self.nip_on_page,
-        }
+        return self.model_dump(mode="json")
 
 
 class StrategyStep(BaseModel):
@@ -764,18 +635,7 @@ class StrategyStep(BaseModel):
     skip_reason: Optional[str] = Field(None, description="Powód pominięcia")
     
     def to_dict(self) -> dict:
-        return {
-            "step_name": self.step_name,
-            "method": self.method,
-            "query": self.query,
-            "results_count": self.results_count,
-            "candidates_found": self.candidates_found,
-            "best_candidate": self.best_candidate,
-            "duration_ms": self.duration_ms,
-            "cost_usd": self.cost_usd,
-            "skipped": self.skipped,
-            "skip_reason": self.skip_reason,
-        }
+        return self.model_dump(mode="json")
 
 
 class DecisionTrace(BaseModel):
@@ -802,19 +662,11 @@ class DecisionTrace(BaseModel):
     total_duration_ms: int = Field(0, description="Całkowity czas")
     total_cost_usd: float = Field(0.0, description="Całkowity koszt")
     
+    # Najlepszy SUSPECT aktualizowany przy add_candidate() (bez skanowania listy)
+    _best_suspect: Optional[NIPCandidate] = PrivateAttr(default=None)
+    
     def to_dict(self) -> dict:
-        return {
-            "input_raw": self.input_raw,
-            "input_parsed": self.input_parsed.to_dict() if self.input_parsed else None,
-            "steps": [s.to_dict() for s in self.steps],
-            "nip_candidates": [c.to_dict() for c in self.nip_candidates],
-            "website_candidates": [w.to_dict() for w in self.website_candidates],
-            "final_nip": self.final_nip,
-            "final_nip_decision": self.final_nip_decision.value if self.final_nip_decision else None,
-            "final_website": self.final_website,
-            "total_duration_ms": self.total_duration_ms,
-            "total_cost_usd": self.total_cost_usd,
-        }
+        return self.model_dump(mode="json")
     
     def add_step(self, step: StrategyStep) -> None:
         """Dodaje krok i aktualizuje metadane."""
@@ -822,6 +674,21 @@ class DecisionTrace(BaseModel):
         self.total_duration_ms += step.duration_ms
         self.total_cost_usd += step.cost_usd
     
+    def add_candidate(self, candidate: NIPCandidate) -> None:
+        """Dodaje kandydata NIP i aktualizuje najlepszego SUSPECT w O(1)."""
+        self.nip_candidates.append(candidate)
+        
+        if candidate.decision == CandidateDecision.SUSPECT and (
+            self._best_suspect is None
+            or candidate.total_score > self._best_suspect.total_score
+        ):
+            self._best_suspect = candidate
+    
+    @property
+    def best_suspect(self) -> Optional[NIPCandidate]:
+        """Najlepszy kandydat SUSPECT (najwyższy total_score, pierwszy przy remisie)."""
+        return self._best_suspect
+    
     def get_accepted_nip(self) -> Optional[NIPCandidate]:
         """Zwraca zaakceptowanego kandydata NIP."""
         for candidate in self.nip_candidates:
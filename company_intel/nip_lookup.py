@@ -10,13 +10,22 @@ UWAGA: GUS lookup jest delegowany do src/services/gus_client.py
 żeby uniknąć duplikacji kodu i zapewnić re-używanie wyników.
 """
 
+import asyncio
+import copy
 import logging
+import random
 import re
-from dataclasses import dataclass
-from typing import Optional, List
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from functools import lru_cache
+from typing import Any, ClassVar, NamedTuple, Optional, List, Sequence
 from urllib.parse import urlparse
 
 import httpx
+import orjson
 
 from .config import CompanyIntelSettings, get_settings
 
@@ -31,10 +40,78 @@ except ImportError:
     get_gus_client = None
     get_src_settings = None
 
+# Trwały cache wyników wymaga aiosqlite - opcjonalny
+try:
+    from .nip_lookup_cache import NIPLookupCache
+    PERSISTENT_CACHE_AVAILABLE = True
+except ImportError:
+    NIPLookupCache = None
+    PERSISTENT_CACHE_AVAILABLE = False
+
+# HTTP/2 wymaga pakietu h2 (httpx[http2]) - opcjonalny
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Wektorowa walidacja NIP-ów w batchu (numpy przychodzi z pandas) - opcjonalna
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+# Wspólny klient HTTP dla instancji NIPLookup bez wstrzykniętego klienta (reużycie TCP+TLS)
+HTTP_POOL_LIMITS = httpx.Limits(max_keepalive_connections=50, max_connections=100, keepalive_expiry=30.0)
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+HTTP_HEADERS = {"User-Agent": "CompanyIntel/1.0"}
+
+def stateless_cookie_jar() -> CookieJar:
+    """
+    Słoik cookies, który niczego nie zapamiętuje - dla klientów współdzielonych
+    przez wiele stron/firm (cookies jednej strony nie trafiają do żądań innych).
+    Cookies odpowiedzi są nadal dostępne w response.cookies.
+    """
+    return CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+
+
+# Klient per pętla zdarzeń: klient httpx (i jego pula połączeń) jest związany z pętlą,
+# w której powstał - kolejne asyncio.run() (testy, ponowne batche) dostają nowy
+_shared_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def get_shared_http_client() -> httpx.AsyncClient:
+    """Zwraca wspólny klient HTTP bieżącej pętli (tworzony leniwie, odtwarzany po zamknięciu)."""
+    loop = asyncio.get_running_loop()
+    client = _shared_http_clients.get(loop)
+    # Bez await między sprawdzeniem a zapisem - w obrębie pętli nie ma wyścigu
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            limits=HTTP_POOL_LIMITS,
+            headers=HTTP_HEADERS,
+            http2=HTTP2_AVAILABLE,
+            cookies=stateless_cookie_jar(),
+        )
+        _shared_http_clients[loop] = client
+    return client
+
+
+async def close_shared_http_client() -> None:
+    """Zamyka wspólny klient HTTP bieżącej pętli (wywołać przy zamykaniu aplikacji/skryptu)."""
+    client = _shared_http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+@dataclass(slots=True)
 class GUSCompanyData:
     """Dane firmy z GUS."""
     nip: str
@@ -51,7 +128,7 @@ class GUSCompanyData:
     error: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class WebsiteCandidate:
     """Kandydat na stronę WWW firmy."""
     url: str
@@ -62,7 +139,7 @@ class WebsiteCandidate:
     reasoning: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class NIPLookupResult:
     """Wynik wyszukiwania po NIP."""
     nip: str
@@ -74,42 +151,325 @@ class NIPLookupResult:
     error: Optional[str] = None
     
     # WIELOKROTNE DOPASOWANIA
-    website_candidates: List[WebsiteCandidate] = None  # Wszystkie kandydatki (max 5)
+    website_candidates: List[WebsiteCandidate] = field(default_factory=list)  # Wszystkie kandydatki (max 5)
     website_confidence: float = 1.0  # Pewność wybranego website (0.0-1.0)
     website_validated: bool = False  # Czy wybrany website zawiera NIP
-    warnings: List[str] = None  # Ostrzeżenia (np. "Wiele firm o tej nazwie")
-    
-    def __post_init__(self):
-        if self.website_candidates is None:
-            self.website_candidates = []
-        if self.warnings is None:
-            self.warnings = []
+    warnings: List[str] = field(default_factory=list)  # Ostrzeżenia (np. "Wiele firm o tej nazwie")
+
 
+_NIP_NON_DIGIT = re.compile(r'\D')
+_NIP_WEIGHTS = (6, 5, 7, 2, 3, 4, 5, 6, 7)
 
+
+@lru_cache(maxsize=4096)
 def normalize_nip(nip: str) -> Optional[str]:
     """Normalizuje NIP do 10 cyfr."""
     if not nip:
         return None
     # Usuń wszystko poza cyframi
-    clean = re.sub(r'\D', '', str(nip))
+    clean = _NIP_NON_DIGIT.sub('', nip if isinstance(nip, str) else str(nip))
     if len(clean) == 10:
         return clean
     return None
 
 
+@lru_cache(maxsize=4096)
 def validate_nip_checksum(nip: str) -> bool:
     """Sprawdza sumę kontrolną NIP."""
     if not nip or len(nip) != 10:
         return False
     
-    weights = [6, 5, 7, 2, 3, 4, 5, 6, 7]
+    if nip.isascii() and nip.isdigit():
+        # Ścieżka szybka: kody ASCII bez int() per cyfra; 48 * 45 = ord('0') * suma wag
+        d = nip.encode("ascii")
+        checksum = (
+            d[0] * 6 + d[1] * 5 + d[2] * 7 + d[3] * 2 + d[4] * 3
+            + d[5] * 4 + d[6] * 5 + d[7] * 6 + d[8] * 7 - 48 * 45
+        ) % 11
+        return checksum == d[9] - 48
+    
+    # Fallback (np. cyfry spoza ASCII)
     try:
-        checksum = sum(int(nip[i]) * weights[i] for i in range(9)) % 11
+        checksum = sum(int(d) * w for d, w in zip(nip, _NIP_WEIGHTS)) % 11
         return checksum == int(nip[9])
-    except (ValueError, IndexError):
+    except ValueError:
         return False
 
 
+def validate_nip_checksum_batch(nips: Sequence[Optional[str]]) -> List[bool]:
+    """
+    Sprawdza sumy kontrolne wielu NIP-ów naraz (np. przy imporcie CSV z leadami).
+    
+    NIP-y z samych cyfr ASCII są liczone wektorowo w NumPy (jedna macierz Nx10),
+    pozostałe przechodzą przez validate_nip_checksum (bez NumPy - wszystkie).
+    """
+    if not NUMPY_AVAILABLE:
+        return [validate_nip_checksum(n) for n in nips]
+    
+    ascii_mask = [bool(n) and len(n) == 10 and n.isascii() and n.isdigit() for n in nips]
+    results = [
+        False if is_ascii else validate_nip_checksum(n)
+        for n, is_ascii in zip(nips, ascii_mask)
+    ]
+    
+    idx = [i for i, is_ascii in enumerate(ascii_mask) if is_ascii]
+    if idx:
+        buf = "".join(nips[i] for i in idx).encode("ascii")
+        digits = (np.frombuffer(buf, dtype=np.uint8).reshape(-1, 10) - ord("0")).astype(np.int32)
+        valid = (digits[:, :9] @ np.array(_NIP_WEIGHTS, dtype=np.int32)) % 11 == digits[:, 9]
+        for i, ok in zip(idx, valid.tolist()):
+            results[i] = ok
+    
+    return results
+
+
+# Apify Google Search przez HTTP API (run-sync-get-dataset-items): jedno żądanie
+# uruchamia aktora i zwraca dataset - bez blokującego SDK i wątków na czas runu
+APIFY_GOOGLE_SEARCH_URL = (
+    "https://api.apify.com/v2/acts/apify~google-search-scraper/run-sync-get-dataset-items"
+)
+APIFY_RUN_SYNC_MAX_SEC = 300  # limit oczekiwania endpointu run-sync
+
+# Ponawianie przy limitach / chwilowej niedostępności (Apify 429, zimny start GUS API na Render)
+RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+RETRY_ATTEMPTS = 4
+RETRY_MAX_DELAY_SEC = 30.0
+
+
+async def _send_with_backoff(send, what: str) -> httpx.Response:
+    """
+    Wysyła żądanie (send: bezargumentowa korutyna), ponawiając przy
+    RETRY_STATUS_CODES z wykładniczym opóźnieniem + jitter (lub Retry-After).
+    Ostatnia odpowiedź zwracana bez zmian - obsługa statusu po stronie wywołującego.
+    """
+    for attempt in range(RETRY_ATTEMPTS):
+        response = await send()
+        if response.status_code not in RETRY_STATUS_CODES or attempt == RETRY_ATTEMPTS - 1:
+            return response
+        
+        retry_after = response.headers.get("Retry-After", "")
+        delay = float(retry_after) if retry_after.isdigit() else 2 ** attempt + random.random()
+        delay = min(delay, RETRY_MAX_DELAY_SEC)
+        logger.warning(
+            "NIPLookup: %s HTTP %d - ponawiam za %.1fs (próba %d/%d)",
+            what, response.status_code, delay, attempt + 2, RETRY_ATTEMPTS,
+        )
+        await asyncio.sleep(delay)
+
+
+# Cache wyników w procesie: NIP -> (czas wygaśnięcia, wynik).
+# Retry webhooków i re-importy z CRM nie powtarzają GUS + Google.
+LOOKUP_CACHE_MAXSIZE = 10_000
+LOOKUP_CACHE_TTL_FOUND_SEC = 24 * 3600  # tylko pełne wyniki (_is_complete_result)
+LOOKUP_CACHE_TTL_NOT_FOUND_SEC = 5 * 60  # krótko - szybki retry po błędzie
+GUS_CACHE_TTL_SEC = 24 * 3600  # tylko odpowiedzi bez błędu (znaleziono / brak w GUS)
+
+_lookup_cache: "OrderedDict[str, tuple[float, NIPLookupResult]]" = OrderedDict()
+_gus_cache: "OrderedDict[str, tuple[float, GUSCompanyData]]" = OrderedDict()
+
+
+def _ttl_cache_get(cache: OrderedDict, clean_nip: str):
+    """
+    Zwraca kopię wartości z cache (LRU) lub None jeśli brak/wygasła.
+
+    Kopia - wywołujący (orchestrator, skrypty batch) modyfikują wyniki,
+    a cache jest wspólny dla wszystkich instancji NIPLookup.
+    """
+    entry = cache.get(clean_nip)
+    if entry is None:
+        return None
+    expires_at, value = entry
+    if expires_at <= time.monotonic():
+        del cache[clean_nip]
+        return None
+    cache.move_to_end(clean_nip)
+    return copy.deepcopy(value)
+
+
+def _ttl_cache_put(cache: OrderedDict, clean_nip: str, value, ttl: float) -> None:
+    """Zapisuje kopię wartości z TTL, usuwa najstarszy wpis po przekroczeniu rozmiaru."""
+    cache[clean_nip] = (time.monotonic() + ttl, copy.deepcopy(value))
+    cache.move_to_end(clean_nip)
+    if len(cache) > LOOKUP_CACHE_MAXSIZE:
+        cache.popitem(last=False)
+
+
+def _is_complete_result(result: NIPLookupResult) -> bool:
+    """
+    Czy wynik lookup() jest pełny: firma znaleziona, wyszukiwanie strony
+    zakończone ze stroną WWW, bez błędu.
+
+    Wynik GUS bez strony (np. timeout / błąd Apify) nie jest pełny - nie może
+    na długo zasłonić strony firmy.
+    """
+    return result.found and result.website is not None and result.error is None
+
+
+def _result_to_json(result: NIPLookupResult) -> str:
+    """Serializuje wynik lookup() do JSON (trwały cache)."""
+    return orjson.dumps(result).decode()
+
+
+def _result_from_json(data: str) -> NIPLookupResult:
+    """Odtwarza wynik lookup() z JSON zapisanego przez _result_to_json."""
+    fields = orjson.loads(data)
+    gus_data = fields.pop("gus_data", None)
+    candidates = fields.pop("website_candidates", None) or []
+    return NIPLookupResult(
+        **fields,
+        gus_data=GUSCompanyData(**gus_data) if gus_data else None,
+        website_candidates=[WebsiteCandidate(**c) for c in candidates],
+    )
+
+
+def clear_lookup_cache() -> None:
+    """Czyści cache wyników lookup() i GUS."""
+    _lookup_cache.clear()
+    _gus_cache.clear()
+
+
+# Domeny które NIE są stronami firm (katalogi, rejestry, social media).
+# Dopasowanie: domena lub dowolna domena nadrzędna (m.facebook.com -> facebook.com)
+_BLACKLIST_DOMAINS = frozenset({
+    # Social media
+    "facebook.com", "linkedin.com", "instagram.com", "twitter.com",
+    "youtube.com", "tiktok.com",
+    # Wyszukiwarki
+    "google.com", "google.pl", "bing.com",
+    # Portale informacyjne
+    "wikipedia.org", "gov.pl",
+    # Rejestry firm
+    "krs-online.com.pl", "rejestr.io", "krs-pobierz.pl", "krs.pl",
+    "infoveriti.pl", "emis.com", "opencorporates.com", "companywall.pl",
+    "baza-firm.com.pl",
+    # Katalogi firm / ogłoszenia
+    "panoramafirm.pl", "pkt.pl", "aleo.com", "firmy.net", "gowork.pl", "praca.pl",
+    # Katalogi medyczne (WAŻNE!)
+    "znanylekarz.pl", "rankinglekarzy.pl",
+    "dentysta-stomatolog.com", "stomatolog.pl", "lekarze.pl",
+    "medigo.pl", "ktomalek.pl", "lek.pl", "lekarzebezkolejki.pl",
+    "terminy.pl", "umlub.pl", "medigo.com",
+})
+
+# Fragmenty dopasowywane w dowolnym miejscu domeny (bip.*, docplanner.*)
+_BLACKLIST_SUBSTR_RE = re.compile(r"bip\.|docplanner")
+
+
+# Największe miasta - rozpoznawane w opisach wyników Google
+_POLISH_CITIES = (
+    "Warszawa", "Kraków", "Wrocław", "Poznań", "Gdańsk", "Łódź", "Katowice",
+    "Szczecin", "Bydgoszcz", "Lublin", "Białystok", "Olsztyn", "Toruń", "Rzeszów",
+    "Kielce", "Częstochowa", "Radom", "Sosnowiec", "Gliwice", "Zabrze", "Bytom",
+    "Ruda Śląska", "Rybnik", "Tychy", "Dąbrowa Górnicza", "Płock", "Elbląg",
+    "Opole", "Gorzów",
+)
+# Miasta jednowyrazowe (zbiór) i dwuwyrazowe (pierwsze słowo -> drugie), małymi literami
+_CITY_WORDS = frozenset(c.lower() for c in _POLISH_CITIES if " " not in c)
+_CITY_TWO_WORDS = dict(c.lower().split() for c in _POLISH_CITIES if " " in c)
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _find_city(description: str) -> Optional[str]:
+    """Pierwsze (od lewej) znane miasto w opisie, np. 'Kraków' / 'Ruda Śląska'."""
+    words = _WORD_RE.findall(description.lower())
+    for i, word in enumerate(words):
+        if word in _CITY_WORDS:
+            return word.title()
+        second = _CITY_TWO_WORDS.get(word)
+        if second and i + 1 < len(words) and words[i + 1] == second:
+            return f"{word} {words[i + 1]}".title()
+    return None
+
+
+_NIP_SEPARATOR_RE = re.compile(r'[\s\-]')
+
+
+@lru_cache(maxsize=1024)
+def _nip_text_pattern(clean_nip: str) -> "re.Pattern[bytes]":
+    """
+    Jeden regex na NIP w treści strony (kompilowany raz na NIP).
+    
+    Format: NIP: 894 186 49 49 lub NIP 8941864949 lub NIP: 894-186-49-49,
+    albo sam NIP bez formatowania w dowolnym miejscu.
+    
+    Regex na bajtach - strona nie jest dekodowana. Twarda spacja (&nbsp; z edytorów
+    WYSIWYG) dopasowywana w UTF-8 i w kodowaniach jednobajtowych (cp1250/latin-2).
+    """
+    nip = clean_nip.encode()
+    grouped = rb'(?:[\s\-]|\xc2?\xa0)?'.join(
+        re.escape(part) for part in (nip[:3], nip[3:6], nip[6:8], nip[8:])
+    )
+    return re.compile(rb'%s|NIP(?:[:\s]|\xc2?\xa0)*%s' % (re.escape(nip), grouped), re.IGNORECASE)
+
+
+# Typowe suffiksy tytułów stron (usuwane przy wyciąganiu nazwy firmy z Google)
+_TITLE_SUFFIXES = (" - strona główna", " - oficjalna strona", " | facebook", " - kontakt", " - home")
+
+
+def _strip_title_suffixes(title: str) -> str:
+    """Usuwa suffiksy z końca tytułu (bez rozróżniania wielkości liter, także kilka z rzędu)."""
+    title = title.rstrip()
+    low = title.lower()
+    while low.endswith(_TITLE_SUFFIXES):
+        cut = next(len(suffix) for suffix in _TITLE_SUFFIXES if low.endswith(suffix))
+        title, low = title[:-cut].rstrip(), low[:-cut].rstrip()
+    return title
+
+
+# Podstrony sprawdzane przy walidacji NIP na stronie - NIP jest zwykle w stopce
+# strony głównej lub na kontakcie, dalsze podstrony tylko gdy tam go nie ma
+_VALIDATION_PAGE_TIERS = (
+    ("", "/kontakt", "/contact"),
+    (
+        "/o-nas", "/about", "/polityka-prywatnosci", "/privacy-policy",
+        "/regulamin", "/terms", "/rodo", "/dane-firmy", "/impressum",
+    ),
+)
+
+# Limit pobieranej treści jednej podstrony (ochrona przed plikami zamiast HTML)
+_VALIDATION_MAX_BYTES = 2 * 1024 * 1024
+
+# Sam netloc z URL (bez pełnego parsowania urlparse) - te same wyniki co urlparse().netloc
+_NETLOC_RE = re.compile(r"(?:[A-Za-z][A-Za-z0-9+.\-]*:)?//([^/?#]*)")
+
+
+def _netloc(url: str) -> str:
+    """Netloc URL małymi literami ('' gdy URL bez '//', jak w urlparse)."""
+    m = _NETLOC_RE.match(url)
+    return m.group(1).lower() if m else ""
+
+
+def is_blacklisted_domain(domain: str) -> bool:
+    """Sprawdza czy domena (netloc, małe litery) jest na blackliście."""
+    if _BLACKLIST_SUBSTR_RE.search(domain):
+        return True
+    host = domain.partition(":")[0]
+    while host:
+        if host in _BLACKLIST_DOMAINS:
+            return True
+        host = host.partition(".")[2]
+    return False
+
+
+class NIPLookupSummary(NamedTuple):
+    """Skrócony wynik lookup() - dla batchy które potrzebują tylko nazwy/WWW/miasta."""
+    nip: str
+    company_name: Optional[str]
+    website: Optional[str]
+    city: Optional[str]
+    found: bool
+
+
+class _GoogleHit(NamedTuple):
+    """Wynik organiczny Google (po odfiltrowaniu blacklisty)."""
+    rank: int  # pozycja w surowych wynikach (0 = pierwszy)
+    url: str
+    domain: str
+    title: str
+    description: str
+
+
 class NIPLookup:
     """
     Wyszukuje dane firmy po NIP.
@@ -125,51 +485,70 @@ class NIPLookup:
     # GUS API na Render (fallback jeśli SharedGUSClient niedostępny)
     GUS_API_URL = "https://wfirma-api.onrender.com"
     
+    # Gdy czeka więcej niż jedno zapytanie Google - zebrane w tym oknie idą jednym runem Apify
+    GOOGLE_BATCH_WINDOW_SEC = 0.05
+    GOOGLE_BATCH_MAX_QUERIES = 20
+    
+    # Klienci współdzieleni przez wszystkie instancje (inicjalizowani raz na proces)
+    _shared_gus_client: ClassVar[Optional[Any]] = None
+    _shared_gus_ready: ClassVar[bool] = False
+    
     def __init__(self, settings: Optional[CompanyIntelSettings] = None):
         self.settings = settings or get_settings()
-        self._http_client: Optional[httpx.AsyncClient] = None
-        self._apify_client = None
-        self._apify_initialized = False
+        self._http_client: Optional[httpx.AsyncClient] = None  # klient wstrzyknięty z zewnątrz
+        self._lookup_inflight: dict[str, asyncio.Task] = {}  # NIP -> trwający lookup
+        self._google_futures: dict[str, asyncio.Future] = {}  # query -> wynik (w kolejce lub w trwającym runie)
+        self._google_queue: list[tuple[str, asyncio.Future]] = []  # zapytania do najbliższego batcha
+        self._google_batch_task: Optional[asyncio.Task] = None  # batch zbierający zapytania
+        self._google_flush_tasks: set[asyncio.Task] = set()  # wszystkie trwające batche (dla close())
+        self._apify_semaphore = asyncio.Semaphore(self.settings.nip_apify_concurrency)
+        
+        # Trwały cache (SQLite) - wyniki przeżywają restart procesu
+        self._persistent_cache = (
+            NIPLookupCache(self.settings.cache_db_path)
+            if PERSISTENT_CACHE_AVAILABLE and self.settings.cache_enabled
+            else None
+        )
         
         # Wspólny GUSClient (jeśli dostępny)
-        self._shared_gus_client = None
+        self._ensure_shared_gus_client()
+    
+    @classmethod
+    def _ensure_shared_gus_client(cls) -> None:
+        """Inicjalizuje wspólny GUSClient z src/services/ (raz na proces)."""
+        if cls._shared_gus_ready:
+            return
+        cls._shared_gus_ready = True
         if SHARED_GUS_AVAILABLE:
             try:
                 src_settings = get_src_settings()
-                self._shared_gus_client = get_gus_client(src_settings)
+                cls._shared_gus_client = get_gus_client(src_settings)
                 logger.info("NIPLookup: Używam wspólnego GUSClient z src/services/")
             except Exception as e:
                 logger.warning("NIPLookup: Nie udało się zainicjalizować wspólnego GUSClient: %s", e)
     
     async def _get_http_client(self) -> httpx.AsyncClient:
-        """Lazy init HTTP client."""
-        if self._http_client is None:
-            self._http_client = httpx.AsyncClient(
-                timeout=httpx.Timeout(30),
-                headers={"User-Agent": "CompanyIntel/1.0"},
-            )
-        return self._http_client
+        """Klient wstrzyknięty przez set_http_client albo wspólny klient bieżącej pętli."""
+        # Wstrzyknięty klient mógł zostać zamknięty przez właściciela
+        if self._http_client is not None and not self._http_client.is_closed:
+            return self._http_client
+        return await get_shared_http_client()
     
-    def _init_apify(self) -> bool:
-        """Initialize Apify client."""
-        if self._apify_initialized:
-            return self._apify_client is not None
+    def set_http_client(self, client: httpx.AsyncClient) -> None:
+        """
+        Ustawia współdzielony klient HTTP (np. z ChaoticDataRouter).
         
-        try:
-            from apify_client import ApifyClient
-            
-            if not self.settings.apify_api_token:
-                logger.warning("NIPLookup: brak Apify API token")
-                self._apify_initialized = True
-                return False
-            
-            self._apify_client = ApifyClient(self.settings.apify_api_token)
-            self._apify_initialized = True
-            return True
-        except Exception as e:
-            logger.error("NIPLookup: Apify init error: %s", e)
-            self._apify_initialized = True
+        Klient zewnętrzny nie jest zamykany w close() - jego cyklem życia
+        zarządza właściciel.
+        """
+        self._http_client = client
+    
+    def _init_apify(self) -> bool:
+        """Sprawdza czy Apify jest skonfigurowany (wywołania idą przez HTTP API)."""
+        if not self.settings.apify_api_token:
+            logger.warning("NIPLookup: brak Apify API token")
             return False
+        return True
     
     async def lookup_gus(self, nip: str) -> GUSCompanyData:
         """
@@ -192,6 +571,25 @@ class NIPLookup:
         if not validate_nip_checksum(clean_nip):
             return GUSCompanyData(nip=clean_nip, found=False, error="NIP nie przechodzi walidacji sumy kontrolnej")
         
+        return await self._lookup_gus_validated(clean_nip)
+    
+    async def _lookup_gus_validated(self, clean_nip: str) -> GUSCompanyData:
+        """GUS lookup dla NIP już znormalizowanego i zwalidowanego."""
+        use_cache = self.settings.cache_enabled
+        if use_cache:
+            cached = _ttl_cache_get(_gus_cache, clean_nip)
+            if cached is not None:
+                return cached
+        
+        gus_data = await self._fetch_gus(clean_nip)
+        
+        # Błędy (timeout, brak klucza, 5xx) nie trafiają do cache - następny lookup ponowi
+        if use_cache and gus_data.error is None:
+            _ttl_cache_put(_gus_cache, clean_nip, gus_data, GUS_CACHE_TTL_SEC)
+        return gus_data
+    
+    async def _fetch_gus(self, clean_nip: str) -> GUSCompanyData:
+        """Zapytanie do GUS: wspólny GUSClient albo własny fallback."""
         # Użyj wspólnego GUSClient jeśli dostępny
         if self._shared_gus_client is not None:
             try:
@@ -233,13 +631,17 @@ class NIPLookup:
         try:
             client = await self._get_http_client()
             
-            response = await client.post(
-                f"{self.GUS_API_URL}/api/gus/name-by-nip",
-                json={"nip": clean_nip},
-                headers={
-                    "Content-Type": "application/json",
-                    "X-API-Key": gus_api_key,
-                },
+            response = await _send_with_backoff(
+                lambda: client.post(
+                    f"{self.GUS_API_URL}/api/gus/name-by-nip",
+                    json={"nip": clean_nip},
+                    headers={
+                        "Content-Type": "application/json",
+                        "User-Agent": "CompanyIntel/1.0",  # także gdy klient wstrzyknięty z zewnątrz
+                        "X-API-Key": gus_api_key,
+                    },
+                ),
+                "GUS API",
             )
             
             if response.status_code == 401:
@@ -252,7 +654,7 @@ class NIPLookup:
             if response.status_code != 200:
                 return GUSCompanyData(nip=clean_nip, found=False, error=f"GUS API error: {response.status_code}")
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # API zwraca {"data": [...]} lub bezpośredni obiekt
             if isinstance(data, dict) and "data" in data:
@@ -262,7 +664,8 @@ class NIPLookup:
                 else:
                     return GUSCompanyData(nip=clean_nip, found=False)
             
-            logger.info("NIPLookup: GUS znalazł: %s", data.get('nazwa', 'N/A')[:60])
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("NIPLookup: GUS znalazł: %s", (data.get('nazwa') or 'N/A')[:60])
             
             return GUSCompanyData(
                 nip=clean_nip,
@@ -281,10 +684,159 @@ class NIPLookup:
         except httpx.TimeoutException:
             logger.error("NIPLookup: GUS timeout dla NIP=%s", clean_nip)
             return GUSCompanyData(nip=clean_nip, found=False, error="GUS API timeout")
-        except Exception as e:
+        except (httpx.HTTPError, ValueError, KeyError, TypeError, AttributeError) as e:
+            # Błąd sieci / niepoprawny JSON / nieoczekiwany kształt odpowiedzi
             logger.error("NIPLookup: GUS error dla NIP=%s: %s", clean_nip, e)
             return GUSCompanyData(nip=clean_nip, found=False, error=str(e))
     
+    async def _fetch_google_organic(self, query: str) -> list[dict]:
+        """
+        Wyniki organiczne Google (surowe) dla zapytania.
+        
+        Zapytania zgłoszone razem (np. równoległe lookupy z lookup_many) są
+        zbierane przez GOOGLE_BATCH_WINDOW_SEC i pakowane w jeden run Apify -
+        zamiast N zimnych startów aktora jest jeden. Pojedyncze zapytanie
+        idzie od razu, bez czekania na okno. Identyczne zapytanie zgłoszone
+        przed nadejściem wyniku (w kolejce lub w trwającym runie) czeka na
+        ten sam wynik.
+        """
+        future = self._google_futures.get(query)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._google_futures[query] = future
+            future.add_done_callback(lambda f: self._google_future_done(query, f))
+            self._google_queue.append((query, future))
+            if self._google_batch_task is None:
+                task = asyncio.create_task(self._flush_google_batch())
+                self._google_batch_task = task
+                self._google_flush_tasks.add(task)
+                task.add_done_callback(self._google_flush_tasks.discard)
+        # shield: anulowanie jednego czekającego nie przerywa wyniku innym
+        return await asyncio.shield(future)
+    
+    def _google_future_done(self, query: str, future: asyncio.Future) -> None:
+        """Usuwa rozstrzygnięty wynik z mapy - kolejne zapytanie idzie do Apify."""
+        if self._google_futures.get(query) is future:
+            del self._google_futures[query]
+        if not future.cancelled():
+            future.exception()  # oznacz jako odebrany, gdy wszyscy czekający zostali anulowani
+    
+    async def _flush_google_batch(self) -> None:
+        """Wysyła zapytania z kolejki paczkami do Apify (pojedyncze - od razu)."""
+        batch: list[tuple[str, asyncio.Future]] = []
+        try:
+            # Jedno oddanie sterowania - równolegle startujące lookupy dopisują swoje zapytania.
+            # Samotne zapytanie idzie od razu; okno zbierania tylko gdy jest co pakować.
+            await asyncio.sleep(0)
+            if len(self._google_queue) > 1:
+                await asyncio.sleep(self.GOOGLE_BATCH_WINDOW_SEC)
+            batch, self._google_queue = self._google_queue, []
+            self._google_batch_task = None
+            
+            step = self.GOOGLE_BATCH_MAX_QUERIES
+            chunks = [batch[i:i + step] for i in range(0, len(batch), step)]
+            results = await asyncio.gather(
+                *(self._run_google_batch([query for query, _ in chunk]) for chunk in chunks),
+                return_exceptions=True,
+            )
+            
+            for chunk, result in zip(chunks, results):
+                for query, future in chunk:
+                    if future.done():
+                        continue
+                    if isinstance(result, BaseException):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result.get(query, []))
+        finally:
+            # Przerwane (anulowanie, close()) - żaden czekający nie może zawisnąć
+            if self._google_batch_task is asyncio.current_task():
+                batch, self._google_queue = self._google_queue, []
+                self._google_batch_task = None
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("Google Search: wysyłka zapytań przerwana"))
+    
+    async def _run_google_batch(self, queries: list[str]) -> dict[str, list[dict]]:
+        """Jeden run Apify Google Search dla wielu zapytań -> {query: organicResults}."""
+        run_input = {
+            "queries": "\n".join(queries),
+            "maxPagesPerQuery": 1,
+            "resultsPerPage": 10,
+            "languageCode": "pl",
+            "countryCode": "pl",
+        }
+        
+        # Aktor przetwarza zapytania kolejno - limit rośnie z rozmiarem paczki
+        timeout_secs = min(60 + 15 * (len(queries) - 1), APIFY_RUN_SYNC_MAX_SEC)
+        client = await self._get_http_client()
+        # Limit równoległych runów - przy imporcie setek NIP-ów nie wyczerpujemy limitu Apify
+        async with self._apify_semaphore:
+            response = await _send_with_backoff(
+                lambda: client.post(
+                    APIFY_GOOGLE_SEARCH_URL,
+                    params={"timeout": timeout_secs, "memory": 256},
+                    headers={
+                        "Authorization": f"Bearer {self.settings.apify_api_token}",
+                        "Content-Type": "application/json",
+                    },
+                    content=orjson.dumps(run_input),
+                    timeout=httpx.Timeout(timeout_secs + 30, connect=5.0),
+                ),
+                "Apify Google Search",
+            )
+        response.raise_for_status()
+        items = orjson.loads(response.content)
+        
+        if len(queries) == 1:
+            if not items:
+                logger.info("NIPLookup: Google nie zwrócił wyników")
+                return {}
+            return {queries[0]: items[0].get("organicResults", [])}
+        
+        # Item = strona wyników jednego zapytania (searchQuery.term)
+        wanted = set(queries)
+        by_query: dict[str, list[dict]] = {}
+        for item in items:
+            term = (item.get("searchQuery") or {}).get("term")
+            if term in wanted and term not in by_query:
+                by_query[term] = item.get("organicResults", [])
+        
+        if len(by_query) < len(queries):
+            logger.info(
+                "NIPLookup: Google nie zwrócił wyników dla %d/%d zapytań",
+                len(queries) - len(by_query), len(queries),
+            )
+        return by_query
+    
+    async def _search_google(self, query: str, max_results: int) -> list[_GoogleHit]:
+        """
+        Google Search przez Apify - wspólna ścieżka dla find_website_google
+        i search_by_nip_google.
+        
+        Zwraca wyniki z top `max_results` (pozycja zachowana w `rank`) z pominięciem
+        pustych URL i domen z blacklisty. Równoległe identyczne zapytania
+        współdzielą jedno wywołanie Apify (_fetch_google_organic).
+        """
+        organic_results = await self._fetch_google_organic(query)
+        
+        hits = []
+        for rank, result in enumerate(organic_results[:max_results]):
+            url = result.get("url", "")
+            if not url:
+                continue
+            domain = _netloc(url)
+            if is_blacklisted_domain(domain):
+                continue
+            hits.append(_GoogleHit(
+                rank=rank,
+                url=url,
+                domain=domain,
+                title=result.get("title", ""),
+                description=result.get("description", ""),
+            ))
+        return hits
+    
     async def find_website_google(
         self, 
         company_name: str, 
@@ -324,90 +876,26 @@ class NIPLookup:
         logger.info("NIPLookup: Google Search query='%s'", query)
         
         try:
-            import asyncio
-            
-            # Apify Google Search
-            run_input = {
-                "queries": query,
-                "maxPagesPerQuery": 1,
-                "resultsPerPage": 10,
-                "languageCode": "pl",
-                "countryCode": "pl",
-            }
-            
-            # Run Apify actor
-            run = await asyncio.to_thread(
-                lambda: self._apify_client.actor("apify/google-search-scraper").call(
-                    run_input=run_input,
-                    timeout_secs=60,
-                    memory_mbytes=256,
-                )
-            )
-            
-            # Get results
-            items = list(self._apify_client.dataset(run["defaultDatasetId"]).iterate_items())
-            
-            if not items:
-                logger.info("NIPLookup: Google nie zwrócił wyników")
-                return None
-            
-            # Znajdź najlepszy URL
-            organic_results = items[0].get("organicResults", [])
-            
-            # Filtruj wyniki - szukamy strony firmy, nie katalogów
-            blacklist_domains = [
-                # Social media
-                "facebook.com", "linkedin.com", "instagram.com", "twitter.com",
-                "youtube.com", "tiktok.com",
-                # Wyszukiwarki
-                "google.com", "google.pl", "bing.com",
-                # Portale informacyjne
-                "wikipedia.org", "gov.pl",
-                # Rejestry firm
-                "krs-online.com.pl", "rejestr.io", "krs-pobierz.pl", "krs.pl",
-                "infoveriti.pl", "emis.com", "opencorporates.com", "companywall.pl",
-                "baza-firm.com.pl", "biznes.gov.pl", "ceidg.gov.pl", "prod.ceidg.gov.pl",
-                "regon.stat.gov.pl", "stat.gov.pl", "bip.",
-                # Katalogi firm
-                "panoramafirm.pl", "pkt.pl", "aleo.com", "firmy.net", "gowork.pl",
-                # Katalogi medyczne (WAŻNE!)
-                "znanylekarz.pl", "docplanner.", "rankinglekarzy.pl",
-                "dentysta-stomatolog.com", "stomatolog.pl", "lekarze.pl",
-                "medigo.pl", "ktomalek.pl", "lek.pl", "lekarzebezkolejki.pl",
-                "terminy.pl", "umlub.pl", "medigo.com",
-            ]
+            # Wyniki z top 5 bez katalogów / social media
+            hits = await self._search_google(query, max_results=5)
             
             # Zbierz kandydatów do walidacji
             candidate_urls = []
             
-            for result in organic_results[:5]:
-                url = result.get("url", "")
-                if not url:
-                    continue
-                
-                # Sprawdź czy to nie blacklisted domain
-                domain = urlparse(url).netloc.lower()
-                if any(bl in domain for bl in blacklist_domains):
-                    continue
-                
-                # Sprawdź czy nazwa firmy jest w tytule lub URL
-                title = result.get("title", "").lower()
-                company_lower = company_name.lower()
-                
-                # Wyciągnij słowa kluczowe z nazwy firmy
-                keywords = [w for w in company_lower.split() if len(w) > 3]
-                
-                # Czy tytuł lub domena zawiera słowa kluczowe?
-                if any(kw in title or kw in domain for kw in keywords):
-                    candidate_urls.append(url)
-            
-            # Fallback - weź pierwszy nieblacklisted wynik
-            for result in organic_results[:3]:
-                url = result.get("url", "")
-                domain = urlparse(url).netloc.lower()
-                if not any(bl in domain for bl in blacklist_domains):
-                    if url not in candidate_urls:
-                        candidate_urls.append(url)
+            # Słowa kluczowe z nazwy firmy (raz, nie per wynik)
+            keywords = tuple(w for w in company_name.lower().split() if len(w) > 3)
+            
+            for hit in hits:
+                # Czy tytuł lub domena zawiera słowa kluczowe? (słowa bez spacji -
+                # sklejenie "tytuł domena" nie daje fałszywych trafień na styku)
+                haystack = f"{hit.title.lower()} {hit.domain}"
+                if any(kw in haystack for kw in keywords):
+                    candidate_urls.append(hit.url)
+            
+            # Fallback - weź nieblacklisted wyniki z top 3
+            for hit in hits:
+                if hit.rank < 3 and hit.url not in candidate_urls:
+                    candidate_urls.append(hit.url)
             
             if not candidate_urls:
                 logger.info("NIPLookup: Nie znaleziono pasującej strony")
@@ -421,9 +909,13 @@ class NIPLookup:
                 logger.info("NIPLookup: Walidacja krzyżowa %d kandydatów dla NIP %s", 
                            len(candidate_urls), nip_for_validation)
                 
-                for i, url in enumerate(candidate_urls[:5]):  # Max 5 kandydatów
-                    is_valid = await self._validate_website_has_nip(url, nip_for_validation)
-                    
+                # Max 5 kandydatów - walidowani równolegle, wyniki w kolejności z Google
+                urls_to_check = candidate_urls[:5]
+                validation_results = await asyncio.gather(*(
+                    self._validate_website_has_nip(url, nip_for_validation) for url in urls_to_check
+                ))
+                
+                for i, (url, is_valid) in enumerate(zip(urls_to_check, validation_results)):
                     # Confidence spada z pozycją w wynikach, ale walidacja daje bonus
                     base_confidence = 0.9 - (i * 0.15)  # 0.9, 0.75, 0.6, 0.45, 0.3
                     confidence = min(1.0, base_confidence + (0.3 if is_valid else 0))
@@ -454,8 +946,9 @@ class NIPLookup:
                 else:
                     # Żadna nie przeszła - zwróć pierwszą z ostrzeżeniem
                     logger.warning("NIPLookup: UWAGA - żadna strona nie zawiera NIP %s!", nip_for_validation)
-                    logger.warning("NIPLookup: %d kandydatów bez walidacji: %s", 
-                                  len(candidates), [c.url for c in candidates[:3]])
+                    if logger.isEnabledFor(logging.WARNING):
+                        logger.warning("NIPLookup: %d kandydatów bez walidacji: %s", 
+                                      len(candidates), [c.url for c in candidates[:3]])
                     best = candidates[0] if candidates else None
                     return (best.url if best else None, candidates, 0.3, False)
             
@@ -482,6 +975,8 @@ class NIPLookup:
         
         Scrapuje stronę główną i podstrony (polityka prywatności, kontakt, regulamin)
         szukając NIP. Jeśli NIP się zgadza - strona jest zwalidowana.
+        Najpierw strona główna i kontakt (tam jest zwykle NIP), pozostałe
+        podstrony tylko gdy tam go nie ma.
         
         Args:
             url: URL strony do sprawdzenia
@@ -494,23 +989,9 @@ class NIPLookup:
             return False
         
         # Normalizuj NIP do porównania (usuń myślniki, spacje)
-        clean_expected = re.sub(r'[\s\-]', '', expected_nip)
-        
-        # Lista stron do sprawdzenia
-        pages_to_check = [
-            "",  # Strona główna
-            "/kontakt",
-            "/contact", 
-            "/o-nas",
-            "/about",
-            "/polityka-prywatnosci",
-            "/privacy-policy",
-            "/regulamin",
-            "/terms",
-            "/rodo",
-            "/dane-firmy",
-            "/impressum",
-        ]
+        clean_expected = _NIP_SEPARATOR_RE.sub('', expected_nip)
+        nip_pattern = _nip_text_pattern(clean_expected)
+        nip_bytes = clean_expected.encode()
         
         # Normalizuj base URL
         if not url.startswith("http"):
@@ -519,40 +1000,62 @@ class NIPLookup:
         base_url = f"{parsed.scheme}://{parsed.netloc}"
         
         try:
-            async with httpx.AsyncClient(timeout=15.0, follow_redirects=True) as client:
-                for page in pages_to_check:
-                    try:
-                        full_url = f"{base_url}{page}"
-                        response = await client.get(full_url, headers={
-                            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-                        })
-                        
+            client = await self._get_http_client()
+            
+            async def _page_has_nip(page: str) -> bool:
+                full_url = f"{base_url}{page}"
+                try:
+                    async with client.stream(
+                        "GET",
+                        full_url,
+                        headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"},
+                        timeout=15.0,
+                        follow_redirects=True,
+                    ) as response:
                         if response.status_code != 200:
-                            continue
-                        
-                        text = response.text
+                            return False
                         
-                        # Szukaj NIP w różnych formatach
-                        # Format: NIP: 894 186 49 49 lub NIP 8941864949 lub NIP: 894-186-49-49
-                        nip_patterns = [
-                            rf'NIP[:\s]*{clean_expected[:3]}[\s\-]?{clean_expected[3:6]}[\s\-]?{clean_expected[6:8]}[\s\-]?{clean_expected[8:]}',
-                            rf'NIP[:\s]*{clean_expected}',
-                            clean_expected,  # Sam NIP bez formatowania
-                        ]
+                        # Sam NIP w surowych bajtach sprawdzany w trakcie pobierania -
+                        # trafienie (np. w JSON-LD w <head>) kończy pobieranie reszty strony
+                        body = bytearray()
+                        found = False
+                        async for chunk in response.aiter_bytes():
+                            # Zakładka na NIP przecięty granicą chunków
+                            start = max(len(body) - len(nip_bytes) + 1, 0)
+                            body += chunk
+                            if nip_bytes in body[start:]:
+                                found = True
+                                break
+                            if len(body) >= _VALIDATION_MAX_BYTES:
+                                break
                         
-                        for pattern in nip_patterns:
-                            if re.search(pattern, text, re.IGNORECASE):
-                                logger.info("NIPLookup: WALIDACJA OK - NIP %s znaleziony na %s", 
-                                           expected_nip, full_url)
-                                return True
-                        
-                    except Exception as e:
-                        logger.debug("NIPLookup: Błąd sprawdzania %s: %s", page, e)
-                        continue
-                
-                logger.warning("NIPLookup: WALIDACJA FAILED - NIP %s NIE znaleziony na %s", 
-                              expected_nip, base_url)
-                return False
+                        # Formaty z separatorami (526-104-08-28, NIP: 526 104 08 28) - też na bajtach
+                        if not found:
+                            found = nip_pattern.search(body) is not None
+                    
+                    if found:
+                        logger.info("NIPLookup: WALIDACJA OK - NIP %s znaleziony na %s", 
+                                   expected_nip, full_url)
+                    return found
+                    
+                except Exception as e:
+                    logger.debug("NIPLookup: Błąd sprawdzania %s: %s", page, e)
+                    return False
+            
+            # Grupy podstron po kolei, w grupie równolegle - pierwsze trafienie kończy walidację
+            for tier in _VALIDATION_PAGE_TIERS:
+                tasks = [asyncio.create_task(_page_has_nip(page)) for page in tier]
+                try:
+                    for next_done in asyncio.as_completed(tasks):
+                        if await next_done:
+                            return True
+                finally:
+                    for task in tasks:
+                        task.cancel()
+            
+            logger.warning("NIPLookup: WALIDACJA FAILED - NIP %s NIE znaleziony na %s", 
+                          expected_nip, base_url)
+            return False
                 
         except Exception as e:
             logger.error("NIPLookup: Błąd walidacji strony %s: %s", url, e)
@@ -575,87 +1078,34 @@ class NIPLookup:
         logger.info("NIPLookup: Google Search for NIP='%s'", nip)
         
         try:
-            import asyncio
-            
-            run_input = {
-                "queries": query,
-                "maxPagesPerQuery": 1,
-                "resultsPerPage": 10,
-                "languageCode": "pl",
-                "countryCode": "pl",
-            }
-            
-            run = await asyncio.to_thread(
-                lambda: self._apify_client.actor("apify/google-search-scraper").call(
-                    run_input=run_input,
-                    timeout_secs=60,
-                    memory_mbytes=256,
-                )
-            )
-            
-            items = list(self._apify_client.dataset(run["defaultDatasetId"]).iterate_items())
-            
-            if not items:
-                return None, None, None
-            
-            organic_results = items[0].get("organicResults", [])
-            
-            # Blacklist domen
-            blacklist_domains = [
-                "facebook.com", "linkedin.com", "instagram.com", "twitter.com",
-                "youtube.com", "tiktok.com", "znanylekarz.pl", "docplanner",
-                "google.com", "google.pl", "gov.pl", "wikipedia.org",
-                "krs-online.com.pl", "rejestr.io", "panoramafirm.pl",
-                "pkt.pl", "aleo.com", "firmy.net", "gowork.pl",
-                "krs-pobierz.pl", "krs.pl", "infoveriti.pl", "emis.com",
-                "opencorporates.com", "companywall.pl", "baza-firm.com.pl",
-                "biznes.gov.pl", "ceidg.gov.pl", "prod.ceidg.gov.pl",
-                "regon.stat.gov.pl", "stat.gov.pl", "bip.", "praca.pl",
-            ]
+            # Wyniki z top 7 bez katalogów / social media
+            hits = await self._search_google(query, max_results=7)
             
             company_name = None
             website = None
             city = None
             
-            for result in organic_results[:7]:
-                url = result.get("url", "")
-                title = result.get("title", "")
-                description = result.get("description", "")
-                
-                if not url:
-                    continue
-                
-                domain = urlparse(url).netloc.lower()
-                
-                # Pomijaj blacklisted
-                if any(bl in domain for bl in blacklist_domains):
-                    continue
-                
+            for hit in hits:
                 # Znaleziono potencjalną stronę firmy
                 if not website:
-                    website = url
-                    logger.info("NIPLookup: Znaleziono potencjalną stronę: %s", url)
+                    website = hit.url
+                    logger.info("NIPLookup: Znaleziono potencjalną stronę: %s", hit.url)
                 
                 # Wyciągnij nazwę firmy z tytułu
-                if not company_name and title:
+                if not company_name and hit.title:
                     # Usuń typowe suffiksy z tytułu
-                    name = title
-                    for suffix in [" - strona główna", " - oficjalna strona", " | Facebook", " - Kontakt", " - Home"]:
-                        name = name.replace(suffix, "").replace(suffix.lower(), "")
-                    company_name = name.strip()[:100]
+                    company_name = _strip_title_suffixes(hit.title).strip()[:100]
                 
                 # Wyciągnij miasto z opisu jeśli jest
-                if not city and description:
-                    import re
-                    city_match = re.search(r'\b(Warszawa|Kraków|Wrocław|Poznań|Gdańsk|Łódź|Katowice|Szczecin|Bydgoszcz|Lublin|Białystok|Olsztyn|Toruń|Rzeszów|Kielce|Częstochowa|Radom|Sosnowiec|Gliwice|Zabrze|Bytom|Ruda Śląska|Rybnik|Tychy|Dąbrowa Górnicza|Płock|Elbląg|Opole|Gorzów)\b', description, re.IGNORECASE)
-                    if city_match:
-                        city = city_match.group(1).title()
+                if not city and hit.description:
+                    city = _find_city(hit.description)
                 
                 if company_name and website:
                     break
             
-            logger.info("NIPLookup: Z Google: nazwa='%s', www='%s', miasto='%s'", 
-                       company_name[:50] if company_name else None, website, city)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("NIPLookup: Z Google: nazwa='%s', www='%s', miasto='%s'", 
+                           company_name[:50] if company_name else None, website, city)
             
             return company_name, website, city
             
@@ -667,7 +1117,15 @@ class NIPLookup:
         """
         Pełne wyszukiwanie firmy po NIP.
         
-        Próbuje najpierw GUS, potem Google.
+        Próbuje najpierw GUS, potem Google. Przy nip_speculative_google
+        wyszukiwanie Google po NIP startuje od razu, równolegle z GUS.
+        Wyniki są cache'owane w procesie (cache_enabled): 24h gdy wynik pełny
+        (firma i strona WWW, bez błędu), 5 min w pozostałych przypadkach;
+        dane GUS osobno (24h, bez błędów). Każde wywołanie dostaje własną kopię.
+        Pełne wyniki (firma i strona WWW znalezione, bez błędu) trafiają też
+        do trwałego cache SQLite (cache_db_path): 7 dni gdy strona zawiera NIP,
+        1 dzień gdy nie.
+        Równoległe wywołania dla tego samego NIP współdzielą jedno wyszukiwanie.
         
         Args:
             nip: NIP (10 cyfr)
@@ -683,13 +1141,140 @@ class NIPLookup:
         if not validate_nip_checksum(clean_nip):
             return NIPLookupResult(nip=clean_nip, found=False, error="NIP nie przechodzi walidacji")
         
+        return await self._lookup_valid(clean_nip)
+    
+    async def _lookup_valid(self, clean_nip: str) -> NIPLookupResult:
+        """lookup() dla NIP już znormalizowanego i z poprawną sumą kontrolną."""
+        use_cache = self.settings.cache_enabled
+        if use_cache:
+            cached = _ttl_cache_get(_lookup_cache, clean_nip)
+            if cached is not None:
+                logger.info("NIPLookup: Cache hit NIP=%s (found=%s)", clean_nip, cached.found)
+                return cached
+        
+        # Równoległe lookupy tego samego NIP czekają na jedno wyszukiwanie
+        task = self._lookup_inflight.get(clean_nip)
+        if task is None:
+            task = asyncio.ensure_future(self._lookup_uncached(clean_nip, use_cache))
+            self._lookup_inflight[clean_nip] = task
+            
+            def _done(t: asyncio.Task) -> None:
+                self._lookup_inflight.pop(clean_nip, None)
+                if not t.cancelled():
+                    t.exception()  # oznacz jako odebrany, gdy wszyscy czekający zostali anulowani
+            
+            task.add_done_callback(_done)
+        # Każdy czekający dostaje własną kopię wyniku
+        return copy.deepcopy(await asyncio.shield(task))
+    
+    async def _lookup_uncached(self, clean_nip: str, use_cache: bool) -> NIPLookupResult:
+        """lookup() bez cache w procesie - trwały cache, potem GUS + Google."""
+        persistent = self._persistent_cache if use_cache else None
+        if persistent is not None:
+            cached_json = await persistent.get(clean_nip)
+            if cached_json is not None:
+                try:
+                    result = _result_from_json(cached_json)
+                except (ValueError, TypeError) as e:
+                    logger.warning("NIPLookup: Uszkodzony wpis trwałego cache NIP=%s: %s", clean_nip, e)
+                else:
+                    if _is_complete_result(result):
+                        logger.info("NIPLookup: Trwały cache hit NIP=%s", clean_nip)
+                        _ttl_cache_put(_lookup_cache, clean_nip, result, LOOKUP_CACHE_TTL_FOUND_SEC)
+                        return result
+                    # Wpis sprzed ograniczenia do pełnych wyników - szukamy ponownie
+        
         logger.info("=" * 60)
         logger.info("NIPLookup: Rozpoczynam wyszukiwanie NIP=%s", clean_nip)
         
+        # Opcjonalnie: Google po NIP równolegle z GUS (wynik potrzebny tylko gdy GUS nie znajdzie)
+        google_task = None
+        if self.settings.nip_speculative_google:
+            google_task = asyncio.create_task(self.search_by_nip_google(clean_nip))
+        
+        try:
+            result = await self._lookup_with_gus(clean_nip, google_task)
+        finally:
+            if google_task is not None and not google_task.done():
+                google_task.cancel()
+        
+        if use_cache:
+            # 24h tylko dla pełnych wyników - GUS bez strony (np. błąd Apify) krótko, jak "nie znaleziono"
+            ttl = LOOKUP_CACHE_TTL_FOUND_SEC if _is_complete_result(result) else LOOKUP_CACHE_TTL_NOT_FOUND_SEC
+            _ttl_cache_put(_lookup_cache, clean_nip, result, ttl)
+        # Tylko pełne wyniki: 7 dni gdy strona zawiera NIP, 1 dzień gdy nie
+        if persistent is not None and _is_complete_result(result):
+            await persistent.set(clean_nip, _result_to_json(result), result.website_validated)
+        return result
+    
+    async def lookup_many(self, nips: Sequence[str], concurrency: int = 20) -> List[NIPLookupResult]:
+        """
+        lookup() dla wielu NIP-ów równolegle (np. import leadów z CSV).
+        
+        NIP-y są walidowane razem (validate_nip_checksum_batch) przed startem
+        lookupów - błędne dostają wynik z błędem od razu, bez zadania.
+        
+        Args:
+            nips: Lista NIP-ów (dowolny format - jak w lookup())
+            concurrency: Maks. liczba równoległych lookupów - dostosuj do limitów
+                GUS API i Apify (każdy lookup to 1 wywołanie GUS + 1-2 zapytania Google;
+                równoległe zapytania Google są pakowane we wspólne runy Apify)
+        
+        Returns:
+            Wyniki w kolejności wejściowej listy
+        """
+        clean_nips = [normalize_nip(nip) for nip in nips]
+        valid = validate_nip_checksum_batch(clean_nips)
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def _lookup_one(clean_nip: str) -> NIPLookupResult:
+            async with semaphore:
+                return await self._lookup_valid(clean_nip)
+        
+        results: List[Optional[NIPLookupResult]] = [None] * len(nips)
+        async with asyncio.TaskGroup() as tg:
+            tasks = {}
+            for i, (nip, clean_nip, ok) in enumerate(zip(nips, clean_nips, valid)):
+                if not clean_nip:
+                    results[i] = NIPLookupResult(nip=nip, found=False, error="Nieprawidłowy format NIP")
+                elif not ok:
+                    results[i] = NIPLookupResult(nip=clean_nip, found=False, error="NIP nie przechodzi walidacji")
+                else:
+                    tasks[i] = tg.create_task(_lookup_one(clean_nip))
+        for i, task in tasks.items():
+            results[i] = task.result()
+        return results
+    
+    async def lookup_minimal(self, nip: str) -> NIPLookupSummary:
+        """
+        Jak lookup(), ale zwraca tylko (nip, company_name, website, city, found).
+        
+        Korzysta z tego samego cache co lookup() - wyniki trzymane w batchu
+        to lekkie krotki zamiast NIPLookupResult z danymi GUS i kandydatami.
+        """
+        result = await self.lookup(nip)
+        return NIPLookupSummary(
+            nip=result.nip,
+            company_name=result.company_name,
+            website=result.website,
+            city=result.city,
+            found=result.found,
+        )
+    
+    async def _lookup_with_gus(
+        self,
+        clean_nip: str,
+        google_task: Optional[asyncio.Task],
+    ) -> NIPLookupResult:
+        """GUS -> Google (strona po nazwie) albo Google po NIP gdy GUS nie znajdzie."""
         # Step 1: GUS lookup
-        gus_data = await self.lookup_gus(clean_nip)
+        gus_data = await self._lookup_gus_validated(clean_nip)
         
         if gus_data.found:
+            if google_task is not None:
+                google_task.cancel()
+            
             # GUS zadziałał - szukamy strony przez Google
             company_name = gus_data.short_name or gus_data.full_name
             city = gus_data.city
@@ -708,10 +1293,11 @@ class NIPLookup:
             if not validated and website:
                 warnings.append("Strona nie zawiera NIP - niepewne dopasowanie")
             
-            logger.info(
-                "NIPLookup: GUS + Google: nazwa='%s', miasto='%s', www='%s' (conf=%.2f, valid=%s)",
-                company_name[:50] if company_name else None, city, website, confidence, validated
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "NIPLookup: GUS + Google: nazwa='%s', miasto='%s', www='%s' (conf=%.2f, valid=%s)",
+                    company_name[:50] if company_name else None, city, website, confidence, validated
+                )
             
             return NIPLookupResult(
                 nip=clean_nip,
@@ -729,7 +1315,10 @@ class NIPLookup:
         # Step 2: GUS nie zadziałał - szukamy wszystkiego przez Google
         logger.info("NIPLookup: GUS niedostępny, szukam przez Google NIP=%s", clean_nip)
         
-        company_name, website, city = await self.search_by_nip_google(clean_nip)
+        if google_task is not None:
+            company_name, website, city = await google_task
+        else:
+            company_name, website, city = await self.search_by_nip_google(clean_nip)
         
         if website or company_name:
             return NIPLookupResult(
@@ -753,7 +1342,14 @@ class NIPLookup:
         )
     
     async def close(self):
-        """Zamyka zasoby."""
-        if self._http_client:
-            await self._http_client.aclose()
-            self._http_client = None
+        """
+        Zwalnia zasoby instancji.
+        
+        Wspólny klient HTTP pętli zostaje otwarty (używają go inne instancje) -
+        zamyka go close_shared_http_client().
+        """
+        self._http_client = None
+        for task in self._google_flush_tasks:
+            task.cancel()  # czekający dostaną błąd zamiast zawisnąć
+        if self._persistent_cache is not None:
+            await self._persistent_cache.close()
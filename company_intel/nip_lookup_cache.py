@@ -0,0 +1,97 @@
+"""
+Trwały cache wyników NIPLookup (SQLite).
+
+Przeżywa restart procesu - ponowne przetwarzanie tych samych NIP-ów
+(re-run leadów, retry webhooków) nie uruchamia ponownie GUS + Google (Apify).
+
+Struktura:
+- Klucz: NIP (10 cyfr)
+- Wartość: wynik lookup() jako JSON, flaga walidacji strony, znacznik czasu
+- TTL: 7 dni gdy strona zawiera NIP, 1 dzień gdy strona znaleziona bez NIP
+- Zapisywane są tylko pełne wyniki (ze stroną WWW, bez błędu)
+"""
+
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Optional
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+
+PERSISTENT_TTL_VALIDATED_SEC = 7 * 24 * 3600
+PERSISTENT_TTL_UNVALIDATED_SEC = 24 * 3600
+
+
+class NIPLookupCache:
+    """
+    Cache SQLite dla wyników NIPLookup.
+
+    Baza otwierana leniwie przy pierwszym użyciu. Błędy bazy nie przerywają
+    lookupu - są logowane, a cache zachowuje się jak pusty.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._db: Optional[aiosqlite.Connection] = None
+        self._init_lock = asyncio.Lock()
+
+    async def _ensure_initialized(self) -> aiosqlite.Connection:
+        """Otwiera bazę i tworzy tabelę (raz, także przy równoległych wywołaniach)."""
+        if self._db is not None:
+            return self._db
+        async with self._init_lock:
+            if self._db is None:
+                Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+                db = await aiosqlite.connect(self.db_path)
+                await db.execute("""
+                    CREATE TABLE IF NOT EXISTS nip_lookup (
+                        nip TEXT PRIMARY KEY,
+                        result_json TEXT NOT NULL,
+                        validated INTEGER NOT NULL,
+                        ts INTEGER NOT NULL
+                    )
+                """)
+                await db.commit()
+                self._db = db
+                logger.info("NIPLookupCache: baza %s", self.db_path)
+        return self._db
+
+    async def get(self, nip: str) -> Optional[str]:
+        """Zwraca JSON wyniku dla NIP lub None (brak / wygasł / błąd bazy)."""
+        now = int(time.time())
+        try:
+            db = await self._ensure_initialized()
+            async with db.execute(
+                """
+                SELECT result_json FROM nip_lookup
+                WHERE nip = ? AND ts > CASE WHEN validated THEN ? ELSE ? END
+                """,
+                (nip, now - PERSISTENT_TTL_VALIDATED_SEC, now - PERSISTENT_TTL_UNVALIDATED_SEC),
+            ) as cursor:
+                row = await cursor.fetchone()
+        except (aiosqlite.Error, OSError) as e:
+            logger.warning("NIPLookupCache: błąd odczytu NIP=%s: %s", nip, e)
+            return None
+        return row[0] if row else None
+
+    async def set(self, nip: str, result_json: str, validated: bool) -> None:
+        """Zapisuje (nadpisuje) wynik dla NIP."""
+        try:
+            db = await self._ensure_initialized()
+            await db.execute(
+                "INSERT OR REPLACE INTO nip_lookup (nip, result_json, validated, ts) VALUES (?, ?, ?, ?)",
+                (nip, result_json, int(validated), int(time.time())),
+            )
+            await db.commit()
+        except (aiosqlite.Error, OSError) as e:
+            logger.warning("NIPLookupCache: błąd zapisu NIP=%s: %s", nip, e)
+
+    async def close(self) -> None:
+        """Zamyka połączenie z bazą."""
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
@@ -11,10 +11,13 @@ Koordynuje:
 """
 
 import asyncio
+import itertools
 import logging
+import re
 import time
-from datetime import datetime
-from typing import Optional
+from typing import Awaitable, Callable, Iterable, Optional, TypeVar
+
+import httpx
 
 from .config import CompanyIntelSettings, get_settings
 from .models import (
@@ -29,6 +32,8 @@ from .models import (
     SocialPlatform,
     DataValidation,
     Kontakt,
+    Adres,
+    utc_now,
 )
 from .scrapers import (
     WebsiteScraper,
@@ -40,7 +45,15 @@ from .scrapers.tiktok import TikTokScraper
 from .scrapers.znanylekarz import ZnanyLekarzScraper
 from .scrapers.zoho_lookup import ZohoLookupScraper
 from .analyzers import ActivityScorer, AICategorizer, ReviewsAnalyzer
-from .nip_lookup import NIPLookup, NIPLookupResult
+from .nip_lookup import (
+    HTTP2_AVAILABLE,
+    HTTP_POOL_LIMITS,
+    HTTP_TIMEOUT,
+    NIPLookup,
+    NIPLookupResult,
+    normalize_nip,
+    stateless_cookie_jar,
+)
 from .chaotic_router import ChaoticDataRouter
 from .models import DecisionTrace, CandidateDecision
 
@@ -59,6 +72,112 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Tanie rozpoznanie placówki medycznej po tekście strony (bramka dla ZnanyLekarz)
+_MEDICAL_SIGNAL = re.compile(
+    r"klinik|przychodni|lekar|stomatolog|dent|gabinet|medyc|medic|zdrow|szpital|poradni"
+    r"|rehabilit|fizjoter|ortodon|pacjent|diagnost|laborator|psycholog|psychiatr|nzoz",
+    re.IGNORECASE,
+)
+
+
+def _unique_kontakty(kontakty: Iterable[Kontakt]) -> list[Kontakt]:
+    """Kontakty bez duplikatów wartości - zostaje pierwsze wystąpienie (i jego kolejność)."""
+    unique: dict[str, Kontakt] = {}
+    for k in kontakty:
+        unique.setdefault(k.wartosc, k)
+    return list(unique.values())
+
+
+async def _timed(timings: dict[str, int], step: str, awaitable: Awaitable[T]) -> T:
+    """
+    Czeka na awaitable i dolicza czas oczekiwania (ms) do timings[step].
+
+    Dla zadań startowanych wcześniej (Google Maps, ZnanyLekarz) mierzy tylko
+    czas, o który krok faktycznie opóźnił analizę.
+    """
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[step] = timings.get(step, 0) + int((time.perf_counter() - start) * 1000)
+
+
+def _truncate_at_paragraph(text: str, max_chars: int) -> str:
+    """
+    Przycina tekst do max_chars, kończąc na granicy akapitu/linii.
+
+    Początek strony (tytuł, opis, menu usług) jest najcenniejszy dla AI -
+    zachowujemy go w całości, odcinamy tylko niepełny ostatni akapit.
+    """
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n", 0, max_chars)
+    # Bez sensownej granicy (jeden długi akapit) - cięcie na sztywno
+    if cut < max_chars // 2:
+        cut = max_chars
+    return text[:cut].rstrip()
+
+
+# Separator sufiksu w tytule strony: " - " lub " | " (myślnik bez spacji to część nazwy, np. "Medi-Dent")
+_TITLE_SEPARATOR_RE = re.compile(r" [|-] ")
+
+# Tylko cyfry ASCII (\D dopasowałby też cyfry z innych alfabetów)
+_NON_DIGIT_RE = re.compile(r"[^0-9]")
+
+
+def _normalize_phone(phone: str) -> str:
+    """Numer telefonu -> ostatnie 9 cyfr (bez prefiksu kraju i separatorów)."""
+    return _NON_DIGIT_RE.sub("", phone)[-9:]
+
+
+def _placowka_rank(placowka: Placowka) -> tuple[int, float, int]:
+    """Ranking duplikatów placówki: liczba recenzji, potem rating, potem liczba kontaktów."""
+    return (
+        placowka.google_reviews_count or 0,
+        placowka.google_rating or 0,
+        len(placowka.kontakty),
+    )
+
+
+def _phones_and_emails(kontakty: Iterable[Kontakt]) -> tuple[set[str], set[str]]:
+    """Rozdziela kontakty na znormalizowane telefony i emaile w jednym przejściu."""
+    phones: set[str] = set()
+    emails: set[str] = set()
+    for k in kontakty:
+        typ = k.typ
+        if typ == "telefon":
+            phones.add(_normalize_phone(k.wartosc))
+        elif typ == "email":
+            emails.add(k.wartosc.lower())
+    return phones, emails
+
+
+def _normalize_address_part(value: Optional[str]) -> str:
+    """Część adresu do porównań: bez różnic w wielkości liter i białych znakach."""
+    return " ".join((value or "").split()).casefold()
+
+
+def _merge_unique_capped(
+    first: Iterable[T],
+    second: Iterable[T],
+    key: Callable[[T], object] = lambda item: item,
+    cap: int = 5,
+) -> list[T]:
+    """Łączy dwie listy bez duplikatów (po kluczu), kończy po `cap` elementach."""
+    merged: list[T] = []
+    seen = set()
+    for item in itertools.chain(first, second):
+        item_key = key(item)
+        if item_key in seen:
+            continue
+        seen.add(item_key)
+        merged.append(item)
+        if len(merged) >= cap:
+            break
+    return merged
+
 
 class CompanyIntelOrchestrator:
     """
@@ -79,6 +198,12 @@ class CompanyIntelOrchestrator:
         self.tiktok_scraper = TikTokScraper(self.settings)
         self.znanylekarz_scraper = ZnanyLekarzScraper(self.settings)
         
+        # Limit równoległych scrapingów social per platforma (wiele analiz naraz)
+        self._social_semaphores = {
+            platform: asyncio.Semaphore(self.settings.apify_social_max_concurrent)
+            for platform in ("facebook", "instagram", "tiktok")
+        }
+        
         # NIP lookup
         self.nip_lookup = NIPLookup(self.settings)
         
@@ -104,6 +229,29 @@ class CompanyIntelOrchestrator:
         # Zoho lookup
         self.zoho_lookup = ZohoLookupScraper(self.settings)
         
+        # Jedna pula połączeń HTTP (keep-alive) dla scraperów i lookupów -
+        # bez nowego TCP+TLS przy każdej analizie; zamykana w close().
+        # Bez zapamiętywania cookies - sesja jednej strony (lub Zoho) nie trafia do innych
+        self.http_client = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            limits=HTTP_POOL_LIMITS,
+            http2=HTTP2_AVAILABLE,
+            cookies=stateless_cookie_jar(),
+        )
+        for component in (
+            self.website_scraper,
+            self.znanylekarz_scraper,
+            self.nip_lookup,
+            self.zoho_lookup,
+            self.nip_finder_v3,
+        ):
+            set_http_client = getattr(component, "set_http_client", None)
+            if set_http_client:
+                set_http_client(self.http_client)
+        
+        # (NIP, flagi) -> trwająca analiza (równoległe żądania tego samego NIP)
+        self._analyze_inflight: dict[tuple, asyncio.Task] = {}
+        
         # Vertex AI service (do parsowania chaotycznych danych)
         self.vertex_ai = None
         try:
@@ -113,7 +261,9 @@ class CompanyIntelOrchestrator:
         except Exception as e:
             self.logger.warning("Vertex AI not available: %s", e)
         
-        # Chaotic Data Router (nowa ścieżka dla chaotycznych danych)
+        # Chaotic Data Router (nowa ścieżka dla chaotycznych danych).
+        # Klient HTTP komponentów należy do orchestratora (wyżej) - routera nie otwieramy
+        # przez async with, jego własna pula jest tylko dla użycia samodzielnego
         self.chaotic_router = ChaoticDataRouter(
             settings=self.settings,
             nip_lookup=self.nip_lookup,
@@ -154,6 +304,43 @@ class CompanyIntelOrchestrator:
         Returns:
             CompanyIntel z pełnymi danymi
         """
+        # Równoległe żądania tego samego NIP (z tymi samymi flagami) czekają na jedną analizę.
+        # Klucz po NIP znormalizowanym - "113-108-86-80" i "1131088680" to ta sama analiza
+        key = (normalize_nip(nip) or nip.strip(), skip_social, skip_ai, skip_reviews, core_only)
+        task = self._analyze_inflight.get(key)
+        if task is not None:
+            self.logger.info("NIP %s: analiza już trwa - czekam na jej wynik", nip)
+        else:
+            task = asyncio.ensure_future(self._analyze_by_nip_uncached(
+                nip,
+                skip_social=skip_social,
+                skip_ai=skip_ai,
+                skip_reviews=skip_reviews,
+                core_only=core_only,
+            ))
+            self._analyze_inflight[key] = task
+            
+            def _done(t: asyncio.Task) -> None:
+                self._analyze_inflight.pop(key, None)
+                if not t.cancelled():
+                    t.exception()  # oznacz jako odebrany, gdy wszyscy czekający zostali anulowani
+            
+            task.add_done_callback(_done)
+        
+        result = await asyncio.shield(task)
+        # Wynik zadania nie wychodzi na zewnątrz - każdy wywołujący (także pierwszy)
+        # dostaje własną kopię, więc modyfikacje jednego nie trafiają do pozostałych
+        return result.model_copy(deep=True)
+    
+    async def _analyze_by_nip_uncached(
+        self,
+        nip: str,
+        skip_social: bool,
+        skip_ai: bool,
+        skip_reviews: bool,
+        core_only: bool,
+    ) -> CompanyIntel:
+        """analyze_by_nip() bez łączenia równoległych żądań."""
         self.logger.info("=" * 60)
         self.logger.info("ANALYZE BY NIP: %s", nip)
         self.logger.info("=" * 60)
@@ -200,9 +387,12 @@ class CompanyIntelOrchestrator:
             core_only=core_only,
         )
         
+        # Źródła lookupu na początek listy - jednym przesunięciem
+        lookup_sources = ["nip_lookup"]
+        
         # Dodaj dane rejestrowe z GUS do wyniku
         if lookup_result.gus_data and lookup_result.gus_data.found:
-            result.metadata.sources_used.insert(0, "gus")
+            lookup_sources.append("gus")
             gus = lookup_result.gus_data
             
             # Dane rejestrowe
@@ -214,7 +404,6 @@ class CompanyIntelOrchestrator:
             
             # Adres siedziby z GUS
             if gus.city or gus.street:
-                from .models import Adres
                 ulica = gus.street or ""
                 if gus.building_number:
                     ulica += f" {gus.building_number}"
@@ -228,7 +417,7 @@ class CompanyIntelOrchestrator:
                     wojewodztwo=gus.voivodeship,
                 )
         
-        result.metadata.sources_used.insert(0, "nip_lookup")
+        result.metadata.sources_used[:0] = lookup_sources
         
         return result
     
@@ -277,7 +466,7 @@ class CompanyIntelOrchestrator:
         Returns:
             CompanyIntel z pełnymi danymi
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         self.logger.info(
             "=== Starting analysis: %s (NIP: %s, city: %s) ===",
@@ -286,19 +475,20 @@ class CompanyIntelOrchestrator:
             city,
         )
         
-        # Input logging
-        input_data = {
-            "company_name": company_name,
-            "nip": nip,
-            "city": city,
-            "website": website,
-            "social_links": social_links.to_dict() if social_links else None,
-            "skip_social": skip_social,
-            "skip_ai": skip_ai,
-            "skip_reviews": skip_reviews,
-            "core_only": core_only,
-        }
-        self.logger.info("[INPUT] Orchestrator.analyze | %s", input_data)
+        # Input logging (słownik i model_dump social links tylko gdy INFO włączone)
+        if self.logger.isEnabledFor(logging.INFO):
+            input_data = {
+                "company_name": company_name,
+                "nip": nip,
+                "city": city,
+                "website": website,
+                "social_links": social_links.model_dump(mode="json") if social_links else None,
+                "skip_social": skip_social,
+                "skip_ai": skip_ai,
+                "skip_reviews": skip_reviews,
+                "core_only": core_only,
+            }
+            self.logger.info("[INPUT] Orchestrator.analyze | %s", input_data)
         
         # W trybie core_only automatycznie pomijamy social i reviews
         if core_only:
@@ -312,14 +502,33 @@ class CompanyIntelOrchestrator:
             social_media=social_links or SocialMediaLinks(),
             metadata=Metadata(sources_used=[]),
         )
+        # Czasy kroków (profilowanie) - wypełniane także gdy analiza przerwie się błędem
+        timings = result.metadata.step_timings_ms
         
         total_cost = 0.0
         
+        # Google Maps (po nazwie) i ZnanyLekarz nie zależą od strony WWW -
+        # działają równolegle z pozostałymi krokami
+        maps_tasks: dict[str, asyncio.Task] = {}
+        zl_task: Optional[asyncio.Task] = None
+        
+        def _start_maps_search(search_name: str) -> None:
+            if search_name not in maps_tasks:
+                maps_tasks[search_name] = asyncio.create_task(self.google_maps_scraper.execute(
+                    company_name=search_name,
+                    city=city,
+                    max_places=5,
+                    website=website,  # Filtruj wyniki po stronie WWW
+                ))
+        
         try:
+            # Spekulacyjnie (płatny run Apify przed krokiem 1) tylko gdy włączone w ustawieniach
+            if company_name and self.settings.apify_speculative_maps:
+                _start_maps_search(company_name)
             # === KROK 1: Scraping strony WWW ===
             if website:
                 self.logger.info("Step 1: Scraping website...")
-                website_result = await self.website_scraper.execute(url=website)
+                website_result = await _timed(timings, "website", self.website_scraper.execute(url=website))
                 
                 if website_result.success:
                     data = website_result.data
@@ -355,7 +564,7 @@ class CompanyIntelOrchestrator:
                             self.logger.info("Found NIP on website: %s - validating...", extracted_nip)
                             
                             # Walidacja i lookup w GUS
-                            lookup_result = await self.nip_lookup.lookup(extracted_nip)
+                            lookup_result = await _timed(timings, "nip_lookup", self.nip_lookup.lookup(extracted_nip))
                             
                             if lookup_result.found:
                                 # NIP jest poprawny (potwierdzony przez GUS lub Google)
@@ -375,7 +584,6 @@ class CompanyIntelOrchestrator:
                                     
                                     # Adres siedziby z GUS
                                     if gus.city or gus.street:
-                                        from .models import Adres
                                         ulica = gus.street or ""
                                         if gus.building_number:
                                             ulica = f"{ulica} {gus.building_number}"
@@ -405,6 +613,26 @@ class CompanyIntelOrchestrator:
                 page_text = ""
                 page_title = ""
             
+            # BRAMKA: skip_reviews - pomija scraping i analizę recenzji ZnanyLekarz
+            if company_name and city and not skip_reviews:
+                # Strona bez żadnego słowa medycznego (ani w nazwie) - to nie placówka medyczna,
+                # profilu ZnanyLekarz nie będzie; nie startuj scrapingu ani analizy recenzji AI.
+                # Za krótki tekst nie jest podstawą do decyzji.
+                if (
+                    len(page_text) >= self.settings.ai_min_page_text_chars
+                    and not _MEDICAL_SIGNAL.search(page_text)
+                    and not _MEDICAL_SIGNAL.search(company_name)
+                ):
+                    self.logger.info("Step 2B: SKIPPED - no medical signal on website")
+                    result.metadata.warnings.append("ZnanyLekarz: skipped - no medical signal on website")
+                else:
+                    # Scraping w tle - równolegle z krokami 1.5-2, wynik odbierany w kroku 2B
+                    zl_task = asyncio.create_task(self.znanylekarz_scraper.execute(
+                        company_name=company_name,
+                        city=city,
+                        max_reviews=50,
+                    ))
+            
             # === KROK 1.5a: TANIE szukanie NIP w Zoho po danych ze strony ===
             # ZAKOMENTOWANE NA CZAS TESTÓW ZEWNĘTRZNYCH SERWISÓW (NIPFinderV3)
             # TODO: Odkomentować po testach!
@@ -464,12 +692,12 @@ class CompanyIntelOrchestrator:
                     # PEŁNA KASKADA V3: privacy -> google+AI -> homepage -> brave
                     # UWAGA: NIPFinderV3 ekstrauje domenę z emaila - tworzymy fake email z domeny
                     fake_email = f"info@{search_domain}" if search_domain else None
-                    nip_result = await self.nip_finder_v3.find_nip(
+                    nip_result = await _timed(timings, "nip_finder_v3", self.nip_finder_v3.find_nip(
                         company_name=search_name,
                         city=city,
                         email=fake_email,  # Fake email żeby NIPFinderV3 wyciągnął domenę
                         skip_cache=True,  # Pomiń cache - chcemy świeże wyniki
-                    )
+                    ))
                     
                     if nip_result and nip_result.found and nip_result.nip:
                         strategy_name = nip_result.strategy_used.value if nip_result.strategy_used else "unknown"
@@ -479,7 +707,7 @@ class CompanyIntelOrchestrator:
                         )
                         
                         # Walidacja w GUS (może już być z kaskady, ale dla pewności)
-                        lookup_result = await self.nip_lookup.lookup(nip_result.nip)
+                        lookup_result = await _timed(timings, "nip_lookup", self.nip_lookup.lookup(nip_result.nip))
                         if lookup_result.found:
                             result.nip = nip_result.nip
                             self.logger.info("NIP validated via GUS: %s", nip_result.nip)
@@ -491,7 +719,6 @@ class CompanyIntelOrchestrator:
                                 if gus.full_name and (not result.nazwa_pelna or len(gus.full_name) > len(result.nazwa_pelna)):
                                     result.nazwa_pelna = gus.full_name
                                 if gus.city or gus.street:
-                                    from .models import Adres
                                     result.adres_siedziby = Adres(
                                         ulica=gus.street,
                                         kod=gus.zip_code,
@@ -525,14 +752,13 @@ class CompanyIntelOrchestrator:
             all_placowki = []
             all_reviews = {}
             
+            # Wszystkie wyszukiwania równolegle (po pełnej nazwie może już trwać)
+            for search_name in search_names:
+                _start_maps_search(search_name)
+            
             for search_name in search_names:
                 self.logger.info("Step 2: Searching Google Maps for '%s'...", search_name[:50])
-                maps_result = await self.google_maps_scraper.execute(
-                    company_name=search_name,
-                    city=city,
-                    max_places=5,
-                    website=website,  # Filtruj wyniki po stronie WWW
-                )
+                maps_result = await _timed(timings, "google_maps", maps_tasks[search_name])
                 
                 if maps_result.success:
                     placowki = maps_result.data.get("placowki", [])
@@ -572,30 +798,31 @@ class CompanyIntelOrchestrator:
                 result.placowki = all_placowki
                 
                 # Kontakty ogolne z WWW trafiaja do WSZYSTKICH placowek
+                # (duplikaty usuwa lokalna deduplikacja kontaktów po analizie)
                 if www_kontakty:
                     for placowka in result.placowki:
-                        google_kontakty = placowka.kontakty
-                        merged = www_kontakty + google_kontakty
-                        seen = set()
-                        unique_kontakty = []
-                        for k in merged:
-                            if k.wartosc not in seen:
-                                seen.add(k.wartosc)
-                                unique_kontakty.append(k)
-                        placowka.kontakty = unique_kontakty
+                        placowka.kontakty = www_kontakty + placowka.kontakty
                 
                 # === ANALIZA RECENZJI Z GOOGLE MAPS ===
                 if all_reviews and not skip_reviews:
                     self.logger.info("Step 2.5: Analyzing Google Maps reviews for %d places...", len(all_reviews))
-                    for placowka in result.placowki:
-                        if placowka.google_maps_place_id in all_reviews:
-                            reviews_data = all_reviews[placowka.google_maps_place_id]
-                            insights = await self.reviews_analyzer.analyze(
-                                reviews_data=reviews_data,
-                                place_name=f"{company_name} - {placowka.adres.miasto}",
-                            )
-                            if insights:
-                                placowka.reviews_insights = insights
+                    # Placówki analizowane równolegle (limit wywołań AI w ReviewsAnalyzer)
+                    # (placówka, jej recenzje) - jedno wyszukanie w słowniku na placówkę
+                    reviewed = [
+                        (p, reviews_data)
+                        for p in result.placowki
+                        if (reviews_data := all_reviews.get(p.google_maps_place_id)) is not None
+                    ]
+                    insights_list = await _timed(timings, "google_reviews_analysis", asyncio.gather(*(
+                        self.reviews_analyzer.analyze(
+                            reviews_data=reviews_data,
+                            place_name=f"{company_name} - {placowka.adres.miasto}",
+                        )
+                        for placowka, reviews_data in reviewed
+                    )))
+                    for (placowka, _), insights in zip(reviewed, insights_list):
+                        if insights:
+                            placowka.reviews_insights = insights
                 elif all_reviews and skip_reviews:
                     self.logger.info("Step 2.5: SKIPPED - reviews analysis disabled (skip_reviews=True)")
                 
@@ -606,24 +833,20 @@ class CompanyIntelOrchestrator:
                 result.metadata.warnings.append("Google Maps: no places found for any search name")
             
             # === KROK 2B: ZnanyLekarz (opinie o komunikacji) ===
-            # BRAMKA: skip_reviews - pomija scraping i analizę recenzji ZnanyLekarz
-            if company_name and city and not skip_reviews:
+            # Scraping wystartował po kroku 1 (zl_task)
+            if zl_task is not None:
                 self.logger.info("Step 2B: Scraping ZnanyLekarz...")
-                zl_result = await self.znanylekarz_scraper.execute(
-                    company_name=company_name,
-                    city=city,
-                    max_reviews=50,
-                )
+                zl_result = await _timed(timings, "znanylekarz", zl_task)
                 
                 if zl_result.success and zl_result.data.get("reviews"):
                     zl_reviews = zl_result.data.get("reviews", [])
                     
                     self.logger.info("Step 2B.1: Analyzing ZnanyLekarz reviews...")
                     # Analiza recenzji ZnanyLekarz (fokus na komunikacji)
-                    zl_insights = await self.reviews_analyzer.analyze(
+                    zl_insights = await _timed(timings, "znanylekarz_reviews_analysis", self.reviews_analyzer.analyze(
                         reviews_data=zl_reviews,
                         place_name=f"{company_name} (ZnanyLekarz)",
-                    )
+                    ))
                     
                     # Dodaj insights do pierwszej placówki (lub stwórz nową sekcję)
                     if zl_insights and result.placowki:
@@ -632,13 +855,16 @@ class CompanyIntelOrchestrator:
                             # Połącz insights z obu źródeł
                             existing = result.placowki[0].reviews_insights
                             existing.total_reviews_analyzed += zl_insights.total_reviews_analyzed
-                            existing.top_complaints.extend(zl_insights.top_complaints)
-                            existing.top_praises.extend(zl_insights.top_praises)
-                            existing.common_themes.extend(zl_insights.common_themes)
-                            # Deduplikuj
-                            existing.top_complaints = list(dict.fromkeys(existing.top_complaints))[:5]
-                            existing.top_praises = list(dict.fromkeys(existing.top_praises))[:5]
-                            existing.common_themes = list(dict.fromkeys(existing.common_themes))[:5]
+                            # Bez duplikatów (insights po treści), max 5 na listę
+                            existing.top_complaints = _merge_unique_capped(
+                                existing.top_complaints, zl_insights.top_complaints, key=lambda i: i.insight,
+                            )
+                            existing.top_praises = _merge_unique_capped(
+                                existing.top_praises, zl_insights.top_praises, key=lambda i: i.insight,
+                            )
+                            existing.common_themes = _merge_unique_capped(
+                                existing.common_themes, zl_insights.common_themes,
+                            )
                         else:
                             result.placowki[0].reviews_insights = zl_insights
                     
@@ -657,58 +883,64 @@ class CompanyIntelOrchestrator:
             # === KROK 3: Social Media (równolegle) ===
             if not skip_social:
                 self.logger.info("Step 3: Scraping social media...")
-                social_profiles = await self._scrape_social_media(
+                social_profiles = await _timed(timings, "social_media", self._scrape_social_media(
                     result.social_media,
                     result.metadata,
-                )
+                ))
                 result.social_profiles = social_profiles
                 
                 # Oblicz koszt social
                 # (koszty są w ScraperResult, ale tu upraszczamy)
             
             # === KROK 4: Kategoryzacja AI ===
-            if not skip_ai and page_text:
+            # Za krótki tekst (strona w budowie, sam formularz) nie daje sensownej kategoryzacji
+            if not skip_ai and len(page_text) >= self.settings.ai_min_page_text_chars:
                 self.logger.info("Step 4: AI categorization...")
-                result.kategoryzacja_ai = await self.ai_categorizer.categorize(
-                    page_text=page_text,
+                page_text_for_ai = _truncate_at_paragraph(page_text, self.settings.ai_max_page_text_chars)
+                if len(page_text_for_ai) < len(page_text):
+                    result.metadata.warnings.append(
+                        f"AI categorization: page text truncated to {len(page_text_for_ai)}/{len(page_text)} chars"
+                    )
+                result.kategoryzacja_ai = await _timed(timings, "ai_categorization", self.ai_categorizer.categorize(
+                    page_text=page_text_for_ai,
                     company_name=company_name or page_title,
-                )
+                ))
                 result.metadata.sources_used.append("ai_categorization")
             
             # === KROK 5: Nazwa zwyczajowa ===
+            # Krótka nazwa z tytułu strony policzona już w kroku 1.6
             if page_title and not result.nazwa_zwyczajowa:
-                result.nazwa_zwyczajowa = self._extract_short_name(
-                    page_title,
-                    company_name,
-                )
+                result.nazwa_zwyczajowa = short_name
             
         except Exception as e:
             self.logger.exception("Analysis failed: %s", e)
             result.metadata.errors.append(f"Analysis error: {str(e)}")
-        
-        # === DEDUPLIKACJA PLACÓWEK PO ADRESIE ===
-        # Grupuj placówki po adresie i wybierz najlepszą (z najwyższym ratingiem)
-        # WAŻNE: Musi być PRZED scoring żeby liczba placówek była prawidłowa
-        result.placowki = self._deduplicate_placowki(result.placowki)
+        finally:
+            # Po błędzie wcześniejszego kroku nie zostawiaj scrapingu w tle
+            for task in (*maps_tasks.values(), zl_task):
+                if task is not None and not task.done():
+                    task.cancel()
         
         # === LOKALNA DEDUPLIKACJA KONTAKTÓW ===
         # Usuń duplikaty WEWNĄTRZ każdej placówki (ale nie między placówkami)
         # Kontakty ogólne firmy powinny być przy WSZYSTKICH placówkach
+        # Jedyne miejsce deduplikacji kontaktów WWW + Google (pierwsze wystąpienie wygrywa) -
+        # przed deduplikacją placówek, żeby porównywała liczbę unikalnych kontaktów
         for placowka in result.placowki:
-            seen = set()
-            unique_kontakty = []
-            for k in placowka.kontakty:
-                if k.wartosc not in seen:
-                    seen.add(k.wartosc)
-                    unique_kontakty.append(k)
-            placowka.kontakty = unique_kontakty
+            placowka.kontakty = _unique_kontakty(placowka.kontakty)
+        
+        # === DEDUPLIKACJA PLACÓWEK PO ADRESIE ===
+        # Grupuj placówki po adresie i wybierz najlepszą (z najwyższym ratingiem)
+        # WAŻNE: Musi być PRZED scoring żeby liczba placówek była prawidłowa
+        # Scalanie kontaktów duplikatów zachowuje unikalność
+        result.placowki = self._deduplicate_placowki(result.placowki)
         
         # === KROK 5.4: NORMALIZACJA DANYCH I NAZWY PLACÓWEK ===
         # 1. Maile małymi literami
         # 2. Nazwy WIELKIMI LITERAMI
         # 3. Generuj nazwa_placowki: [BRAND] [MIASTO] [ULICA]
         # 4. Wyciągnij brand name przez AI (słowo klucz marketingowe)
-        await self._normalize_and_name_placowki_async(result, page_title, page_text)
+        await _timed(timings, "normalization", self._normalize_and_name_placowki_async(result, page_title, page_text))
         
         # === KROK 5.5: ZOHO CRM LOOKUP ===
         # Sprawdź czy placówki istnieją w Zoho CRM
@@ -717,7 +949,7 @@ class CompanyIntelOrchestrator:
             self.logger.info("Step 5.5: Checking Zoho CRM for NIP %s...", result.nip)
             try:
                 # Pobierz wszystkie lokalizacje firmy z Zoho PO NIP
-                zoho_locations = await self.zoho_lookup.lookup_by_nip(result.nip)
+                zoho_locations = await _timed(timings, "zoho_crm", self.zoho_lookup.lookup_by_nip(result.nip))
                 
                 if zoho_locations:
                     self.logger.info("Zoho: Found %d existing locations in CRM for NIP %s", len(zoho_locations), result.nip)
@@ -762,9 +994,9 @@ class CompanyIntelOrchestrator:
             self.logger.info("Step 6: SKIPPED - activity score disabled (core_only=True)")
         
         # === FINALIZACJA ===
-        result.metadata.processing_time_ms = int((time.time() - start_time) * 1000)
+        result.metadata.processing_time_ms = int((time.perf_counter() - start_time) * 1000)
         result.metadata.cost_usd = total_cost
-        result.metadata.scraped_at = datetime.utcnow()
+        result.metadata.scraped_at = utc_now()
         
         # Output logging
         score_total = result.activity_score.total if result.activity_score else 0
@@ -777,13 +1009,15 @@ class CompanyIntelOrchestrator:
             score_total,
             score_recommendation,
         )
-        
-        self.logger.info(
-            "=== Analysis complete: %s | Score: %d | Sources: %s ===",
-            company_name,
-            score_total,
-            ", ".join(result.metadata.sources_used),
-        )
+        self.logger.debug("[OUTPUT] Orchestrator.analyze | step timings (ms): %s", timings)
+        
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                "=== Analysis complete: %s | Score: %d | Sources: %s ===",
+                company_name,
+                score_total,
+                ", ".join(result.metadata.sources_used),
+            )
         
         return result
     
@@ -841,7 +1075,7 @@ class CompanyIntelOrchestrator:
         Returns:
             dict z social_profiles, activity_score, reviews_insights (opcjonalnie)
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Scraping social media
         metadata = Metadata(sources_used=[])
@@ -859,7 +1093,7 @@ class CompanyIntelOrchestrator:
             "activity_score": activity_score.total if hasattr(activity_score, 'total') else 0,
             "activity_recommendation": activity_score.recommendation.value if hasattr(activity_score, 'recommendation') else None,
             "sources_used": metadata.sources_used,
-            "processing_time_ms": int((time.time() - start_time) * 1000),
+            "processing_time_ms": int((time.perf_counter() - start_time) * 1000),
         }
         
         # Opcjonalnie: analiza recenzji
@@ -907,14 +1141,16 @@ class CompanyIntelOrchestrator:
         # Wykonaj równolegle
         self.logger.info("Scraping %d social profiles...", len(tasks))
         
+        async def _limited(platform: str, coro):
+            async with self._social_semaphores[platform]:
+                return await coro
+        
         results = await asyncio.gather(
-            *[task for _, task in tasks],
+            *[_limited(platform, task) for platform, task in tasks],
             return_exceptions=True,
         )
         
-        for i, (platform, _) in enumerate(tasks):
-            result = results[i]
-            
+        for (platform, _), result in zip(tasks, results):
             if isinstance(result, Exception):
                 self.logger.warning("%s scraping exception: %s", platform, result)
                 metadata.warnings.append(f"{platform} failed: {str(result)}")
@@ -1007,24 +1243,37 @@ class CompanyIntelOrchestrator:
         
         Jeśli kilka placówek ma ten sam adres (ulica + miasto),
         wybiera tę z najlepszym ratingiem/liczbą recenzji.
+        
+        Kolejność wyniku (niezależnie od tego, czy były duplikaty): placówki
+        z adresem w kolejności pierwszego wystąpienia adresu, na końcu placówki
+        bez adresu w kolejności wejściowej.
         """
         if not placowki:
             return []
         
-        # Grupuj po adresie
-        from collections import defaultdict
-        address_groups = defaultdict(list)
-        
+        # Klucz: ulica + miasto (normalizowane: wielkość liter, wielokrotne spacje).
+        # Placówek bez adresu (pusta ulica i miasto) nie da się porównać - nie są duplikatami
+        with_address: list[tuple[tuple[str, str], Placowka]] = []
+        no_address: list[Placowka] = []
         for p in placowki:
-            if not p.adres:
-                address_groups[None].append(p)
-                continue
-            
-            # Klucz: ulica + miasto (normalizowane)
-            ulica = (p.adres.ulica or "").strip().lower()
-            miasto = (p.adres.miasto or "").strip().lower()
-            key = (ulica, miasto)
-            address_groups[key].append(p)
+            key = (_normalize_address_part(p.adres.ulica), _normalize_address_part(p.adres.miasto))
+            if any(key):
+                with_address.append((key, p))
+            else:
+                no_address.append(p)
+        
+        # Najczęstszy przypadek - wszystkie adresy różne, nie ma czego scalać
+        if len({key for key, _ in with_address}) == len(with_address):
+            return [p for _, p in with_address] + no_address
+        
+        # Grupuj po adresie
+        address_groups: dict[tuple[str, str], list[Placowka]] = {}
+        for key, p in with_address:
+            group = address_groups.get(key)
+            if group is None:
+                address_groups[key] = [p]
+            else:
+                group.append(p)
         
         # Wybierz najlepszą placówkę z każdej grupy
         result = []
@@ -1032,26 +1281,11 @@ class CompanyIntelOrchestrator:
             if len(group) == 1:
                 result.append(group[0])
             else:
-                # Wybierz placówkę z najlepszym ratingiem
-                best = max(
-                    group,
-                    key=lambda p: (
-                        p.google_reviews_count or 0,  # Najpierw liczba recenzji
-                        p.google_rating or 0,  # Potem rating
-                        len(p.kontakty),  # Potem liczba kontaktów
-                    )
-                )
+                # Wybierz placówkę z najlepszym ratingiem (przy remisie pierwsza)
+                best = max(group, key=_placowka_rank)
                 
                 # Merge kontaktów z wszystkich duplikatów
-                all_contacts = []
-                seen = set()
-                for p in group:
-                    for k in p.kontakty:
-                        if k.wartosc not in seen:
-                            seen.add(k.wartosc)
-                            all_contacts.append(k)
-                
-                best.kontakty = all_contacts
+                best.kontakty = _unique_kontakty(k for p in group for k in p.kontakty)
                 result.append(best)
                 
                 self.logger.info(
@@ -1063,6 +1297,7 @@ class CompanyIntelOrchestrator:
                     best.google_reviews_count or 0,
                 )
         
+        result.extend(no_address)
         return result
     
     def _cross_validate_contacts(
@@ -1074,29 +1309,17 @@ class CompanyIntelOrchestrator:
         Porównuje kontakty z WWW i Google Maps.
         Zwraca DataValidation z informacją o niespójnościach.
         """
-        import re
-        
         validation = DataValidation()
         discrepancies = []
         
-        # Normalizuj telefony (tylko cyfry)
-        def normalize_phone(phone: str) -> str:
-            digits = re.sub(r'\D', '', phone)
-            return digits[-9:] if len(digits) >= 9 else digits
-        
-        # Wyciągnij telefony
-        www_phones = {normalize_phone(k.wartosc) for k in www_kontakty if k.typ == "telefon"}
-        google_phones = {normalize_phone(k.wartosc) for k in google_kontakty if k.typ == "telefon"}
-        
-        # Wyciągnij emaile
-        www_emails = {k.wartosc.lower() for k in www_kontakty if k.typ == "email"}
-        google_emails = {k.wartosc.lower() for k in google_kontakty if k.typ == "email"}
+        # Telefony (ostatnie 9 cyfr) i emaile (małe litery) - jedno przejście na listę
+        www_phones, www_emails = _phones_and_emails(www_kontakty)
+        google_phones, google_emails = _phones_and_emails(google_kontakty)
         
         # Sprawdź rozbieżności telefonów
         if www_phones and google_phones:
-            # Sprawdź czy jest wspólny telefon
-            common_phones = www_phones & google_phones
-            if not common_phones:
+            # Sprawdź czy jest wspólny telefon (isdisjoint kończy na pierwszym wspólnym)
+            if www_phones.isdisjoint(google_phones):
                 discrepancies.append(
                     f"Brak wspólnego telefonu: WWW ma {len(www_phones)}, Google Maps ma {len(google_phones)}"
                 )
@@ -1109,8 +1332,7 @@ class CompanyIntelOrchestrator:
         
         # Sprawdź rozbieżności emaili
         if www_emails and google_emails:
-            common_emails = www_emails & google_emails
-            if not common_emails:
+            if www_emails.isdisjoint(google_emails):
                 discrepancies.append(
                     f"Brak wspólnego emaila między WWW i Google Maps"
                 )
@@ -1137,8 +1359,6 @@ class CompanyIntelOrchestrator:
         3. Wyciąga BRAND NAME przez AI (słowo klucz marketingowe)
         4. Generuje nazwa_placowki: [BRAND] [MIASTO] [ULICA]
         """
-        import re
-        
         # Normalizuj nazwy firmy na WIELKIE LITERY
         if result.nazwa_pelna:
             result.nazwa_pelna = result.nazwa_pelna.upper()
@@ -1167,10 +1387,13 @@ class CompanyIntelOrchestrator:
         siedziba_found = False
         
         for placowka in result.placowki:
-            # === 1. Normalizuj maile na małe litery ===
-            for kontakt in placowka.kontakty:
-                if kontakt.typ == "email" and kontakt.wartosc:
-                    kontakt.wartosc = kontakt.wartosc.lower()
+            # === 1. Normalizuj maile na małe litery (Kontakt jest niemutowalny) ===
+            placowka.kontakty = [
+                kontakt.model_copy(update={"wartosc": kontakt.wartosc.lower()})
+                if kontakt.typ == "email" and kontakt.wartosc and not kontakt.wartosc.islower()
+                else kontakt
+                for kontakt in placowka.kontakty
+            ]
             
             # === 2. Określ czy to siedziba ===
             placowka_key = self._normalize_address_key(placowka.adres)
@@ -1206,7 +1429,6 @@ class CompanyIntelOrchestrator:
             return ""
         
         # Usuń typowe sufiksy
-        import re
         name = full_name.upper()
         
         # Usuń sufiksy prawne
@@ -1265,7 +1487,6 @@ class CompanyIntelOrchestrator:
         # Ulica - sprawdź czy jedna zawiera drugą (bo numery mogą się różnić)
         if ulica1 and ulica2:
             # Wyciągnij tylko nazwę ulicy (bez numeru)
-            import re
             name1 = re.match(r"^([a-ząćęłńóśźż\s\-\"]+)", ulica1, re.IGNORECASE)
             name2 = re.match(r"^([a-ząćęłńóśźż\s\-\"]+)", ulica2, re.IGNORECASE)
             
@@ -1285,20 +1506,8 @@ class CompanyIntelOrchestrator:
         if not page_title:
             return company_name
         
-        # Usuń typowe sufiksy
-        suffixes = [
-            " - Strona główna",
-            " - Home",
-            " | Oficjalna strona",
-            " - Oficjalna strona",
-            " | ",
-            " - ",
-        ]
-        
-        result = page_title
-        for suffix in suffixes:
-            if suffix in result:
-                result = result.split(suffix)[0]
+        # Usuń typowe sufiksy ("- Strona główna", "| Oficjalna strona", ...) - jednym przejściem
+        result = _TITLE_SEPARATOR_RE.split(page_title, maxsplit=1)[0]
         
         return result.strip()[:100] if result else company_name
     
@@ -1385,7 +1594,6 @@ class CompanyIntelOrchestrator:
             if accepted:
                 result.nazwa_pelna = accepted.gus_name
                 if accepted.gus_city or accepted.gus_street:
-                    from .models import Adres
                     result.adres_siedziby = Adres(
                         ulica=accepted.gus_street,
                         miasto=accepted.gus_city,
@@ -1447,12 +1655,27 @@ class CompanyIntelOrchestrator:
     
     async def close(self) -> None:
         """Zamyka wszystkie zasoby."""
-        await self.website_scraper.close()
-        await self.google_maps_scraper.close()
-        await self.facebook_scraper.close()
-        await self.instagram_scraper.close()
-        await self.tiktok_scraper.close()
-        await self.ai_categorizer.close()
-        await self.nip_lookup.close()
+        components = [
+            self.website_scraper,
+            self.google_maps_scraper,
+            self.facebook_scraper,
+            self.instagram_scraper,
+            self.tiktok_scraper,
+            self.ai_categorizer,
+            self.nip_lookup,
+            self.chaotic_router,
+        ]
         if self.nip_finder_v3:
-            await self.nip_finder_v3.close()
+            components.append(self.nip_finder_v3)
+        
+        # Niezależne komponenty zamykane równolegle; błąd jednego nie blokuje pozostałych
+        results = await asyncio.gather(
+            *(component.close() for component in components),
+            return_exceptions=True,
+        )
+        for component, error in zip(components, results):
+            if isinstance(error, BaseException):
+                self.logger.warning("Closing %s failed: %s", type(component).__name__, error)
+        
+        # Wspólna pula HTTP na końcu - komponenty mogą jej używać do ostatniej chwili
+        await self.http_client.aclose()
@@ -12,11 +12,15 @@ import logging
 import time
 import json
 from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Optional, TypeVar, Generic
+from typing import Any, AsyncIterator, Optional, TypeVar, Generic
+
+import httpx
 
 from ..config import CompanyIntelSettings, get_settings
+from ..models import utc_now
 
 
 # Setup loggera z formatowaniem
@@ -46,7 +50,7 @@ class ScraperResult:
     error: Optional[str] = None
     
     # Timing
-    started_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: datetime = field(default_factory=utc_now)
     finished_at: Optional[datetime] = None
     duration_ms: int = 0
     
@@ -94,6 +98,28 @@ class BaseScraper(ABC):
             self.settings.log_level
         )
         self._scraper_name = self.__class__.__name__
+        self._http_client: Optional[httpx.AsyncClient] = None  # klient wstrzyknięty z zewnątrz
+    
+    def set_http_client(self, client: httpx.AsyncClient) -> None:
+        """
+        Ustawia współdzielony klient HTTP (np. pula połączeń orchestratora).
+        
+        Klient zewnętrzny nie jest zamykany przez scraper - jego cyklem życia
+        zarządza właściciel.
+        """
+        self._http_client = client
+    
+    @asynccontextmanager
+    async def _http_session(self) -> AsyncIterator[httpx.AsyncClient]:
+        """
+        Klient HTTP na czas wywołania: wstrzyknięty (keep-alive między wywołaniami)
+        albo tymczasowy. Timeout, nagłówki i redirecty przekazuj per request.
+        """
+        if self._http_client is not None and not self._http_client.is_closed:
+            yield self._http_client
+        else:
+            async with httpx.AsyncClient() as client:
+                yield client
     
     def _log_input(self, method: str, input_data: dict) -> None:
         """Loguje dane wejściowe."""
@@ -151,11 +177,11 @@ class BaseScraper(ABC):
         - Timing
         - Obsługę błędów
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = ScraperResult(
             source=self._scraper_name,
             input_data=kwargs,
-            started_at=datetime.utcnow(),
+            started_at=utc_now(),
         )
         
         # Log input
@@ -174,8 +200,8 @@ class BaseScraper(ABC):
         
         finally:
             # Timing
-            result.finished_at = datetime.utcnow()
-            result.duration_ms = int((time.time() - start_time) * 1000)
+            result.finished_at = utc_now()
+            result.duration_ms = int((time.perf_counter() - start_time) * 1000)
             
             # Log output
             self._log_output("execute", result)
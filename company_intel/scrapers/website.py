@@ -80,6 +80,13 @@ class WebsiteScraper(BaseScraper):
         re.IGNORECASE
     )
     
+    # Nagłówki przeglądarki (przekazywane per request - klient bywa współdzielony)
+    REQUEST_HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "pl-PL,pl;q=0.9,en;q=0.8",
+    }
+    
     # Strony do przeszukania
     PAGES_TO_CHECK = [
         "",  # Strona główna
@@ -141,18 +148,7 @@ class WebsiteScraper(BaseScraper):
         pages_scraped = 0
         ssl_failed = False
         
-        # Konfiguracja klienta z obsługą problemów SSL
-        client_kwargs = {
-            "timeout": self.settings.request_timeout_sec,
-            "follow_redirects": True,
-            "headers": {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-                "Accept-Language": "pl-PL,pl;q=0.9,en;q=0.8",
-            },
-        }
-        
-        async with httpx.AsyncClient(**client_kwargs) as client:
+        async with self._http_session() as client:
             
             for page_path in self.PAGES_TO_CHECK[:max_pages]:
                 page_url = urljoin(base_url, page_path)
@@ -243,10 +239,17 @@ class WebsiteScraper(BaseScraper):
         """
         import ssl
         
+        # Opcje per request - klient może być współdzielony z innymi scraperami
+        request_kwargs = {
+            "timeout": self.settings.request_timeout_sec,
+            "follow_redirects": True,
+            "headers": self.REQUEST_HEADERS,
+        }
+        
         # Strategia 1: Normalny request
         if not ssl_already_failed:
             try:
-                return await client.get(url)
+                return await client.get(url, **request_kwargs)
             except (httpx.ConnectError, ssl.SSLError, Exception) as e:
                 error_str = str(e).lower()
                 if "ssl" in error_str or "certificate" in error_str or "tls" in error_str:
@@ -258,12 +261,9 @@ class WebsiteScraper(BaseScraper):
         # Strategia 2: Ignoruj błędy SSL (verify=False)
         try:
             async with httpx.AsyncClient(
-                timeout=self.settings.request_timeout_sec,
-                follow_redirects=True,
                 verify=False,  # Ignoruj błędy certyfikatu
-                headers=client.headers,
             ) as insecure_client:
-                response = await insecure_client.get(url)
+                response = await insecure_client.get(url, **request_kwargs)
                 self.logger.info("Fetched %s with verify=False", url)
                 return response
         except Exception as e:
@@ -273,7 +273,7 @@ class WebsiteScraper(BaseScraper):
         if url.startswith("https://"):
             http_url = url.replace("https://", "http://", 1)
             try:
-                response = await client.get(http_url)
+                response = await client.get(http_url, **request_kwargs)
                 self.logger.info("Fetched via HTTP fallback: %s", http_url)
                 return response
             except Exception as e:
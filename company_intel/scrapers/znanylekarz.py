@@ -110,12 +110,12 @@ class ZnanyLekarzScraper(BaseScraper):
                 search_query += f' {city}'
             
             # Użyj httpx do prostego wyszukania
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+            async with self._http_session() as client:
                 # Spróbuj bezpośredniego URL (zgadnij slug)
                 slug = self._make_slug(company_name)
                 direct_url = f"https://www.znanylekarz.pl/placowki/{slug}"
                 
-                response = await client.get(direct_url)
+                response = await client.get(direct_url, timeout=30.0, follow_redirects=True)
                 if response.status_code == 200:
                     self.logger.info("Found via direct URL: %s", direct_url)
                     return direct_url
@@ -127,6 +127,8 @@ class ZnanyLekarzScraper(BaseScraper):
                 response = await client.get(
                     google_url,
                     headers={"User-Agent": "Mozilla/5.0"},
+                    timeout=30.0,
+                    follow_redirects=True,
                 )
                 
                 if response.status_code != 200:
@@ -66,6 +66,7 @@ class ZohoLookupScraper:
         self.settings = settings or get_settings()
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self._http_client: Optional[httpx.AsyncClient] = None
+        self._owns_http_client = True
         self._access_token: Optional[str] = None
         self._token_expires_at: float = 0
     
@@ -94,17 +95,28 @@ class ZohoLookupScraper:
     
     async def _get_client(self) -> httpx.AsyncClient:
         """Lazy initialization klienta HTTP."""
-        if self._http_client is None:
+        # Współdzielony klient mógł zostać zamknięty przez właściciela
+        if self._http_client is None or self._http_client.is_closed:
             self._http_client = httpx.AsyncClient(
                 timeout=httpx.Timeout(self.REQUEST_TIMEOUT),
             )
+            self._owns_http_client = True
         return self._http_client
     
+    def set_http_client(self, client: httpx.AsyncClient) -> None:
+        """
+        Ustawia współdzielony klient HTTP (np. z ChaoticDataRouter).
+        
+        Klient zewnętrzny nie jest zamykany w close().
+        """
+        self._http_client = client
+        self._owns_http_client = False
+    
     async def close(self):
         """Zamknij klienta HTTP."""
-        if self._http_client:
+        if self._http_client and self._owns_http_client:
             await self._http_client.aclose()
-            self._http_client = None
+        self._http_client = None
     
     async def _refresh_access_token(self) -> Optional[str]:
         """Odświeża access token używając refresh tokena."""
@@ -204,37 +204,36 @@ async def test_full_flow_mock():
     
     settings = get_settings()
     
-    # Router bez zewnętrznych serwisów
-    router = ChaoticDataRouter(
+    # Router bez zewnętrznych serwisów (samodzielnie - router zarządza klientem HTTP)
+    async with ChaoticDataRouter(
         settings=settings,
         nip_lookup=None,  # Bez GUS
         zoho_lookup=None,  # Bez Zoho
         nip_finder_v3=None,  # Bez NIPFinderV3
         vertex_ai_service=None,  # Użyje mocka
-    )
-    
-    test_inputs = [
-        "Aldent Wrocław 8941864949",
-        "5223210470 Fabskin",
-    ]
-    
-    for text in test_inputs:
-        print(f"\n--- Processing: '{text}' ---")
-        trace = await router.process(
-            raw_text=text,
-            skip_zoho=True,
-            skip_search=True,
-        )
+    ) as router:
+        test_inputs = [
+            "Aldent Wrocław 8941864949",
+            "5223210470 Fabskin",
+        ]
         
-        print(f"  Final NIP: {trace.final_nip}")
-        print(f"  Final Decision: {trace.final_nip_decision.value if trace.final_nip_decision else '?'}")
-        print(f"  Steps: {len(trace.steps)}")
-        for step in trace.steps:
-            status = "SKIP" if step.skipped else "OK"
-            print(f"    - {step.step_name}: {status} ({step.duration_ms}ms)")
-        print(f"  Candidates: {len(trace.nip_candidates)}")
-        for c in trace.nip_candidates:
-            print(f"    - {c.nip}: {c.decision.value} (score={c.total_score})")
+        for text in test_inputs:
+            print(f"\n--- Processing: '{text}' ---")
+            trace = await router.process(
+                raw_text=text,
+                skip_zoho=True,
+                skip_search=True,
+            )
+            
+            print(f"  Final NIP: {trace.final_nip}")
+            print(f"  Final Decision: {trace.final_nip_decision.value if trace.final_nip_decision else '?'}")
+            print(f"  Steps: {len(trace.steps)}")
+            for step in trace.steps:
+                status = "SKIP" if step.skipped else "OK"
+                print(f"    - {step.step_name}: {status} ({step.duration_ms}ms)")
+            print(f"  Candidates: {len(trace.nip_candidates)}")
+            for c in trace.nip_candidates:
+                print(f"    - {c.nip}: {c.decision.value} (score={c.total_score})")
 
 
 async def test_full_flow_real():
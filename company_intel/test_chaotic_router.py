@@ -0,0 +1,147 @@
+"""
+Testy ChaoticDataRouter - tryb szybki (return_trace=False), klient HTTP routera.
+
+Bez sieci: parser regex (fallback bez Vertex AI) i podmieniony NIPLookup.
+Uruchom: pytest company_intel/test_chaotic_router.py
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from company_intel import chaotic_router
+from company_intel.chaotic_router import ChaoticDataRouter, ProcessResult
+from company_intel.config import CompanyIntelSettings
+from company_intel.models import DecisionTrace
+from company_intel.nip_lookup import GUSCompanyData, NIPLookup, NIPLookupResult
+from company_intel.orchestrator import CompanyIntelOrchestrator
+from company_intel.scrapers.zoho_lookup import ZohoLookupScraper
+
+
+RAW_TEXT = "Awodent Warszawa NIP 1131088680"
+
+
+class FakeNIPLookup:
+    """NIPLookup zwracający stałą firmę z GUS."""
+
+    async def lookup(self, nip: str) -> NIPLookupResult:
+        return NIPLookupResult(
+            nip=nip,
+            gus_data=GUSCompanyData(nip=nip, full_name="AWODENT", city="Warszawa", found=True),
+            company_name="AWODENT",
+            city="Warszawa",
+            found=True,
+        )
+
+
+@pytest.fixture
+def step_counter(monkeypatch):
+    """Liczy utworzone StrategyStep."""
+    created = []
+    original = chaotic_router.StrategyStep
+
+    def counting_step(**fields):
+        step = original(**fields)
+        created.append(step)
+        return step
+
+    monkeypatch.setattr(chaotic_router, "StrategyStep", counting_step)
+    return created
+
+
+def _process(return_trace: bool):
+    router = ChaoticDataRouter(settings=None, nip_lookup=FakeNIPLookup())
+    return asyncio.run(router.process(RAW_TEXT, skip_zoho=True, skip_search=True, return_trace=return_trace))
+
+
+class TestReturnTrace:
+    """process() z pełnym śladem i w trybie szybkim."""
+
+    def test_full_trace_records_steps(self, step_counter):
+        trace = _process(return_trace=True)
+
+        assert isinstance(trace, DecisionTrace)
+        assert trace.final_nip == "1131088680"
+        assert [step.step_name for step in trace.steps] == [step.step_name for step in step_counter]
+        assert trace.steps
+
+    def test_fast_mode_builds_no_steps(self, step_counter):
+        result = _process(return_trace=False)
+
+        assert isinstance(result, ProcessResult)
+        assert step_counter == []
+
+    def test_fast_mode_matches_full_trace(self):
+        trace = _process(return_trace=True)
+        result = _process(return_trace=False)
+
+        assert result == ProcessResult(trace.final_nip, trace.final_nip_decision, trace.final_website)
+
+
+class TestRouterHttpClient:
+    """async with ChaoticDataRouter - klient wstrzykiwany tylko serwisom bez klienta."""
+
+    @pytest.fixture
+    def settings(self):
+        return CompanyIntelSettings(cache_enabled=False)
+
+    def test_close_restores_previous_clients(self, settings):
+        async def run():
+            own = httpx.AsyncClient()
+            with_client = NIPLookup(settings=settings)
+            with_client.set_http_client(own)
+            without_client = NIPLookup(settings=settings)
+            zoho = ZohoLookupScraper(settings=settings)
+
+            router = ChaoticDataRouter(
+                settings=settings,
+                nip_lookup=with_client,
+                zoho_lookup=zoho,
+                nip_finder_v3=without_client,
+            )
+            async with router:
+                router_client = router._http_client
+                assert router_client is not None
+                assert with_client._http_client is own
+                assert without_client._http_client is router_client
+                assert zoho._http_client is router_client
+
+            assert router_client.is_closed
+            assert router._http_client is None
+            # Poprzednie klienty wróciły, cudzy klient nie został zamknięty
+            assert with_client._http_client is own
+            assert not own.is_closed
+            assert without_client._http_client is None
+            assert zoho._http_client is None
+            await own.aclose()
+
+        asyncio.run(run())
+
+    def test_close_keeps_client_replaced_meanwhile(self, settings):
+        async def run():
+            lookup = NIPLookup(settings=settings)
+            router = ChaoticDataRouter(settings=settings, nip_lookup=lookup)
+            replacement = httpx.AsyncClient()
+            async with router:
+                lookup.set_http_client(replacement)
+            assert lookup._http_client is replacement
+            assert not replacement.is_closed
+            await replacement.aclose()
+
+        asyncio.run(run())
+
+    def test_no_pool_when_components_have_clients(self):
+        async def run():
+            orchestrator = CompanyIntelOrchestrator(settings=CompanyIntelSettings(cache_enabled=False))
+            try:
+                async with orchestrator.chaotic_router as router:
+                    # Klientem komponentów zarządza orchestrator - router nie otwiera własnej puli
+                    assert router._http_client is None
+                    assert orchestrator.nip_lookup._http_client is orchestrator.http_client
+                assert orchestrator.nip_lookup._http_client is orchestrator.http_client
+                assert not orchestrator.http_client.is_closed
+            finally:
+                await orchestrator.close()
+
+        asyncio.run(run())
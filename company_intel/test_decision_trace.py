@@ -0,0 +1,51 @@
+"""
+Testy DecisionTrace - wybór najlepszego kandydata SUSPECT.
+
+Uruchom: pytest company_intel/test_decision_trace.py
+"""
+
+from company_intel.models import CandidateDecision, DecisionTrace, NIPCandidate
+
+
+def _candidate(nip: str, score: int, decision: CandidateDecision = CandidateDecision.SUSPECT) -> NIPCandidate:
+    return NIPCandidate(nip=nip, total_score=score, decision=decision)
+
+
+class TestBestSuspect:
+    """DecisionTrace.best_suspect aktualizowany przy add_candidate()."""
+
+    def test_empty_trace(self):
+        assert DecisionTrace(input_raw="test").best_suspect is None
+
+    def test_highest_score_wins(self):
+        trace = DecisionTrace(input_raw="test")
+        trace.add_candidate(_candidate("1111111111", 30))
+        trace.add_candidate(_candidate("2222222222", 70))
+        trace.add_candidate(_candidate("3333333333", 50))
+
+        assert trace.best_suspect.nip == "2222222222"
+
+    def test_first_wins_on_tie(self):
+        trace = DecisionTrace(input_raw="test")
+        trace.add_candidate(_candidate("1111111111", 50))
+        trace.add_candidate(_candidate("2222222222", 50))
+
+        assert trace.best_suspect.nip == "1111111111"
+
+    def test_ignores_other_decisions(self):
+        trace = DecisionTrace(input_raw="test")
+        trace.add_candidate(_candidate("1111111111", 100, CandidateDecision.ACCEPT))
+        trace.add_candidate(_candidate("2222222222", 90, CandidateDecision.REJECT))
+        assert trace.best_suspect is None
+
+        trace.add_candidate(_candidate("3333333333", 10))
+        assert trace.best_suspect.nip == "3333333333"
+
+    def test_not_serialized(self):
+        trace = DecisionTrace(input_raw="test")
+        trace.add_candidate(_candidate("1111111111", 50))
+
+        data = trace.to_dict()
+        assert "best_suspect" not in data
+        assert "_best_suspect" not in data
+        assert [c["nip"] for c in data["nip_candidates"]] == ["1111111111"]
@@ -0,0 +1,52 @@
+"""
+Testy modeli Company Intel - CompanyIntel.new_batch.
+
+Uruchom: pytest company_intel/test_models.py
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from company_intel.models import CompanyIntel, Metadata
+
+
+BATCH_TIME = datetime(2026, 1, 15, 12, 0, tzinfo=timezone.utc)
+
+
+class TestNewBatch:
+    """CompanyIntel.new_batch - wspólny scraped_at dla całego batcha."""
+
+    def test_records_share_timestamp(self):
+        batch = CompanyIntel.new_batch(
+            [{"nip": "1131088680"}, {"nip": "5260250274"}],
+            now=BATCH_TIME,
+        )
+
+        assert [intel.nip for intel in batch] == ["1131088680", "5260250274"]
+        assert all(intel.metadata.scraped_at == BATCH_TIME for intel in batch)
+        # Każdy rekord ma własne metadane
+        assert batch[0].metadata is not batch[1].metadata
+
+    def test_default_now_is_shared_utc(self):
+        batch = CompanyIntel.new_batch([{"nip": "1131088680"}, {"nip": "5260250274"}])
+
+        assert batch[0].metadata.scraped_at == batch[1].metadata.scraped_at
+        assert batch[0].metadata.scraped_at.tzinfo is not None
+
+    def test_restamps_existing_instances(self):
+        earlier = BATCH_TIME - timedelta(hours=1)
+        analyzed = CompanyIntel(
+            nip="1131088680",
+            metadata=Metadata(scraped_at=earlier, sources_used=["gus", "website"], warnings=["brak WWW"]),
+        )
+
+        [stamped] = CompanyIntel.new_batch([analyzed], now=BATCH_TIME)
+
+        assert stamped.metadata.scraped_at == BATCH_TIME
+        assert stamped.metadata.sources_used == ["gus", "website"]
+        assert stamped.metadata.warnings == ["brak WWW"]
+        assert stamped.nip == "1131088680"
+        # Oryginał bez zmian
+        assert analyzed.metadata.scraped_at == earlier
+
+    def test_empty_batch(self):
+        assert CompanyIntel.new_batch([], now=BATCH_TIME) == []
@@ -0,0 +1,335 @@
+"""
+Testy NIPLookup bez sieci - walidacja NIP, lookup_many, lookup_minimal, paczki zapytań Google.
+
+Apify podmieniony przez httpx.MockTransport.
+Uruchom: pytest company_intel/test_nip_lookup.py
+"""
+
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+from company_intel import nip_lookup
+from company_intel.config import CompanyIntelSettings
+from company_intel.nip_lookup import (
+    APIFY_GOOGLE_SEARCH_URL,
+    GUSCompanyData,
+    NIPLookup,
+    NIPLookupResult,
+    NIPLookupSummary,
+    clear_lookup_cache,
+    validate_nip_checksum,
+    validate_nip_checksum_batch,
+)
+
+
+VALID_NIPS = ["1131088680", "5260250274", "8941864949", "5252344078", "1234563218"]
+INVALID_NIPS = [
+    "1234567890",  # zła cyfra kontrolna
+    "1131088681",
+    "1000000160",  # suma kontrolna = 10 - zawsze niepoprawny
+    "0000000001",
+]
+WRONG_LENGTH = ["", "113108868", "11310886800", "113-108-86-80", None]
+NON_ASCII = ["１１３１０８８６８０", "113108868a"]  # cyfry pełnej szerokości, litera
+
+
+@pytest.fixture
+def lookup():
+    clear_lookup_cache()
+    instance = NIPLookup(settings=CompanyIntelSettings(cache_enabled=False))
+    yield instance
+    clear_lookup_cache()
+
+
+class TestValidateNipChecksumBatch:
+    """validate_nip_checksum_batch daje te same wyniki co validate_nip_checksum."""
+
+    @pytest.mark.parametrize("nips", [
+        VALID_NIPS,
+        INVALID_NIPS,
+        WRONG_LENGTH,
+        NON_ASCII,
+        VALID_NIPS + INVALID_NIPS + WRONG_LENGTH + NON_ASCII,
+        [],
+    ])
+    def test_matches_scalar(self, nips):
+        assert validate_nip_checksum_batch(nips) == [validate_nip_checksum(n) for n in nips]
+
+    def test_mixed_order_preserved(self):
+        nips = ["1234567890", "1131088680", None, "5260250274"]
+        assert validate_nip_checksum_batch(nips) == [False, True, False, True]
+
+    def test_without_numpy(self, monkeypatch):
+        monkeypatch.setattr(nip_lookup, "NUMPY_AVAILABLE", False)
+        nips = VALID_NIPS + INVALID_NIPS + WRONG_LENGTH
+        assert validate_nip_checksum_batch(nips) == [validate_nip_checksum(n) for n in nips]
+
+
+class TestLookupMany:
+    """lookup_many() - walidacja przed startem lookupów, kolejność wyników."""
+
+    def test_invalid_nips_rejected_without_lookup(self, lookup, monkeypatch):
+        looked_up = []
+
+        async def backend(clean_nip):
+            looked_up.append(clean_nip)
+            return NIPLookupResult(nip=clean_nip, company_name="Firma", found=True)
+
+        monkeypatch.setattr(lookup, "_lookup_valid", backend)
+
+        results = asyncio.run(lookup.lookup_many(["113-108-86-80", "1234567890", "abc", "5260250274"]))
+
+        assert looked_up == ["1131088680", "5260250274"]
+        assert [r.nip for r in results] == ["1131088680", "1234567890", "abc", "5260250274"]
+        assert [r.found for r in results] == [True, False, False, True]
+        assert results[1].error == "NIP nie przechodzi walidacji"
+        assert results[2].error == "Nieprawidłowy format NIP"
+
+    def test_errors_match_lookup(self, lookup):
+        async def run():
+            nips = ["1234567890", "12345", ""]
+            single = [await lookup.lookup(n) for n in nips]
+            many = await lookup.lookup_many(nips)
+            return single, many
+
+        single, many = asyncio.run(run())
+        assert many == single
+
+
+class TestLookupMinimal:
+    """lookup_minimal() - skrócony wynik z tego samego wyszukiwania co lookup()."""
+
+    def test_returns_summary_of_lookup(self, monkeypatch):
+        clear_lookup_cache()
+        calls = []
+
+        async def backend(clean_nip, google_task):
+            calls.append(clean_nip)
+            return NIPLookupResult(
+                nip=clean_nip,
+                gus_data=GUSCompanyData(nip=clean_nip, full_name="AWODENT SP. Z O.O.", city="Warszawa", found=True),
+                company_name="AWODENT SP. Z O.O.",
+                website="https://awodent.pl",
+                city="Warszawa",
+                found=True,
+            )
+
+        async def run():
+            instance = NIPLookup(settings=CompanyIntelSettings(cache_enabled=True))
+            instance._persistent_cache = None
+            monkeypatch.setattr(instance, "_lookup_with_gus", backend)
+            summary = await instance.lookup_minimal("113-108-86-80")
+            full = await instance.lookup("1131088680")
+            return summary, full
+
+        try:
+            summary, full = asyncio.run(run())
+        finally:
+            clear_lookup_cache()
+
+        assert summary == NIPLookupSummary(
+            nip="1131088680",
+            company_name="AWODENT SP. Z O.O.",
+            website="https://awodent.pl",
+            city="Warszawa",
+            found=True,
+        )
+        assert (summary.company_name, summary.website, summary.city) == (full.company_name, full.website, full.city)
+        # Wspólny cache z lookup() - jedno wyszukiwanie
+        assert calls == ["1131088680"]
+
+    def test_invalid_nip(self, lookup):
+        summary = asyncio.run(lookup.lookup_minimal("1234567890"))
+        assert summary == NIPLookupSummary(nip="1234567890", company_name=None, website=None, city=None, found=False)
+
+
+def _website_for(query: str) -> str:
+    """Strona zwracana przez FakeApify dla zapytania '"<NIP>" firma'."""
+    return f"https://firma-{query.split()[0].strip(chr(34))}.pl/"
+
+
+class FakeApify:
+    """Apify Google Search na httpx.MockTransport - zapisuje runy, odpowiada per zapytanie."""
+
+    def __init__(self, status_code: int = 200):
+        self.status_code = status_code
+        self.runs: list[list[str]] = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        assert str(request.url).startswith(APIFY_GOOGLE_SEARCH_URL)
+        queries = orjson.loads(request.content)["queries"].split("\n")
+        self.runs.append(queries)
+        await self.release.wait()
+        if self.status_code != 200:
+            return httpx.Response(self.status_code, json={"error": "actor failed"})
+        # Kolejność itemów inna niż kolejność zapytań - wyniki łączone po searchQuery.term
+        items = [
+            {
+                "searchQuery": {"term": query},
+                "organicResults": [{
+                    "url": _website_for(query),
+                    "title": f"Firma {query} - strona główna",
+                    "description": "",
+                }],
+            }
+            for query in reversed(queries)
+        ]
+        return httpx.Response(200, json=items)
+
+
+def _apify_lookup(apify: FakeApify) -> NIPLookup:
+    settings = CompanyIntelSettings(cache_enabled=False, apify_api_token="test-token")
+    instance = NIPLookup(settings=settings)
+    instance.set_http_client(httpx.AsyncClient(transport=httpx.MockTransport(apify.handler)))
+    return instance
+
+
+class TestGoogleBatching:
+    """Zapytania Google pakowane w jeden run Apify."""
+
+    def test_concurrent_queries_share_one_run(self):
+        apify = FakeApify()
+        nips = VALID_NIPS[:4]
+
+        async def run():
+            lookup = _apify_lookup(apify)
+            return await asyncio.gather(*(lookup.search_by_nip_google(nip) for nip in nips))
+
+        results = asyncio.run(run())
+        assert len(apify.runs) == 1
+        assert sorted(apify.runs[0]) == sorted(f'"{nip}" firma' for nip in nips)
+        # Każdy dostaje wynik swojego zapytania
+        assert [website for _, website, _ in results] == [f"https://firma-{nip}.pl/" for nip in nips]
+
+    def test_single_query_skips_batch_window(self, monkeypatch):
+        apify = FakeApify()
+        monkeypatch.setattr(NIPLookup, "GOOGLE_BATCH_WINDOW_SEC", 30)
+
+        async def run():
+            lookup = _apify_lookup(apify)
+            return await asyncio.wait_for(lookup.search_by_nip_google(VALID_NIPS[0]), timeout=5)
+
+        _, website, _ = asyncio.run(run())
+        assert website == f"https://firma-{VALID_NIPS[0]}.pl/"
+        assert len(apify.runs) == 1
+
+    def test_batches_split_by_max_queries(self, monkeypatch):
+        apify = FakeApify()
+        monkeypatch.setattr(NIPLookup, "GOOGLE_BATCH_MAX_QUERIES", 2)
+
+        async def run():
+            lookup = _apify_lookup(apify)
+            return await asyncio.gather(*(lookup.search_by_nip_google(nip) for nip in VALID_NIPS))
+
+        results = asyncio.run(run())
+        assert sorted(len(queries) for queries in apify.runs) == [1, 2, 2]
+        assert [website for _, website, _ in results] == [f"https://firma-{nip}.pl/" for nip in VALID_NIPS]
+
+    def test_identical_queries_coalesced_while_in_flight(self):
+        apify = FakeApify()
+        apify.release.clear()
+        query = f'"{VALID_NIPS[0]}" firma'
+
+        async def run():
+            lookup = _apify_lookup(apify)
+            first = asyncio.create_task(lookup._search_google(query, max_results=7))
+            second = asyncio.create_task(lookup._search_google(query, max_results=7))
+            while not apify.runs:
+                await asyncio.sleep(0)
+            # Run już wysłany - kolejne identyczne zapytanie czeka na ten sam wynik
+            third = asyncio.create_task(lookup._search_google(query, max_results=7))
+            await asyncio.sleep(0.01)
+            apify.release.set()
+            results = await asyncio.gather(first, second, third)
+            assert not lookup._google_futures
+            # Po wyniku - nowe zapytanie idzie do Apify ponownie
+            await lookup._search_google(query, max_results=7)
+            return results
+
+        results = asyncio.run(run())
+        assert apify.runs == [[query], [query]]
+        assert all(hits[0].url == f"https://firma-{VALID_NIPS[0]}.pl/" for hits in results)
+
+    def test_missing_query_result_is_empty(self):
+        apify = FakeApify()
+        original = apify.handler
+
+        async def drop_first(request: httpx.Request) -> httpx.Response:
+            response = await original(request)
+            items = orjson.loads(response.content)
+            return httpx.Response(200, json=[i for i in items if VALID_NIPS[0] not in i["searchQuery"]["term"]])
+
+        apify.handler = drop_first
+
+        async def run():
+            lookup = _apify_lookup(apify)
+            return await asyncio.gather(*(lookup.search_by_nip_google(nip) for nip in VALID_NIPS[:2]))
+
+        results = asyncio.run(run())
+        assert results[0] == (None, None, None)
+        assert results[1][1] == f"https://firma-{VALID_NIPS[1]}.pl/"
+
+    def test_failed_batch_fails_every_waiter(self):
+        apify = FakeApify(status_code=500)
+        queries = [f'"{nip}" firma' for nip in VALID_NIPS[:3]]
+
+        async def run():
+            lookup = _apify_lookup(apify)
+            return await asyncio.gather(
+                *(lookup._search_google(query, max_results=7) for query in queries),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run())
+        assert len(apify.runs) == 1
+        assert all(isinstance(r, httpx.HTTPStatusError) for r in results)
+
+    def test_failed_batch_falls_back_for_every_caller(self):
+        apify = FakeApify(status_code=500)
+
+        async def run():
+            lookup = _apify_lookup(apify)
+            return await asyncio.gather(*(lookup.search_by_nip_google(nip) for nip in VALID_NIPS[:3]))
+
+        assert asyncio.run(run()) == [(None, None, None)] * 3
+
+    def test_cancelled_waiter_does_not_cancel_others(self):
+        apify = FakeApify()
+        apify.release.clear()
+        query = f'"{VALID_NIPS[0]}" firma'
+
+        async def run():
+            lookup = _apify_lookup(apify)
+            first = asyncio.create_task(lookup._search_google(query, max_results=7))
+            second = asyncio.create_task(lookup._search_google(query, max_results=7))
+            while not apify.runs:
+                await asyncio.sleep(0)
+            first.cancel()
+            apify.release.set()
+            return await second
+
+        hits = asyncio.run(run())
+        assert hits[0].url == f"https://firma-{VALID_NIPS[0]}.pl/"
+
+    def test_close_fails_waiters_of_running_batch(self):
+        apify = FakeApify()
+        apify.release.clear()
+
+        async def run():
+            lookup = _apify_lookup(apify)
+            waiters = [
+                asyncio.create_task(lookup._search_google(f'"{nip}" firma', max_results=7))
+                for nip in VALID_NIPS[:2]
+            ]
+            while not apify.runs:
+                await asyncio.sleep(0)
+            await lookup.close()
+            return await asyncio.wait_for(asyncio.gather(*waiters, return_exceptions=True), timeout=5)
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, RuntimeError) for r in results)
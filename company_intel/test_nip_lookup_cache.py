@@ -0,0 +1,244 @@
+"""
+Testy cache NIPLookup - TTL w procesie, trwały cache SQLite, współdzielenie lookupów.
+
+Bez sieci: backend lookupu (_lookup_with_gus) jest podmieniany.
+Uruchom: pytest company_intel/test_nip_lookup_cache.py
+"""
+
+import asyncio
+import types
+
+import pytest
+
+from company_intel import nip_lookup, nip_lookup_cache
+from company_intel.config import CompanyIntelSettings
+from company_intel.nip_lookup import NIPLookup, NIPLookupResult, clear_lookup_cache
+from company_intel.nip_lookup_cache import NIPLookupCache
+
+
+TEST_NIP = "1131088680"
+
+
+class FakeClock:
+    """Podmiana modułu time - przesuwany ręcznie zegar."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Zegar dla cache w procesie (nip_lookup.time.monotonic)."""
+    fake = FakeClock()
+    monkeypatch.setattr(nip_lookup, "time", types.SimpleNamespace(monotonic=fake.monotonic))
+    clear_lookup_cache()
+    yield fake
+    clear_lookup_cache()
+
+
+def _complete_result() -> NIPLookupResult:
+    return NIPLookupResult(
+        nip=TEST_NIP,
+        company_name="AWODENT",
+        website="https://awodent.pl",
+        found=True,
+        website_validated=True,
+    )
+
+
+def _make_lookup(backend) -> NIPLookup:
+    """NIPLookup z podmienionym backendem, bez trwałego cache."""
+    lookup = NIPLookup(settings=CompanyIntelSettings(cache_enabled=True))
+    lookup._persistent_cache = None
+    lookup._lookup_with_gus = backend
+    return lookup
+
+
+class TestLookupTTLCache:
+    """Cache wyników lookup() w procesie."""
+
+    def test_found_result_kept_for_found_ttl(self, clock):
+        nip_lookup._ttl_cache_put(
+            nip_lookup._lookup_cache, TEST_NIP, _complete_result(), nip_lookup.LOOKUP_CACHE_TTL_FOUND_SEC
+        )
+
+        clock.now += nip_lookup.LOOKUP_CACHE_TTL_FOUND_SEC - 1
+        assert nip_lookup._ttl_cache_get(nip_lookup._lookup_cache, TEST_NIP) is not None
+
+        clock.now += 1
+        assert nip_lookup._ttl_cache_get(nip_lookup._lookup_cache, TEST_NIP) is None
+        assert TEST_NIP not in nip_lookup._lookup_cache
+
+    def test_cache_returns_copies(self, clock):
+        nip_lookup._ttl_cache_put(
+            nip_lookup._lookup_cache, TEST_NIP, _complete_result(), nip_lookup.LOOKUP_CACHE_TTL_FOUND_SEC
+        )
+
+        first = nip_lookup._ttl_cache_get(nip_lookup._lookup_cache, TEST_NIP)
+        first.warnings.append("zmienione przez wywołującego")
+
+        second = nip_lookup._ttl_cache_get(nip_lookup._lookup_cache, TEST_NIP)
+        assert second.warnings == []
+
+    def test_complete_result_uses_found_ttl(self, clock):
+        calls = 0
+
+        async def backend(clean_nip, google_task):
+            nonlocal calls
+            calls += 1
+            return _complete_result()
+
+        async def run():
+            lookup = _make_lookup(backend)
+            await lookup.lookup(TEST_NIP)
+            clock.now += nip_lookup.LOOKUP_CACHE_TTL_NOT_FOUND_SEC + 1
+            await lookup.lookup(TEST_NIP)
+            clock.now += nip_lookup.LOOKUP_CACHE_TTL_FOUND_SEC
+            await lookup.lookup(TEST_NIP)
+
+        asyncio.run(run())
+        assert calls == 2
+
+    @pytest.mark.parametrize("result", [
+        NIPLookupResult(nip=TEST_NIP, found=False, error="Nie znaleziono"),
+        # GUS znalazł firmę, ale wyszukiwanie strony się nie udało
+        NIPLookupResult(nip=TEST_NIP, company_name="AWODENT", found=True),
+        NIPLookupResult(
+            nip=TEST_NIP, company_name="AWODENT", website="https://awodent.pl",
+            found=True, error="Apify timeout",
+        ),
+    ])
+    def test_incomplete_result_uses_short_ttl(self, clock, result):
+        calls = 0
+
+        async def backend(clean_nip, google_task):
+            nonlocal calls
+            calls += 1
+            return result
+
+        async def run():
+            lookup = _make_lookup(backend)
+            await lookup.lookup(TEST_NIP)
+            await lookup.lookup(TEST_NIP)
+            assert calls == 1
+            clock.now += nip_lookup.LOOKUP_CACHE_TTL_NOT_FOUND_SEC
+            await lookup.lookup(TEST_NIP)
+
+        asyncio.run(run())
+        assert calls == 2
+
+
+class TestLookupInflight:
+    """Równoległe lookup() tego samego NIP."""
+
+    def test_concurrent_lookups_share_one_backend_call(self, clock):
+        calls = 0
+
+        async def backend(clean_nip, google_task):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return _complete_result()
+
+        async def run():
+            lookup = _make_lookup(backend)
+            first, second = await asyncio.gather(
+                lookup.lookup(TEST_NIP),
+                lookup.lookup("113-108-86-80"),
+            )
+            assert not lookup._lookup_inflight
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert calls == 1
+        assert first.website == second.website == "https://awodent.pl"
+        # Każdy czekający dostaje własną kopię
+        assert first is not second
+
+    def test_backend_error_reaches_all_waiters(self, clock):
+        calls = 0
+
+        async def backend(clean_nip, google_task):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("GUS niedostępny")
+
+        async def run():
+            lookup = _make_lookup(backend)
+            return await asyncio.gather(
+                lookup.lookup(TEST_NIP),
+                lookup.lookup(TEST_NIP),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run())
+        assert calls == 1
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+
+class TestNIPLookupCache:
+    """Trwały cache SQLite."""
+
+    @pytest.fixture
+    def wall_clock(self, monkeypatch):
+        fake = FakeClock(now=1_700_000_000)
+        monkeypatch.setattr(nip_lookup_cache, "time", types.SimpleNamespace(time=fake.time))
+        return fake
+
+    def test_round_trip(self, tmp_path, wall_clock):
+        async def run():
+            cache = NIPLookupCache(str(tmp_path / "cache" / "nip.db"))
+            try:
+                assert await cache.get(TEST_NIP) is None
+                await cache.set(TEST_NIP, '{"nip": "1131088680"}', validated=True)
+                assert await cache.get(TEST_NIP) == '{"nip": "1131088680"}'
+                await cache.set(TEST_NIP, '{"nip": "1131088680", "found": true}', validated=True)
+                return await cache.get(TEST_NIP)
+            finally:
+                await cache.close()
+
+        assert asyncio.run(run()) == '{"nip": "1131088680", "found": true}'
+
+    def test_result_survives_reopen(self, tmp_path, wall_clock):
+        db_path = str(tmp_path / "nip.db")
+
+        async def run():
+            cache = NIPLookupCache(db_path)
+            await cache.set(TEST_NIP, "{}", validated=False)
+            await cache.close()
+
+            reopened = NIPLookupCache(db_path)
+            try:
+                return await reopened.get(TEST_NIP)
+            finally:
+                await reopened.close()
+
+        assert asyncio.run(run()) == "{}"
+
+    @pytest.mark.parametrize("validated, ttl", [
+        (True, nip_lookup_cache.PERSISTENT_TTL_VALIDATED_SEC),
+        (False, nip_lookup_cache.PERSISTENT_TTL_UNVALIDATED_SEC),
+    ])
+    def test_expiry(self, tmp_path, wall_clock, validated, ttl):
+        async def run():
+            cache = NIPLookupCache(str(tmp_path / "nip.db"))
+            try:
+                await cache.set(TEST_NIP, "{}", validated=validated)
+                wall_clock.now += ttl - 1
+                before = await cache.get(TEST_NIP)
+                wall_clock.now += 1
+                after = await cache.get(TEST_NIP)
+                return before, after
+            finally:
+                await cache.close()
+
+        before, after = asyncio.run(run())
+        assert before == "{}"
+        assert after is None
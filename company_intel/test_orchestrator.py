@@ -0,0 +1,139 @@
+"""
+Testy CompanyIntelOrchestrator bez sieci.
+
+Uruchom: pytest company_intel/test_orchestrator.py
+"""
+
+import asyncio
+
+import pytest
+
+from company_intel.config import CompanyIntelSettings
+from company_intel.models import Adres, CompanyIntel, Kontakt, Placowka
+from company_intel.orchestrator import CompanyIntelOrchestrator
+
+
+@pytest.fixture
+def orchestrator():
+    orch = CompanyIntelOrchestrator(settings=CompanyIntelSettings(cache_enabled=False))
+    yield orch
+    asyncio.run(orch.close())
+
+
+class TestAnalyzeByNipSingleFlight:
+    """Równoległe analyze_by_nip() dla tego samego NIP."""
+
+    def test_concurrent_calls_share_one_analysis(self, orchestrator, monkeypatch):
+        calls = []
+
+        async def analyze(nip, **flags):
+            calls.append(nip)
+            await asyncio.sleep(0.01)
+            return CompanyIntel(nip="1131088680", nazwa_pelna="AWODENT")
+
+        monkeypatch.setattr(orchestrator, "_analyze_by_nip_uncached", analyze)
+
+        async def run():
+            return await asyncio.gather(
+                orchestrator.analyze_by_nip("1131088680"),
+                orchestrator.analyze_by_nip("113-108-86-80"),
+                orchestrator.analyze_by_nip(" 1131088680 "),
+            )
+
+        results = asyncio.run(run())
+        assert len(calls) == 1
+        assert all(r.nazwa_pelna == "AWODENT" for r in results)
+
+    def test_every_caller_gets_own_copy(self, orchestrator, monkeypatch):
+        async def analyze(nip, **flags):
+            await asyncio.sleep(0.01)
+            return CompanyIntel(nip="1131088680", nazwa_pelna="AWODENT")
+
+        monkeypatch.setattr(orchestrator, "_analyze_by_nip_uncached", analyze)
+
+        async def first_caller():
+            result = await orchestrator.analyze_by_nip("1131088680")
+            # Modyfikacja przed wznowieniem pozostałych wywołujących
+            result.nazwa_pelna = "ZMIENIONE"
+            return result
+
+        async def run():
+            return await asyncio.gather(
+                first_caller(),
+                orchestrator.analyze_by_nip("1131088680"),
+            )
+
+        first, second = asyncio.run(run())
+        assert first.nazwa_pelna == "ZMIENIONE"
+        assert second.nazwa_pelna == "AWODENT"
+
+    def test_different_flags_not_shared(self, orchestrator, monkeypatch):
+        calls = []
+
+        async def analyze(nip, **flags):
+            calls.append(flags)
+            await asyncio.sleep(0.01)
+            return CompanyIntel(nip="1131088680")
+
+        monkeypatch.setattr(orchestrator, "_analyze_by_nip_uncached", analyze)
+
+        async def run():
+            await asyncio.gather(
+                orchestrator.analyze_by_nip("1131088680"),
+                orchestrator.analyze_by_nip("1131088680", skip_social=True),
+            )
+
+        asyncio.run(run())
+        assert len(calls) == 2
+
+
+def _placowka(nazwa: str, ulica: str = None, miasto: str = None, reviews: int = 0, telefon: str = None) -> Placowka:
+    return Placowka(
+        nazwa_placowki=nazwa,
+        adres=Adres(ulica=ulica, miasto=miasto),
+        google_reviews_count=reviews,
+        kontakty=[Kontakt(typ="telefon", wartosc=telefon)] if telefon else [],
+    )
+
+
+class TestDeduplicatePlacowki:
+    """_deduplicate_placowki - scalanie po adresie i stała kolejność wyniku."""
+
+    def test_unique_addresses_put_no_address_last(self, orchestrator):
+        placowki = [
+            _placowka("bez adresu 1"),
+            _placowka("A", "Marszałkowska 1", "Warszawa"),
+            _placowka("bez adresu 2"),
+            _placowka("B", "Długa 5", "Gdańsk"),
+        ]
+
+        result = orchestrator._deduplicate_placowki(placowki)
+
+        assert [p.nazwa_placowki for p in result] == ["A", "B", "bez adresu 1", "bez adresu 2"]
+
+    def test_duplicates_put_no_address_last(self, orchestrator):
+        placowki = [
+            _placowka("bez adresu 1"),
+            _placowka("A", "Marszałkowska 1", "Warszawa", reviews=3, telefon="111"),
+            _placowka("bez adresu 2"),
+            _placowka("B", "Długa 5", "Gdańsk"),
+            _placowka("A-lepsza", "marszałkowska  1", "WARSZAWA", reviews=40, telefon="222"),
+        ]
+
+        result = orchestrator._deduplicate_placowki(placowki)
+
+        # Grupa na miejscu pierwszego wystąpienia adresu, wygrywa więcej recenzji
+        assert [p.nazwa_placowki for p in result] == ["A-lepsza", "B", "bez adresu 1", "bez adresu 2"]
+        assert [k.wartosc for k in result[0].kontakty] == ["111", "222"]
+
+    def test_order_independent_of_duplicates(self, orchestrator):
+        unique = [
+            _placowka("bez adresu"),
+            _placowka("A", "Marszałkowska 1", "Warszawa"),
+        ]
+        with_duplicate = unique + [_placowka("A-kopia", "Marszałkowska 1", "Warszawa")]
+
+        without_dup = orchestrator._deduplicate_placowki(unique)
+        with_dup = orchestrator._deduplicate_placowki(with_duplicate)
+
+        assert [p.nazwa_placowki for p in without_dup] == [p.nazwa_placowki for p in with_dup] == ["A", "bez adresu"]
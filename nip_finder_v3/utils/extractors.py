@@ -9,21 +9,10 @@ if TYPE_CHECKING:
     from bs4 import BeautifulSoup
 
 
-def extract_nip_from_text(text: str) -> Optional[str]:
-    """
-    Wyciąga NIP z tekstu używając wielu wzorców regex.
-
-    Args:
-        text: Tekst do przeszukania
-
-    Returns:
-        NIP (10 cyfr) lub None
-    """
-    if not text:
-        return None
-
-    # Wzorce dla NIP (w kolejności od najbardziej precyzyjnych)
-    patterns = [
+# Wzorce dla NIP (w kolejności od najbardziej precyzyjnych) - kompilowane raz przy imporcie
+_NIP_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
         # "NIP: 123-456-78-90" lub "NIP 1234567890"
         r'NIP\s*:?\s*(\d{3}[-\s]?\d{3}[-\s]?\d{2}[-\s]?\d{2})',
         r'NIP\s*:?\s*(\d{10})',
@@ -39,13 +28,29 @@ def extract_nip_from_text(text: str) -> Optional[str]:
 
         # "NIP-1234567890" lub "NIP:1234567890"
         r'\bNIP[-:\s]*(\d{10})\b',
-    ]
+    )
+)
+_NIP_SEPARATORS = re.compile(r'[-\s]')
 
-    for pattern in patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
+
+def extract_nip_from_text(text: str) -> Optional[str]:
+    """
+    Wyciąga NIP z tekstu używając wielu wzorców regex.
+
+    Args:
+        text: Tekst do przeszukania
+
+    Returns:
+        NIP (10 cyfr) lub None
+    """
+    if not text:
+        return None
+
+    for pattern in _NIP_PATTERNS:
+        # finditer - kończymy na pierwszym poprawnym NIP bez zbierania wszystkich dopasowań
+        for match in pattern.finditer(text):
             # Usuń separatory (myślniki i spacje)
-            nip = re.sub(r'[-\s]', '', match)
+            nip = _NIP_SEPARATORS.sub('', match.group(1))
 
             # Walidacja długości
             if len(nip) == 10 and nip.isdigit():
@@ -22,6 +22,9 @@ from typing import Any, Optional
 
 import pandas as pd
 
+from company_intel.models import CompanyIntel, utc_now
+from company_intel.nip_lookup import close_shared_http_client
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -35,6 +38,34 @@ logging.getLogger("httpcore").setLevel(logging.WARNING)
 logging.getLogger("apify_client").setLevel(logging.WARNING)
 
 
+def company_intel_summary(ci_result: CompanyIntel) -> dict:
+    """Podsumowanie analizy Company Intel do raportu (kolumny ci_*)."""
+    return {
+        "nazwa_pelna": ci_result.nazwa_pelna,
+        "nazwa_zwyczajowa": ci_result.nazwa_zwyczajowa,
+        "nip": ci_result.nip,
+        "regon": ci_result.regon,
+        "kategoryzacja": ci_result.kategoryzacja_ai.model_dump() if ci_result.kategoryzacja_ai else None,
+        "placowki_count": len(ci_result.placowki),
+        "placowki": [
+            {
+                "nazwa": p.nazwa_placowki,
+                "adres": str(p.adres) if p.adres else None,
+                "miasto": p.adres.miasto if p.adres else None,
+                "google_rating": p.google_rating,
+                "google_reviews_count": p.google_reviews_count,
+                "kontakty": [k.wartosc for k in (p.kontakty or [])[:3]],
+            }
+            for p in (ci_result.placowki or [])[:5]
+        ],
+        "social_media": ci_result.social_media.model_dump(mode="json") if ci_result.social_media else None,
+        "activity_score": ci_result.activity_score.total if ci_result.activity_score else None,
+        "activity_recommendation": ci_result.activity_score.recommendation.value if ci_result.activity_score else None,
+        "sources_used": ci_result.metadata.sources_used if ci_result.metadata else [],
+        "scraped_at": ci_result.metadata.scraped_at.isoformat() if ci_result.metadata else None,
+    }
+
+
 class LeadBatchProcessor:
     """Procesor batch dla leadów z pliku XLS."""
     
@@ -72,6 +103,7 @@ class LeadBatchProcessor:
             await self._normalizer.close()
         if self._company_intel:
             await self._company_intel.close()
+            await close_shared_http_client()
     
     async def process_single_lead(self, row: dict) -> dict:
         """
@@ -81,7 +113,7 @@ class LeadBatchProcessor:
             row: Dict z danymi leada z XLS
             
         Returns:
-            Dict z wynikami przetwarzania
+            Dict z wynikami przetwarzania (company_intel: CompanyIntel lub brak)
         """
         start_time = time.time()
         result = {
@@ -162,29 +194,8 @@ class LeadBatchProcessor:
                                 core_only=self.core_only,
                             )
                         
-                        result["company_intel"] = {
-                            "nazwa_pelna": ci_result.nazwa_pelna,
-                            "nazwa_zwyczajowa": ci_result.nazwa_zwyczajowa,
-                            "nip": ci_result.nip,
-                            "regon": ci_result.regon,
-                            "kategoryzacja": ci_result.kategoryzacja.model_dump() if ci_result.kategoryzacja else None,
-                            "placowki_count": len(ci_result.placowki),
-                            "placowki": [
-                                {
-                                    "nazwa": p.nazwa,
-                                    "adres": str(p.adres) if p.adres else None,
-                                    "miasto": p.adres.miasto if p.adres else None,
-                                    "google_rating": p.google_rating,
-                                    "google_reviews_count": p.google_reviews_count,
-                                    "kontakty": [k.wartosc for k in (p.kontakty or [])[:3]],
-                                }
-                                for p in (ci_result.placowki or [])[:5]
-                            ],
-                            "social_media": ci_result.social_media.to_dict() if ci_result.social_media else None,
-                            "activity_score": ci_result.activity_score.total if ci_result.activity_score else None,
-                            "activity_recommendation": ci_result.activity_score.recommendation.value if ci_result.activity_score else None,
-                            "sources_used": ci_result.metadata.sources_used if ci_result.metadata else [],
-                        }
+                        # Podsumowanie (company_intel_summary) powstaje w process_file
+                        result["company_intel"] = ci_result
                         
                         if ci_result.metadata and ci_result.metadata.warnings:
                             result["warnings"].extend(ci_result.metadata.warnings)
@@ -241,6 +252,7 @@ class LeadBatchProcessor:
         # Przetwarzaj każdy wiersz
         results = []
         total_start = time.time()
+        batch_started_at = utc_now()
         
         for idx, row in df.iterrows():
             row_dict = row.to_dict()
@@ -264,9 +276,9 @@ class LeadBatchProcessor:
                 contact_exists = dups.get("contact", {}).get("exists", False) if dups else False
                 account_exists = dups.get("account", {}).get("exists", False) if dups else False
                 
-                ci = result.get("company_intel", {})
-                activity_score = ci.get("activity_score") if ci else None
-                placowki_count = ci.get("placowki_count", 0) if ci else 0
+                ci_result = result.get("company_intel")
+                activity_score = ci_result.activity_score.total if ci_result and ci_result.activity_score else None
+                placowki_count = len(ci_result.placowki) if ci_result else 0
                 
                 logger.info(f"  ✓ NIP: {nip or 'nie znaleziono'}")
                 logger.info(f"  ✓ Firma: {company_name or 'N/A'}")
@@ -281,6 +293,13 @@ class LeadBatchProcessor:
         # Zamknij serwisy
         await self.close()
         
+        # Analizy z jednego przebiegu dostają wspólny scraped_at (start batcha) - raport
+        # porównuje leady z pliku, a nie moment zakończenia poszczególnych analiz
+        analyzed = [r for r in results if r.get("company_intel") is not None]
+        stamped = CompanyIntel.new_batch((r["company_intel"] for r in analyzed), now=batch_started_at)
+        for r, ci_result in zip(analyzed, stamped):
+            r["company_intel"] = company_intel_summary(ci_result)
+        
         # Przygotuj wynikowy DataFrame
         output_rows = []
         for r in results:
@@ -336,12 +355,13 @@ class LeadBatchProcessor:
                 
                 # Company Intel
                 "ci_nazwa_pelna": ci.get("nazwa_pelna"),
-                "ci_kategoryzacja_industry": ci.get("kategoryzacja", {}).get("industry") if ci.get("kategoryzacja") else None,
+                "ci_kategoryzacja_industry": ci.get("kategoryzacja", {}).get("branza") if ci.get("kategoryzacja") else None,
                 "ci_kategoryzacja_specjalizacja": ", ".join(ci.get("kategoryzacja", {}).get("specjalizacja", [])) if ci.get("kategoryzacja") else None,
                 "ci_placowki_count": ci.get("placowki_count"),
                 "ci_activity_score": ci.get("activity_score"),
                 "ci_activity_recommendation": ci.get("activity_recommendation"),
                 "ci_sources": ", ".join(ci.get("sources_used", [])),
+                "ci_scraped_at": ci.get("scraped_at"),
                 
                 # Meta
                 "success": r.get("success"),
@@ -0,0 +1,55 @@
+"""
+Testy LeadBatchProcessor.process_file bez sieci (process_single_lead podmieniony).
+
+Uruchom: pytest test_process_leads_batch.py
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from company_intel.models import Adres, CompanyIntel, KategoryzacjaAI, Metadata, Placowka
+from process_leads_batch import LeadBatchProcessor
+
+
+def test_company_intel_results_share_batch_timestamp(tmp_path, monkeypatch):
+    input_file = tmp_path / "leads.csv"
+    pd.DataFrame([
+        {"company": "Awodent", "nip": "1131088680"},
+        {"company": "Bez analizy", "nip": ""},
+        {"company": "Dentart", "nip": "5260250274"},
+    ]).to_csv(input_file, index=False)
+
+    # Analizy kończą się w różnych momentach, po starcie batcha
+    finished = datetime.now(timezone.utc) + timedelta(hours=1)
+    analyses = {
+        "Awodent": CompanyIntel(
+            nip="1131088680",
+            kategoryzacja_ai=KategoryzacjaAI(branza="stomatologia", specjalizacja=["implanty", "ortodoncja"]),
+            placowki=[Placowka(nazwa_placowki="SIEDZIBA AWODENT", adres=Adres(miasto="Warszawa"))],
+            metadata=Metadata(scraped_at=finished),
+        ),
+        "Dentart": CompanyIntel(nip="5260250274", metadata=Metadata(scraped_at=finished + timedelta(minutes=5))),
+    }
+
+    async def process_single_lead(row):
+        result = {"input": row, "success": True, "processing_time_ms": 0, "errors": [], "warnings": []}
+        if row["company"] in analyses:
+            result["company_intel"] = analyses[row["company"]]
+        return result
+
+    processor = LeadBatchProcessor(skip_zoho=True)
+    monkeypatch.setattr(processor, "process_single_lead", process_single_lead)
+
+    before = datetime.now(timezone.utc)
+    df = asyncio.run(processor.process_file(str(input_file), output_file=str(tmp_path / "out.xlsx")))
+
+    scraped_at = df["ci_scraped_at"].tolist()
+    assert scraped_at[0] == scraped_at[2]
+    assert pd.isna(scraped_at[1])
+    # Wspólny czas = start batcha, nie zakończenie którejkolwiek analizy
+    assert before <= datetime.fromisoformat(scraped_at[0]) < finished
+    assert df["ci_placowki_count"].tolist()[0] == 1
+    assert df["ci_kategoryzacja_industry"].tolist()[0] == "stomatologia"
+    assert df["ci_kategoryzacja_specjalizacja"].tolist()[0] == "implanty, ortodoncja"
@@ -182,8 +182,8 @@ async def main():
                 "activity_score_total": nip_result.activity_score.total,
                 "activity_recommendation": nip_result.activity_score.recommendation.value,
                 "signals": nip_result.activity_score.signals,
-                "social_profiles": [p.to_dict() for p in nip_result.social_profiles],
-                "addresses": [p.adres.to_dict() for p in nip_result.placowki],
+                "social_profiles": [p.model_dump(mode="json", exclude={"raw_data"}) for p in nip_result.social_profiles],
+                "addresses": [p.adres.model_dump(mode="json") for p in nip_result.placowki],
             }
             logger.debug(f"NIP summary prepared: {len(nip_summary['addresses'])} addresses")
         
@@ -210,8 +210,8 @@ async def main():
                 "activity_score_total": website_result.activity_score.total,
                 "activity_recommendation": website_result.activity_score.recommendation.value,
                 "signals": website_result.activity_score.signals,
-                "social_profiles": [p.to_dict() for p in website_result.social_profiles],
-                "addresses": [p.adres.to_dict() for p in website_result.placowki],
+                "social_profiles": [p.model_dump(mode="json", exclude={"raw_data"}) for p in website_result.social_profiles],
+                "addresses": [p.adres.model_dump(mode="json") for p in website_result.placowki],
             }
             logger.debug(f"Website summary prepared: {len(website_summary['addresses'])} addresses")
         